@@ -3,10 +3,18 @@ Cost Estimation API Routes
 """
 
 from fastapi import APIRouter, HTTPException, status
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from pydantic import BaseModel
+from app.cost import CostEstimateReport, Scenario
 from app.cost.estimator import CostEstimator
+from app.cost.session import CostSession, format_cost_delta
+from app.cost.sensitivity import SensitivityAnalyzer
+from app.cost.optimizer import CostOptimizer, OptimizationConstraints, TierConstraint
+from app.deployment import DeploymentConfig
+from app.utils.cache import get_cache
+from config import settings
 import logging
+import uuid
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -18,6 +26,7 @@ class CostEstimateRequest(BaseModel):
     stack_type: str
     region: str = 'us-east-1'
     currency: str = 'USD'
+    deployment_config: Optional[Dict[str, Any]] = None
 
 
 class CostEstimateResponse(BaseModel):
@@ -28,6 +37,68 @@ class CostEstimateResponse(BaseModel):
     scenarios: Dict[str, Any]
     free_tier_eligible: bool
     optimization_recommendations: List[str]
+    warnings: List[str] = []  # resources priced with another deployment strategy than they ask for
+
+
+class CostSessionRequest(BaseModel):
+    """Incremental cost estimation request"""
+    session_id: Optional[str] = None
+    graph: Dict[str, Any]
+    stack_type: str
+    region: str = 'us-east-1'
+    currency: str = 'USD'
+
+
+class CostSessionResponse(CostEstimateResponse):
+    """Incremental cost estimation response"""
+    session_id: str
+    deltas: Dict[str, Any]
+    changed_resources: int
+    recomputed: int
+
+
+SESSION_TTL_SECONDS = settings.CACHE_TTL_SECONDS
+
+
+def _serialize_scenarios(report: CostEstimateReport) -> Dict[str, Any]:
+    """Convert report scenarios to dict for response"""
+    scenarios_dict = {}
+    for scenario_key, scenario_cost in report.scenarios.items():
+        scenarios_dict[scenario_key] = {
+            'scenario': scenario_cost.scenario.value,
+            'total_monthly': scenario_cost.total_monthly,
+            'total_annual': scenario_cost.total_annual,
+            'breakdown': [
+                {
+                    'resource_id': rc.resource_id,
+                    'resource_type': rc.resource_type,
+                    'resource_name': rc.resource_name,
+                    'monthly_cost': rc.monthly_cost,
+                    'annual_cost': rc.annual_cost,
+                    'cost_drivers': [
+                        {
+                            'name': cd.name,
+                            'value': cd.value,
+                            'cost': cd.cost,
+                            'explanation': cd.explanation
+                        }
+                        for cd in rc.cost_drivers
+                    ],
+                    'optimization_suggestions': rc.optimization_suggestions,
+                    'alias_costs': [
+                        {
+                            'alias': ac.alias,
+                            'alias_type': ac.alias_type,
+                            'region': ac.region,
+                            'monthly_cost': ac.monthly_cost
+                        }
+                        for ac in rc.alias_costs
+                    ]
+                }
+                for rc in scenario_cost.breakdown
+            ]
+        }
+    return scenarios_dict
 
 
 @router.post("/estimate", response_model=CostEstimateResponse)
@@ -40,42 +111,20 @@ async def estimate_costs(request: CostEstimateRequest):
     try:
         logger.info(f"Estimating costs for stack: {request.stack_type}, region: {request.region}")
         
+        deployment_config = None
+        if request.deployment_config:
+            deployment_config = DeploymentConfig.from_dict(request.deployment_config)
+        
         estimator = CostEstimator()
         report = estimator.estimate_stack_costs(
             graph=request.graph,
             stack_type=request.stack_type,
             region=request.region,
-            currency=request.currency
+            currency=request.currency,
+            deployment_config=deployment_config
         )
         
-        # Convert to dict for response
-        scenarios_dict = {}
-        for scenario_key, scenario_cost in report.scenarios.items():
-            scenarios_dict[scenario_key] = {
-                'scenario': scenario_cost.scenario.value,
-                'total_monthly': scenario_cost.total_monthly,
-                'total_annual': scenario_cost.total_annual,
-                'breakdown': [
-                    {
-                        'resource_id': rc.resource_id,
-                        'resource_type': rc.resource_type,
-                        'resource_name': rc.resource_name,
-                        'monthly_cost': rc.monthly_cost,
-                        'annual_cost': rc.annual_cost,
-                        'cost_drivers': [
-                            {
-                                'name': cd.name,
-                                'value': cd.value,
-                                'cost': cd.cost,
-                                'explanation': cd.explanation
-                            }
-                            for cd in rc.cost_drivers
-                        ],
-                        'optimization_suggestions': rc.optimization_suggestions
-                    }
-                    for rc in scenario_cost.breakdown
-                ]
-            }
+        scenarios_dict = _serialize_scenarios(report)
         
         logger.info(f"Cost estimation complete: {len(scenarios_dict)} scenarios")
         
@@ -85,7 +134,8 @@ async def estimate_costs(request: CostEstimateRequest):
             currency=report.currency,
             scenarios=scenarios_dict,
             free_tier_eligible=report.free_tier_eligible,
-            optimization_recommendations=report.optimization_recommendations
+            optimization_recommendations=report.optimization_recommendations,
+            warnings=report.warnings
         )
         
     except Exception as e:
@@ -96,6 +146,171 @@ async def estimate_costs(request: CostEstimateRequest):
         )
 
 
+@router.post("/session", response_model=CostSessionResponse)
+async def estimate_costs_incremental(request: CostSessionRequest):
+    """
+    Estimate costs incrementally within a session
+    
+    The first call (without session_id) estimates every resource and returns a
+    session_id. Later calls with that session_id only re-estimate resources
+    whose content changed and return the per-scenario cost delta. A session_id
+    that expired (or lives in another worker) is a 404; start a new session.
+    """
+    cache = get_cache()
+    session_id = request.session_id or uuid.uuid4().hex
+    session_key = f"cost_session:{session_id}"
+
+    session = cache.get(session_key)
+    if session is None:
+        if request.session_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Cost session {session_id} not found or expired"
+            )
+        session = CostSession(session_id)
+
+    try:
+        
+        result = session.update(
+            graph=request.graph,
+            stack_type=request.stack_type,
+            region=request.region,
+            currency=request.currency
+        )
+        cache.set(session_key, session, ttl=SESSION_TTL_SECONDS)
+        
+        report = result['report']
+        return CostSessionResponse(
+            stack_type=report.stack_type,
+            region=report.region,
+            currency=report.currency,
+            scenarios=_serialize_scenarios(report),
+            free_tier_eligible=report.free_tier_eligible,
+            optimization_recommendations=report.optimization_recommendations,
+            session_id=session_id,
+            deltas={
+                key: {'monthly': delta, 'display': format_cost_delta(delta)}
+                for key, delta in result['deltas'].items()
+            },
+            changed_resources=result['changed_resources'],
+            recomputed=result['recomputed']
+        )
+        
+    except ValueError as e:
+        logger.error(f"Incremental cost estimation failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Incremental cost estimation failed: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Cost estimation failed: {str(e)}"
+        )
+
+
+class SensitivityRequest(BaseModel):
+    """Cost sensitivity analysis request"""
+    graph: Dict[str, Any]
+    stack_type: str
+    region: str = 'us-east-1'
+    scenario: str = '100_users'
+    step: float = 0.1
+
+
+@router.post("/sensitivity")
+async def analyze_sensitivity(request: SensitivityRequest):
+    """
+    Rank cost inputs by how much they move the total
+    
+    Perturbs every numeric usage assumption and every priced argument
+    (instance tier, storage, memory, Multi-AZ) and returns a tornado-chart
+    dataset sorted by cost swing.
+    """
+    try:
+        scenario = Scenario(request.scenario)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown scenario: {request.scenario}"
+        )
+    
+    try:
+        analyzer = SensitivityAnalyzer(region=request.region)
+        return analyzer.analyze(
+            graph=request.graph,
+            stack_type=request.stack_type,
+            scenario=scenario,
+            step=request.step
+        )
+    except Exception as e:
+        logger.error(f"Sensitivity analysis failed: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
+class TierConstraintModel(BaseModel):
+    """Constraints for one tier (domain id, domain name, domain type or 'default')"""
+    min_vcpu: float = 0
+    min_memory_gib: float = 0
+    multi_az_required: bool = False
+    min_storage_gb: Optional[int] = None
+
+
+class OptimizeRequest(BaseModel):
+    """Cost optimization request"""
+    graph: Dict[str, Any]
+    stack_type: str
+    regions: List[str] = ['us-east-1']
+    region: str = 'us-east-1'  # current region, for current_monthly
+    scenario: str = '100_users'
+    tiers: Dict[str, TierConstraintModel] = {}
+
+
+@router.post("/optimize")
+async def optimize_costs(request: OptimizeRequest):
+    """
+    Find the cheapest configuration that satisfies the tier constraints
+    
+    Searches instance types, Multi-AZ, storage and regions, and returns the
+    Pareto frontier of monthly cost against capacity headroom.
+    """
+    try:
+        constraints = OptimizationConstraints(
+            tiers={name: TierConstraint(**tier.dict()) for name, tier in request.tiers.items()},
+            regions=request.regions or ['us-east-1'],
+            scenario=Scenario(request.scenario),
+            region=request.region
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    try:
+        optimizer = CostOptimizer()
+        return optimizer.optimize(
+            graph=request.graph,
+            stack_type=request.stack_type,
+            constraints=constraints
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Cost optimization failed: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+
 @router.get("/pricing/{region}")
 async def get_regional_pricing(region: str):
     """Get pricing information for a specific region"""
@@ -0,0 +1,199 @@
+"""
+Deployment API Routes
+"""
+
+from fastapi import APIRouter, HTTPException, status
+from typing import Dict, List, Any, Optional
+from pydantic import BaseModel
+import ipaddress
+from dataclasses import asdict
+from app.cost import Scenario
+from app.cost.estimator import CostEstimator
+from app.deployment import DeploymentConfig, preview_expansion
+from app.deployment.cidr import (
+    DEFAULT_SUBNET_PREFIX,
+    DEFAULT_VPC_CIDR,
+    SubnetRequest,
+    find_overlaps,
+    plan_subnets,
+    region_vpc_cidrs
+)
+import logging
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+class SubnetRequestModel(BaseModel):
+    name: str
+    prefix_length: int = DEFAULT_SUBNET_PREFIX
+    per_az: bool = True
+
+
+class CidrPlanRequest(BaseModel):
+    """Subnets to place in every region of a deployment"""
+    deployment_config: Dict[str, Any]  # camelCase, see DeploymentConfig.from_dict
+    subnets: List[SubnetRequestModel]
+    vpc_cidr: str = DEFAULT_VPC_CIDR  # primary region; replicas get the following blocks
+    vpc_cidrs: Optional[Dict[str, str]] = None  # region -> VPC CIDR overrides
+    existing_subnets: List[str] = []
+
+
+class SubnetAllocationModel(BaseModel):
+    name: str
+    region: str
+    cidr: str
+    availability_zone: Optional[str] = None
+
+
+class RegionPlanModel(BaseModel):
+    region: str
+    vpc_cidr: str
+    availability_zones: List[str]
+    subnets: List[SubnetAllocationModel]
+    free_addresses: int
+
+
+class CidrPlanResponse(BaseModel):
+    regions: List[RegionPlanModel]
+    existing_overlaps: List[List[str]]  # pairs of existing subnets that overlap each other
+
+
+class ExpansionPreviewRequest(BaseModel):
+    graph: Dict[str, Any]  # domains and resources; connections are not needed
+    deployment_config: Dict[str, Any]  # camelCase, see DeploymentConfig.from_dict
+    stack_type: Optional[str] = None  # price the aliases when given
+    scenario: str = Scenario.USERS_100.value
+
+
+class ResourceExpansionModel(BaseModel):
+    id: Optional[str] = None
+    name: Optional[str] = None
+    type: Optional[str] = None
+    domain: str
+    strategy: str
+    aliases: int
+    monthly_cost: Optional[float] = None
+
+
+class ExpansionPreviewResponse(BaseModel):
+    total_resources: int
+    total_aliases: int
+    resources: List[ResourceExpansionModel]
+    domains: Dict[str, int]  # domain name -> aliases
+    regions: Dict[str, int]
+    strategies: Dict[str, int]
+    strategy_regions: Dict[str, Dict[str, int]]  # aliases of one resource per strategy, by region
+    locals: Dict[str, Any]
+    locals_block: str
+    total_monthly_cost: Optional[float] = None
+    warnings: List[str] = []  # resources deployed with another strategy than they ask for
+
+
+@router.post("/preview", response_model=ExpansionPreviewResponse)
+async def preview_deployment(request: ExpansionPreviewRequest):
+    """
+    Count the concrete resources a deployment config produces, without generating
+
+    Counts come from each resource's strategy, never from expanded aliases or
+    rendered templates, so the cost is linear in resources. With a stack_type,
+    each resource is priced once per region and multiplied by its alias count.
+    """
+    try:
+        config = DeploymentConfig.from_dict(request.deployment_config)
+        resources = request.graph.get('resources', [])
+        preview = preview_expansion(resources, config)
+
+        domain_names = {d.get('id'): d.get('name') or d.get('id') for d in request.graph.get('domains', [])}
+        costs: List[Optional[float]] = [None] * len(resources)
+        if request.stack_type:
+            costs = CostEstimator().estimate_expansion_costs(
+                resources,
+                [preview.strategy_regions[entry['strategy']] for entry in preview.by_resource],
+                request.stack_type,
+                Scenario(request.scenario)
+            )
+
+        priced = [cost for cost in costs if cost is not None]
+        logger.info(f"Deployment preview: {preview.total_resources} resources expand to "
+                    f"{preview.total_aliases} aliases")
+
+        return ExpansionPreviewResponse(
+            total_resources=preview.total_resources,
+            total_aliases=preview.total_aliases,
+            resources=[
+                ResourceExpansionModel(
+                    id=entry['id'],
+                    name=entry['name'],
+                    type=entry['type'],
+                    domain=domain_names.get(entry['domain_id'], entry['domain_id']),
+                    strategy=entry['strategy'],
+                    aliases=entry['aliases'],
+                    monthly_cost=cost
+                )
+                for entry, cost in zip(preview.by_resource, costs)
+            ],
+            domains={
+                domain_names.get(domain_id, domain_id): aliases
+                for domain_id, aliases in preview.by_domain.items()
+            },
+            regions=preview.by_region,
+            strategies=preview.by_strategy,
+            strategy_regions=preview.strategy_regions,
+            locals=preview.locals,
+            locals_block=preview.locals_block,
+            total_monthly_cost=sum(priced) if request.stack_type else None,
+            warnings=preview.warnings
+        )
+    except ValueError as e:
+        logger.error(f"Deployment preview failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+
+
+@router.post("/cidr-plan", response_model=CidrPlanResponse)
+async def preview_cidr_plan(request: CidrPlanRequest):
+    """
+    Preview subnet CIDRs per region and AZ
+
+    Uses the same allocator as the generator: subnets are packed into each
+    regional VPC around the existing subnets, larger subnets first.
+    """
+    try:
+        config = DeploymentConfig.from_dict(request.deployment_config)
+        regions = config.regions()
+        vpc_cidrs = region_vpc_cidrs(list(regions), request.vpc_cidr, request.vpc_cidrs)
+
+        existing = [ipaddress.ip_network(cidr, strict=False) for cidr in request.existing_subnets]
+        overlaps = find_overlaps(existing)
+
+        plans = plan_subnets(
+            regions,
+            vpc_cidrs,
+            [SubnetRequest(**subnet.dict()) for subnet in request.subnets],
+            [str(network) for network in existing]
+        )
+        allocated = sum(len(plan.subnets) for plan in plans)
+        logger.info(f"CIDR plan: {allocated} subnets across {len(plans)} regions")
+
+        return CidrPlanResponse(
+            regions=[
+                RegionPlanModel(
+                    region=plan.region,
+                    vpc_cidr=plan.vpc_cidr,
+                    availability_zones=plan.availability_zones,
+                    subnets=[SubnetAllocationModel(**asdict(allocation)) for allocation in plan.subnets],
+                    free_addresses=plan.free_addresses
+                )
+                for plan in plans
+            ],
+            existing_overlaps=[[str(first), str(second)] for first, second in overlaps]
+        )
+    except ValueError as e:
+        logger.error(f"CIDR planning failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
@@ -1,14 +1,21 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, status
+from fastapi import APIRouter, HTTPException, UploadFile, File, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse, StreamingResponse
-from typing import List, Dict, Any
+from dataclasses import asdict
+from typing import List, Dict, Any, Optional, Union
 from pydantic import BaseModel
+import asyncio
 import logging
-import io
-import zipfile
 import re
+from urllib.parse import quote
 from app.core.graph import InfrastructureGraph
-from app.terraform.generator import TerraformGenerator
+from app.deployment import DeploymentConfig
+from app.terraform.archive import ARCHIVE_MEDIA_TYPES, stream_archive
+from app.terraform.generator import FILE_CACHE_SIZE, OUTPUT_FORMATS, TerraformGenerator, get_file_cache
 from app.terraform.parser import TerraformParser
+from app.terraform.sharding import ShardedGenerator, StateBackend
+from app.terraform.state_importer import StateImporter
+from app.utils.hash import hash_content
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -38,22 +45,144 @@ class TerraformProjectModel(BaseModel):
     root_main: str
     providers: str
     terraform_config: str
+    module_sources: Dict[str, str] = {}  # domain name -> module in `modules` (shared when identical)
+
+class ManifestFileModel(BaseModel):
+    path: str
+    hash: str
+    size: int
+    content: Optional[str] = None  # inline when the project has more files than the file cache holds
+
+class TerraformManifestModel(BaseModel):
+    files: List[ManifestFileModel]
+
+class TerraformFileModel(BaseModel):
+    hash: str
+    content: str
 
 class InfrastructureGraphModel(BaseModel):
     domains: List[Dict]
     resources: List[Dict]
     connections: List[Dict]
 
+class ImportedFileModel(BaseModel):
+    filename: str
+    resources: int
+    error: Optional[str] = None
+    cached: bool = False  # parse result reused from an earlier import of the same content
+
+class ImportResponseModel(InfrastructureGraphModel):
+    files: List[ImportedFileModel] = []  # per-file outcome, in merge (filename) order
+
+class GenerateRequestModel(InfrastructureGraphModel):
+    deployment_config: Optional[Dict[str, Any]] = None  # camelCase, expands per-AZ / regional resources
+
+class StateBackendModel(BaseModel):
+    type: str = 'local'  # 'local' or 's3'
+    bucket: Optional[str] = None
+    region: str = 'us-east-1'
+    key_prefix: str = 'terramod'
+    dynamodb_table: Optional[str] = None
+
+class ShardedGenerateRequestModel(BaseModel):
+    graph: InfrastructureGraphModel
+    groups: Optional[Dict[str, List[str]]] = None  # stack name -> domain ids or names
+    backend: Optional[StateBackendModel] = None
+    output_format: str = 'hcl'
+    compress: bool = False
+    deployment_config: Optional[Dict[str, Any]] = None
+
+class TerraformStackModel(BaseModel):
+    name: str
+    domains: List[str]
+    depends_on: List[str]
+
+class ShardedProjectModel(BaseModel):
+    stacks: List[TerraformStackModel]
+    apply_plan: List[List[str]]
+    files: Dict[str, str]
+
 class ExportRequestModel(BaseModel):
     graph: InfrastructureGraphModel
-    format: str  # 'zip' or 'directory'
+    format: str  # 'zip' or 'tar.gz'
+    output_format: str = 'hcl'  # 'hcl' or 'json' (.tf.json)
+    compress: bool = False  # fold identical resources into for_each blocks
+    deployment_config: Optional[Dict[str, Any]] = None  # camelCase, expands per-AZ / regional resources
+
+def deployment_from_request(deployment_config: Optional[Dict[str, Any]]) -> Optional[DeploymentConfig]:
+    """Deployment config from the frontend's camelCase dict, None when absent"""
+    return DeploymentConfig.from_dict(deployment_config) if deployment_config else None
+
+def module_cache_headers(module_cache_hits: Dict[str, bool]) -> Dict[str, str]:
+    """Per-module cache hit/miss report for response headers (names percent-encoded, headers are latin-1)"""
+    hits = sum(1 for hit in module_cache_hits.values() if hit)
+    return {
+        'X-Module-Cache': ', '.join(
+            f"{quote(name, safe='')}={'hit' if hit else 'miss'}" for name, hit in module_cache_hits.items()
+        ),
+        'X-Module-Cache-Hits': f"{hits}/{len(module_cache_hits)}"
+    }
+
+def build_manifest(files: Dict[str, str]) -> TerraformManifestModel:
+    """
+    Hash every file and keep its content in the file cache for per-file fetches
+    
+    A project larger than the cache would evict its own files before the
+    client fetched them, so its contents are returned inline instead.
+    """
+    inline = len(files) > FILE_CACHE_SIZE
+    file_cache = get_file_cache()
+    entries = []
+    for path, content in files.items():
+        content_hash = hash_content(content)
+        if not inline:
+            file_cache.set(content_hash, content)
+        entries.append(ManifestFileModel(
+            path=path,
+            hash=content_hash,
+            size=len(content.encode('utf-8')),
+            content=content if inline else None
+        ))
+    return TerraformManifestModel(files=entries)
 
-@router.post("/generate", response_model=TerraformProjectModel)
-async def generate_terraform(graph_data: InfrastructureGraphModel):
-    """Generate Terraform code from infrastructure graph"""
+def dependency_edge_headers(dependency_edges: int, removed_edges: int) -> Dict[str, str]:
+    """How many depends_on edges were dropped by transitive reduction"""
+    return {
+        'X-Dependency-Edges': f"{dependency_edges - removed_edges}/{dependency_edges}",
+        'X-Redundant-Edges-Removed': str(removed_edges)
+    }
+
+@router.post("/generate", response_model=Union[TerraformProjectModel, TerraformManifestModel])
+async def generate_terraform(
+    graph_data: GenerateRequestModel,
+    response: Response,
+    mode: str = 'full',
+    output_format: str = 'hcl',
+    compress: bool = False
+):
+    """
+    Generate Terraform code from infrastructure graph
+    
+    mode=manifest returns file paths with content hashes instead of file
+    contents; changed files are then fetched from /files/{hash}.
+    output_format=json emits Terraform JSON syntax (.tf.json) instead of HCL.
+    compress=true folds structurally identical resources into for_each blocks.
+    A deployment_config in the body expands per-AZ and regional resources.
+    """
+    if mode not in ('full', 'manifest'):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="mode must be 'full' or 'manifest'"
+        )
+    if output_format not in OUTPUT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"output_format must be one of {', '.join(OUTPUT_FORMATS)}"
+        )
+    
     try:
         # Convert camelCase to snake_case
-        graph_dict = graph_data.dict()
+        graph_dict = graph_data.dict(exclude={'deployment_config'})
         graph_dict_snake = convert_keys_to_snake(graph_dict)
         
         logger.info(f"Generating Terraform for {len(graph_dict_snake['resources'])} resources")
@@ -62,8 +191,20 @@ async def generate_terraform(graph_data: InfrastructureGraphModel):
         graph = InfrastructureGraph.from_dict(graph_dict_snake)
         
         # Generate Terraform
-        generator = TerraformGenerator()
+        generator = TerraformGenerator(
+            output_format=output_format,
+            compress=compress,
+            deployment=deployment_from_request(graph_data.deployment_config)
+        )
         terraform_project = generator.generate_project(graph)
+        response.headers.update(module_cache_headers(terraform_project.module_cache_hits))
+        response.headers.update(dependency_edge_headers(
+            terraform_project.dependency_edges,
+            terraform_project.removed_dependency_edges
+        ))
+        
+        if mode == 'manifest':
+            return build_manifest(terraform_project.files())
         
         return TerraformProjectModel(
             modules={
@@ -77,7 +218,8 @@ async def generate_terraform(graph_data: InfrastructureGraphModel):
             },
             root_main=terraform_project.root_main,
             providers=terraform_project.providers,
-            terraform_config=terraform_project.terraform_config
+            terraform_config=terraform_project.terraform_config,
+            module_sources=terraform_project.module_sources
         )
     except Exception as e:
         logger.error(f"Terraform generation failed: {e}", exc_info=True)
@@ -86,22 +228,95 @@ async def generate_terraform(graph_data: InfrastructureGraphModel):
             detail=str(e)
         )
 
-@router.post("/import", response_model=InfrastructureGraphModel)
+@router.post("/generate/sharded", response_model=ShardedProjectModel)
+async def generate_sharded(request: ShardedGenerateRequestModel):
+    """
+    Generate one root stack per domain (or per group of domains)
+    
+    Each stack has its own state; cross-stack references are read through
+    terraform_remote_state and apply_plan lists the stacks in dependency waves.
+    """
+    if request.output_format not in OUTPUT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"output_format must be one of {', '.join(OUTPUT_FORMATS)}"
+        )
+    
+    try:
+        graph_dict_snake = convert_keys_to_snake(request.graph.dict())
+        graph = InfrastructureGraph.from_dict(graph_dict_snake)
+        
+        backend = StateBackend(**request.backend.dict()) if request.backend else None
+        generator = ShardedGenerator(
+            output_format=request.output_format,
+            backend=backend,
+            compress=request.compress,
+            deployment=deployment_from_request(request.deployment_config)
+        )
+        project = generator.generate(graph, request.groups)
+        
+        return ShardedProjectModel(
+            stacks=[
+                TerraformStackModel(name=stack.name, domains=stack.domains, depends_on=stack.depends_on)
+                for stack in project.stacks.values()
+            ],
+            apply_plan=project.apply_plan,
+            files=project.files()
+        )
+    except Exception as e:
+        logger.error(f"Sharded generation failed: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+
+@router.get("/files/{content_hash}", response_model=TerraformFileModel)
+async def get_generated_file(content_hash: str, response: Response):
+    """Fetch a generated file by the content hash listed in a manifest"""
+    content = get_file_cache().get(content_hash)
+    if content is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"File {content_hash} is not in the generation cache; regenerate the manifest"
+        )
+    
+    # Content-addressed, so it never changes under the same URL
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    response.headers['ETag'] = f'"{content_hash}"'
+    return TerraformFileModel(hash=content_hash, content=content)
+
+@router.post("/import", response_model=ImportResponseModel)
 async def import_terraform(files: List[UploadFile] = File(...)):
-    """Import existing Terraform project"""
+    """
+    Import existing Terraform project
+    
+    Uploads are read concurrently and parsed off the event loop (in worker
+    processes for larger projects); files whose content was parsed before
+    come from the parse cache. Files that fail to decode or parse are
+    reported in `files` with their error; the rest are still imported.
+    """
     try:
-        # Read uploaded files
+        contents = await asyncio.gather(*(file.read() for file in files))
+        
         file_contents = {}
-        for file in files:
-            content = await file.read()
-            file_contents[file.filename] = content.decode('utf-8')
+        unreadable = []
+        for file, content in zip(files, contents):
+            try:
+                file_contents[file.filename] = content.decode('utf-8')
+            except UnicodeDecodeError as e:
+                logger.error(f"Failed to read {file.filename}: {e}")
+                unreadable.append(ImportedFileModel(filename=file.filename, resources=0, error=f"Not UTF-8: {e}"))
         
         # Parse Terraform
         parser = TerraformParser()
-        graph = parser.parse_project(file_contents)
+        result = await run_in_threadpool(parser.import_project, file_contents)
         
-        graph_dict = graph.to_dict()
-        return InfrastructureGraphModel(**graph_dict)
+        reports = [ImportedFileModel(**asdict(report)) for report in result.files] + unreadable
+        failed = sum(1 for report in reports if report.error)
+        logger.info(f"Terraform import: {len(result.graph.resources)} resources from "
+                    f"{len(reports) - failed} files ({result.cache_hits} cached), {failed} failed")
+        
+        return ImportResponseModel(**result.graph.to_dict(), files=sorted(reports, key=lambda r: r.filename))
     except Exception as e:
         logger.error(f"Terraform import failed: {e}")
         raise HTTPException(
@@ -109,9 +324,47 @@ async def import_terraform(files: List[UploadFile] = File(...)):
             detail=str(e)
         )
 
+@router.post("/import/state", response_model=ImportResponseModel)
+async def import_terraform_state(file: UploadFile = File(...)):
+    """
+    Import from a state file (terraform.tfstate) or `terraform show -json` output
+    
+    Accepts state and plan JSON. Resources keep their real addresses and
+    computed values, modules become domains, and recorded dependencies
+    become connections. Sensitive attributes are not imported.
+    """
+    try:
+        content = await file.read()
+        result = await run_in_threadpool(StateImporter().import_state, content, file.filename)
+        
+        logger.info(f"Terraform state import: {len(result.graph.resources)} resources, "
+                    f"{len(result.graph.connections)} connections from {file.filename}")
+        return ImportResponseModel(
+            **result.graph.to_dict(),
+            files=[ImportedFileModel(**asdict(report)) for report in result.files]
+        )
+    except Exception as e:
+        logger.error(f"Terraform state import failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+
 @router.post("/export")
 async def export_project(request: ExportRequestModel):
-    """Export Terraform project as ZIP or directory"""
+    """Export Terraform project as a streamed ZIP or tar.gz archive"""
+    archive_format = 'tar.gz' if request.format == 'tgz' else request.format
+    if archive_format not in ARCHIVE_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Supported formats are 'zip' and 'tar.gz'"
+        )
+    if request.output_format not in OUTPUT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"output_format must be one of {', '.join(OUTPUT_FORMATS)}"
+        )
+    
     try:
         # Convert camelCase to snake_case
         graph_dict = request.graph.dict()
@@ -120,39 +373,31 @@ async def export_project(request: ExportRequestModel):
         # Convert to graph
         graph = InfrastructureGraph.from_dict(graph_dict_snake)
         
-        # Generate Terraform
-        generator = TerraformGenerator()
-        terraform_project = generator.generate_project(graph)
-        
-        if request.format == 'zip':
-            # Create ZIP file in memory
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                # Add modules
-                for module_name, module in terraform_project.modules.items():
-                    zip_file.writestr(f"modules/{module_name}/main.tf", module.main_tf)
-                    zip_file.writestr(f"modules/{module_name}/variables.tf", module.variables_tf)
-                    zip_file.writestr(f"modules/{module_name}/outputs.tf", module.outputs_tf)
-                
-                # Add root files
-                zip_file.writestr("main.tf", terraform_project.root_main)
-                zip_file.writestr("providers.tf", terraform_project.providers)
-                zip_file.writestr("terraform.tf", terraform_project.terraform_config)
-            
-            zip_buffer.seek(0)
-            return StreamingResponse(
-                zip_buffer,
-                media_type="application/zip",
-                headers={"Content-Disposition": "attachment; filename=terraform-project.zip"}
-            )
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Only 'zip' format is supported"
-            )
+        # Wiring is checked before any header is sent; modules are rendered
+        # lazily while the archive is streamed out
+        generator = TerraformGenerator(
+            output_format=request.output_format,
+            compress=request.compress,
+            deployment=deployment_from_request(request.deployment_config)
+        )
+        files = generator.iter_project_files(graph)
     except Exception as e:
         logger.error(f"Export failed: {e}", exc_info=True)
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail=str(e)
-        )
\ No newline at end of file
+        )
+    
+    def archive_chunks():
+        try:
+            yield from stream_archive(files, archive_format)
+        except Exception as e:
+            # Headers are already sent; the client sees a truncated archive
+            logger.error(f"Export failed while streaming: {e}", exc_info=True)
+            raise
+    
+    return StreamingResponse(
+        archive_chunks(),
+        media_type=ARCHIVE_MEDIA_TYPES[archive_format],
+        headers={"Content-Disposition": f"attachment; filename=terraform-project.{archive_format}"}
+    )
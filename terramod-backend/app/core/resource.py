@@ -10,6 +10,7 @@ class Resource:
     name: str
     arguments: Dict[str, Any] = field(default_factory=dict)
     position: Position = field(default_factory=lambda: Position(0, 0))
+    deployment: Dict[str, Any] = field(default_factory=dict)  # e.g. {'strategy': 'per-az'}
     
     def set_argument(self, name: str, value: Any) -> None:
         """Set Terraform argument"""
@@ -27,7 +28,8 @@ class Resource:
             'domain_id': self.domain_id,
             'name': self.name,
             'arguments': self.arguments,
-            'position': {'x': self.position.x, 'y': self.position.y}
+            'position': {'x': self.position.x, 'y': self.position.y},
+            'deployment': self.deployment
         }
     
     @classmethod
@@ -39,5 +41,6 @@ class Resource:
             domain_id=data['domain_id'],
             name=data['name'],
             arguments=data.get('arguments', {}),
-            position=Position(**data.get('position', {'x': 0, 'y': 0}))
+            position=Position(**data.get('position', {'x': 0, 'y': 0})),
+            deployment=data.get('deployment') or {}
         )
@@ -4,7 +4,7 @@ Cost Estimation Module
 Provides cost estimation for AWS infrastructure with scenario-based modeling.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Dict, Optional
 from enum import Enum
 
@@ -26,6 +26,15 @@ class CostDriver:
     explanation: str
 
 
+@dataclass
+class AliasCost:
+    """Cost of one deployment alias (per-AZ or per-region copy) of a resource"""
+    alias: str
+    alias_type: str
+    region: str
+    monthly_cost: float
+
+
 @dataclass
 class ResourceCost:
     """Cost breakdown for a single resource"""
@@ -36,6 +45,7 @@ class ResourceCost:
     annual_cost: float
     cost_drivers: List[CostDriver]
     optimization_suggestions: List[str]
+    alias_costs: List[AliasCost] = field(default_factory=list)
 
 
 @dataclass
@@ -55,4 +65,5 @@ class CostEstimateReport:
     currency: str
     scenarios: Dict[str, ScenarioCost]
     free_tier_eligible: bool
-    optimization_recommendations: List[str]
\ No newline at end of file
+    optimization_recommendations: List[str]
+    warnings: List[str] = field(default_factory=list)  # resources priced with another deployment strategy
\ No newline at end of file
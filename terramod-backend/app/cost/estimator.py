@@ -4,14 +4,17 @@ Cost Estimation Engine
 Calculates infrastructure costs based on usage scenarios and AWS pricing.
 """
 
-from typing import Dict, List, Any
-from app.cost import Scenario, CostDriver, ResourceCost, ScenarioCost, CostEstimateReport
+from typing import Dict, List, Any, Optional, Tuple
+import json
+from app.cost import Scenario, CostDriver, ResourceCost, ScenarioCost, CostEstimateReport, AliasCost
 from app.cost.pricing import (
     get_ec2_price, get_rds_price, get_lambda_cost, get_s3_cost,
     get_dynamodb_cost, calculate_alb_cost, NAT_GATEWAY_PRICING,
     CLOUDWATCH_PRICING, EBS_PRICING, apply_regional_multiplier
 )
 from app.cost.assumptions import get_assumptions, get_optimization_recommendations
+from app.cost.price_table import get_price_table
+from app.deployment import DeploymentConfig, expand_infrastructure_for_deployment, strategy_warnings
 import logging
 
 logger = logging.getLogger(__name__)
@@ -29,7 +32,8 @@ class CostEstimator:
         graph: Dict[str, Any],
         stack_type: str,
         region: str = 'us-east-1',
-        currency: str = 'USD'
+        currency: str = 'USD',
+        deployment_config: Optional[DeploymentConfig] = None
     ) -> CostEstimateReport:
         """
         Estimate costs for all scenarios
@@ -39,6 +43,8 @@ class CostEstimator:
             stack_type: Stack template ID (e.g., '3-tier-web-app')
             region: AWS region
             currency: Target currency
+            deployment_config: Optional multi-AZ/region config; when given,
+                resources are priced per deployment alias
             
         Returns:
             Complete cost estimate report
@@ -46,13 +52,32 @@ class CostEstimator:
         self.region = region
         self.currency = currency
         
+        # Pick up a refreshed shared price file, if one was swapped in
+        price_table = get_price_table()
+        if price_table is not None:
+            price_table.refresh()
+        
         scenarios = {}
         
         # Calculate for each scenario
         for scenario in Scenario:
-            scenario_cost = self.estimate_scenario(graph, stack_type, scenario)
+            scenario_cost = self.estimate_scenario(graph, stack_type, scenario, deployment_config)
             scenarios[scenario.value] = scenario_cost
         
+        report = self.build_report(stack_type, region, currency, scenarios)
+        if deployment_config is not None:
+            report.warnings = strategy_warnings(graph.get('resources', []))
+        return report
+    
+    def build_report(
+        self,
+        stack_type: str,
+        region: str,
+        currency: str,
+        scenarios: Dict[str, ScenarioCost]
+    ) -> CostEstimateReport:
+        """Assemble the report from per-scenario costs"""
+        
         # Check free tier eligibility (idle scenario < $5/month)
         idle_cost = scenarios[Scenario.IDLE.value].total_monthly
         free_tier_eligible = idle_cost < 5.0
@@ -74,29 +99,32 @@ class CostEstimator:
         self,
         graph: Dict[str, Any],
         stack_type: str,
-        scenario: Scenario
+        scenario: Scenario,
+        deployment_config: Optional[DeploymentConfig] = None
     ) -> ScenarioCost:
         """Estimate costs for a specific scenario"""
         
         assumptions = get_assumptions(stack_type, scenario)
         resources = graph.get('resources', [])
         
-        resource_costs = []
-        total_monthly = 0.0
-        
-        # Estimate each resource
-        for resource in resources:
-            cost = self._estimate_resource_cost(
-                resource.get('type'),
-                resource.get('name', 'unknown'),
-                resource.get('arguments', {}),
-                assumptions
-            )
+        if deployment_config is not None:
+            resource_costs = self._estimate_deployed_costs(resources, assumptions, deployment_config)
+        else:
+            resource_costs = []
             
-            if cost:
-                resource_costs.append(cost)
-                total_monthly += cost.monthly_cost
+            # Estimate each resource
+            for resource in resources:
+                cost = self._estimate_resource_cost(
+                    resource.get('type'),
+                    resource.get('name', 'unknown'),
+                    resource.get('arguments', {}),
+                    assumptions
+                )
+                
+                if cost:
+                    resource_costs.append(cost)
         
+        total_monthly = sum(cost.monthly_cost for cost in resource_costs)
         total_annual = total_monthly * 12
         
         return ScenarioCost(
@@ -106,39 +134,169 @@ class CostEstimator:
             breakdown=resource_costs
         )
     
+    def _estimate_deployed_costs(
+        self,
+        resources: List[Dict[str, Any]],
+        assumptions: Dict[str, Any],
+        deployment_config: DeploymentConfig
+    ) -> List[ResourceCost]:
+        """
+        Price resources per deployment alias and roll aliases up to their base resource
+        
+        Aliases with the same type, arguments and pricing region are estimated
+        once; every further alias reuses that unit cost.
+        """
+        expansion = expand_infrastructure_for_deployment(
+            [{**r, 'id': r.get('id') or r.get('name', 'unknown'), 'name': r.get('name', 'unknown')}
+             for r in resources],
+            deployment_config
+        )
+        
+        # Per-AZ and single aliases run in the primary region, as in preview_expansion
+        base_region = deployment_config.primary_region
+        unit_costs: Dict[Tuple[str, str, str], Optional[ResourceCost]] = {}
+        rollups: Dict[str, List[Tuple[Dict[str, Any], ResourceCost, str]]] = {}
+        
+        for expanded in expansion['expanded_resources']:
+            alias = expanded['deployment_alias']
+            region = alias['alias_value'] if alias['alias_type'] == 'region' else base_region
+            arguments = expanded.get('arguments', {})
+            key = (expanded['type'], json.dumps(arguments, sort_keys=True, default=str), region)
+            
+            if key not in unit_costs:
+                unit_costs[key] = self._estimate_resource_cost(
+                    expanded['type'], expanded['name'], arguments, assumptions, region
+                )
+            
+            unit = unit_costs[key]
+            if unit:
+                rollups.setdefault(expanded['id'], []).append((alias, unit, region))
+        
+        
+        resource_costs = []
+        for resource in resources:
+            priced_aliases = rollups.get(resource.get('id') or resource.get('name', 'unknown'))
+            if priced_aliases:
+                resource_costs.append(self._roll_up_aliases(resource, priced_aliases))
+        
+        logger.info(f"Priced {expansion['deployment_metadata']['total_aliases']} deployment aliases "
+                   f"with {len(unit_costs)} unique estimates")
+        
+        return resource_costs
+    
+    def estimate_expansion_costs(
+        self,
+        resources: List[Dict[str, Any]],
+        region_counts: List[Dict[str, int]],
+        stack_type: str,
+        scenario: Scenario = Scenario.USERS_100
+    ) -> List[Optional[float]]:
+        """
+        Monthly cost of each resource across its aliases, from alias counts
+        
+        Each resource is priced once per region it is deployed to and the unit
+        cost multiplied by its alias count there, so no alias is expanded.
+        None for resources without a pricing model.
+        """
+        assumptions = get_assumptions(stack_type, scenario)
+        unit_costs: Dict[Tuple[str, str, str], Optional[ResourceCost]] = {}
+        costs: List[Optional[float]] = []
+        
+        for resource, regions in zip(resources, region_counts):
+            arguments = resource.get('arguments', {})
+            arguments_key = json.dumps(arguments, sort_keys=True, default=str)
+            monthly = None
+            for region, count in regions.items():
+                key = (resource.get('type'), arguments_key, region)
+                if key not in unit_costs:
+                    unit_costs[key] = self._estimate_resource_cost(
+                        resource.get('type'), resource.get('name', 'unknown'), arguments, assumptions, region
+                    )
+                unit = unit_costs[key]
+                if unit:
+                    monthly = (monthly or 0.0) + unit.monthly_cost * count
+            costs.append(monthly)
+        
+        return costs
+    
+    def _roll_up_aliases(
+        self,
+        resource: Dict[str, Any],
+        priced_aliases: List[Tuple[Dict[str, Any], ResourceCost, str]]
+    ) -> ResourceCost:
+        """Combine per-alias unit costs into a single cost for the base resource"""
+        # Unit costs may be shared with other resources of identical configuration,
+        # so identity comes from the base resource rather than the unit estimate
+        name = resource.get('name', 'unknown')
+        first = priced_aliases[0][1]
+        count = len(priced_aliases)
+        
+        drivers: Dict[str, CostDriver] = {}
+        for _, unit, _ in priced_aliases:
+            for driver in unit.cost_drivers:
+                if driver.name not in drivers:
+                    explanation = driver.explanation if count == 1 else f"{driver.explanation} × {count} aliases"
+                    drivers[driver.name] = CostDriver(driver.name, 0.0, 0.0, explanation)
+                drivers[driver.name].value += driver.value
+                drivers[driver.name].cost += driver.cost
+        
+        alias_costs = [
+            AliasCost(
+                alias=alias.get('terraform_name', name),
+                alias_type=alias.get('alias_type', 'none'),
+                region=region,
+                monthly_cost=unit.monthly_cost
+            )
+            for alias, unit, region in priced_aliases
+        ]
+        monthly_cost = sum(a.monthly_cost for a in alias_costs)
+        
+        return ResourceCost(
+            resource_id=name,
+            resource_type=first.resource_type,
+            resource_name=name,
+            monthly_cost=monthly_cost,
+            annual_cost=monthly_cost * 12,
+            cost_drivers=list(drivers.values()),
+            optimization_suggestions=first.optimization_suggestions,
+            alias_costs=alias_costs
+        )
+    
     def _estimate_resource_cost(
         self,
         resource_type: str,
         resource_name: str,
         arguments: Dict[str, Any],
-        assumptions: Dict[str, Any]
+        assumptions: Dict[str, Any],
+        region: Optional[str] = None
     ) -> ResourceCost | None:
-        """Estimate cost for a single resource"""
+        """Estimate cost for a single resource, in `region` (default: the estimator's region)"""
         
+        region = region or self.region
         try:
             if resource_type == 'aws_instance':
-                return self._estimate_ec2_cost(resource_name, arguments, assumptions)
+                return self._estimate_ec2_cost(resource_name, arguments, assumptions, region)
             
             elif resource_type == 'aws_db_instance':
-                return self._estimate_rds_cost(resource_name, arguments, assumptions)
+                return self._estimate_rds_cost(resource_name, arguments, assumptions, region)
             
             elif resource_type == 'aws_lambda_function':
-                return self._estimate_lambda_cost(resource_name, arguments, assumptions)
+                return self._estimate_lambda_cost(resource_name, arguments, assumptions, region)
             
             elif resource_type == 'aws_s3_bucket':
-                return self._estimate_s3_cost(resource_name, arguments, assumptions)
+                return self._estimate_s3_cost(resource_name, arguments, assumptions, region)
             
             elif resource_type == 'aws_dynamodb_table':
-                return self._estimate_dynamodb_cost(resource_name, arguments, assumptions)
+                return self._estimate_dynamodb_cost(resource_name, arguments, assumptions, region)
             
             elif resource_type in ['aws_lb', 'aws_alb']:
-                return self._estimate_alb_cost(resource_name, arguments, assumptions)
+                return self._estimate_alb_cost(resource_name, arguments, assumptions, region)
             
             elif resource_type == 'aws_nat_gateway':
-                return self._estimate_nat_cost(resource_name, arguments, assumptions)
+                return self._estimate_nat_cost(resource_name, arguments, assumptions, region)
             
             elif resource_type == 'aws_cloudwatch_log_group':
-                return self._estimate_cloudwatch_cost(resource_name, arguments, assumptions)
+                return self._estimate_cloudwatch_cost(resource_name, arguments, assumptions, region)
             
             else:
                 # Resource type not priced separately (e.g., security groups, IAM roles)
@@ -152,7 +310,8 @@ class CostEstimator:
         self,
         name: str,
         arguments: Dict[str, Any],
-        assumptions: Dict[str, Any]
+        assumptions: Dict[str, Any],
+        region: str
     ) -> ResourceCost:
         """Estimate EC2 instance costs"""
         
@@ -163,7 +322,7 @@ class CostEstimator:
         hours = assumptions.get('ec2_hours_per_month', 730)
         
         # EC2 compute cost
-        hourly_rate = get_ec2_price(instance_type, self.region)
+        hourly_rate = get_ec2_price(instance_type, region)
         compute_cost = hourly_rate * hours
         
         # EBS cost
@@ -209,7 +368,8 @@ class CostEstimator:
         self,
         name: str,
         arguments: Dict[str, Any],
-        assumptions: Dict[str, Any]
+        assumptions: Dict[str, Any],
+        region: str
     ) -> ResourceCost:
         """Estimate RDS costs"""
         
@@ -220,7 +380,7 @@ class CostEstimator:
         hours = assumptions.get('rds_hours_per_month', 730)
         
         # RDS instance cost
-        hourly_rate = get_rds_price(instance_class, self.region)
+        hourly_rate = get_rds_price(instance_class, region)
         if multi_az:
             hourly_rate *= 2  # Multi-AZ doubles cost
         instance_cost = hourly_rate * hours
@@ -274,7 +434,8 @@ class CostEstimator:
         self,
         name: str,
         arguments: Dict[str, Any],
-        assumptions: Dict[str, Any]
+        assumptions: Dict[str, Any],
+        region: str
     ) -> ResourceCost:
         """Estimate Lambda costs"""
         
@@ -285,7 +446,7 @@ class CostEstimator:
         # Calculate GB-seconds
         gb_seconds = (memory_mb / 1024) * (avg_duration_ms / 1000) * invocations
         
-        monthly_cost = get_lambda_cost(invocations, gb_seconds, self.region, include_free_tier=True)
+        monthly_cost = get_lambda_cost(invocations, gb_seconds, region, include_free_tier=True)
         
         cost_drivers = [
             CostDriver(
@@ -322,7 +483,8 @@ class CostEstimator:
         self,
         name: str,
         arguments: Dict[str, Any],
-        assumptions: Dict[str, Any]
+        assumptions: Dict[str, Any],
+        region: str
     ) -> ResourceCost:
         """Estimate S3 costs"""
         
@@ -333,7 +495,7 @@ class CostEstimator:
         
         monthly_cost = get_s3_cost(
             storage_gb, get_requests, put_requests, transfer_gb,
-            self.region, include_free_tier=True
+            region, include_free_tier=True
         )
         
         cost_drivers = [
@@ -377,7 +539,8 @@ class CostEstimator:
         self,
         name: str,
         arguments: Dict[str, Any],
-        assumptions: Dict[str, Any]
+        assumptions: Dict[str, Any],
+        region: str
     ) -> ResourceCost:
         """Estimate DynamoDB costs"""
         
@@ -385,7 +548,7 @@ class CostEstimator:
         writes = assumptions.get('dynamodb_writes', 1000)
         reads = assumptions.get('dynamodb_reads', 10000)
         
-        monthly_cost = get_dynamodb_cost(storage_gb, writes, reads, self.region, include_free_tier=True)
+        monthly_cost = get_dynamodb_cost(storage_gb, writes, reads, region, include_free_tier=True)
         
         cost_drivers = [
             CostDriver(
@@ -426,7 +589,8 @@ class CostEstimator:
         self,
         name: str,
         arguments: Dict[str, Any],
-        assumptions: Dict[str, Any]
+        assumptions: Dict[str, Any],
+        region: str
     ) -> ResourceCost:
         """Estimate Application Load Balancer costs"""
         
@@ -435,7 +599,7 @@ class CostEstimator:
         active_conns = assumptions.get('alb_active_connections', 100)
         processed_gb = assumptions.get('alb_processed_gb', 10)
         
-        monthly_cost = calculate_alb_cost(hours, new_conns, active_conns, int(processed_gb * 1024**3), self.region)
+        monthly_cost = calculate_alb_cost(hours, new_conns, active_conns, int(processed_gb * 1024**3), region)
         
         cost_drivers = [
             CostDriver(
@@ -466,7 +630,8 @@ class CostEstimator:
         self,
         name: str,
         arguments: Dict[str, Any],
-        assumptions: Dict[str, Any]
+        assumptions: Dict[str, Any],
+        region: str
     ) -> ResourceCost:
         """Estimate NAT Gateway costs"""
         
@@ -475,7 +640,7 @@ class CostEstimator:
         
         hour_cost = hours * NAT_GATEWAY_PRICING['hour']
         data_cost = data_gb * NAT_GATEWAY_PRICING['data_processed']
-        monthly_cost = apply_regional_multiplier(hour_cost + data_cost, self.region)
+        monthly_cost = apply_regional_multiplier(hour_cost + data_cost, region)
         
         cost_drivers = [
             CostDriver(
@@ -510,7 +675,8 @@ class CostEstimator:
         self,
         name: str,
         arguments: Dict[str, Any],
-        assumptions: Dict[str, Any]
+        assumptions: Dict[str, Any],
+        region: str
     ) -> ResourceCost:
         """Estimate CloudWatch Logs costs"""
         
@@ -520,7 +686,7 @@ class CostEstimator:
         log_ingestion_cost = max(0, log_gb - CLOUDWATCH_PRICING['free_tier_logs']) * CLOUDWATCH_PRICING['log_ingestion']
         log_storage_cost = log_gb * CLOUDWATCH_PRICING['log_storage']
         
-        monthly_cost = apply_regional_multiplier(log_ingestion_cost + log_storage_cost, self.region)
+        monthly_cost = apply_regional_multiplier(log_ingestion_cost + log_storage_cost, region)
         
         cost_drivers = [
             CostDriver(
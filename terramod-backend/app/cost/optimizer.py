@@ -0,0 +1,275 @@
+"""
+Constrained Cost Optimizer
+
+Searches instance types, Multi-AZ, storage and region for the cheapest graph
+that satisfies per-tier constraints, and returns the Pareto frontier of
+monthly cost against capacity headroom.
+
+Search strategy:
+    - infeasible candidates are pruned per resource (specs below the tier minimum)
+    - dominated candidates are pruned per resource (costlier without more headroom)
+    - regions whose every candidate costs at least as much as in another
+      region are pruned before the frontier is built
+    - the frontier is merged resource by resource, keeping only
+      non-dominated (cost, headroom) points, bucketed by headroom
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Tuple
+from app.cost import Scenario
+from app.cost.estimator import CostEstimator
+from app.cost.assumptions import get_assumptions
+from app.cost.pricing import (
+    EC2_PRICING, RDS_PRICING, EC2_SPECS, RDS_SPECS, get_regional_multiplier, is_known_region
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Resource type -> (argument holding the size, pricing table, specs table)
+SIZED_RESOURCES = {
+    'aws_instance': ('instance_type', EC2_PRICING, EC2_SPECS),
+    'aws_db_instance': ('instance_class', RDS_PRICING, RDS_SPECS),
+}
+
+MAX_FRONTIER_BUCKETS = 200
+
+
+@dataclass
+class TierConstraint:
+    """Requirements for every resource in a tier"""
+    min_vcpu: float = 0
+    min_memory_gib: float = 0
+    multi_az_required: bool = False
+    min_storage_gb: Optional[int] = None
+
+
+@dataclass
+class OptimizationConstraints:
+    """User constraints for the optimizer"""
+    tiers: Dict[str, TierConstraint] = field(default_factory=dict)
+    regions: List[str] = field(default_factory=lambda: ['us-east-1'])
+    scenario: Scenario = Scenario.USERS_100
+    region: str = 'us-east-1'  # where the graph runs today; prices current_monthly
+
+    def __post_init__(self):
+        unknown = [r for r in [self.region, *self.regions] if not is_known_region(r)]
+        if unknown:
+            raise ValueError(f"No pricing for region(s): {', '.join(dict.fromkeys(unknown))}")
+
+    def tier_for(self, resource: Dict[str, Any], domains: Dict[str, Dict[str, Any]]) -> TierConstraint:
+        """Resolve a resource's tier by domain id, domain name, domain type, then 'default'"""
+        domain = domains.get(resource.get('domain_id'), {})
+        for key in (resource.get('domain_id'), domain.get('name'), domain.get('type'), 'default'):
+            if key in self.tiers:
+                return self.tiers[key]
+        return TierConstraint()
+
+
+@dataclass
+class Candidate:
+    """One configuration of one resource"""
+    arguments: Dict[str, Any]
+    changes: Dict[str, Any]
+    headroom: float
+    cost: float = 0.0
+
+
+class CostOptimizer:
+    """Branch-and-bound search over resource configurations"""
+
+    def __init__(self):
+        self.estimator = CostEstimator()
+
+    def _cost(
+        self,
+        resource: Dict[str, Any],
+        arguments: Dict[str, Any],
+        assumptions: Dict[str, Any],
+        region: str
+    ) -> float:
+        cost = self.estimator._estimate_resource_cost(
+            resource.get('type'),
+            resource.get('name', 'unknown'),
+            arguments,
+            assumptions,
+            region
+        )
+        return cost.monthly_cost if cost else 0.0
+
+    def _candidates(self, resource: Dict[str, Any], tier: TierConstraint) -> List[Candidate]:
+        """Feasible configurations of a sized resource (region independent)"""
+        size_arg, pricing, specs = SIZED_RESOURCES[resource['type']]
+        arguments = resource.get('arguments', {})
+        is_db = resource['type'] == 'aws_db_instance'
+
+        multi_az_options = [True] if tier.multi_az_required else [False, True]
+        storage_options = [None]
+        if is_db:
+            # RDS storage can only grow, so the current size is the floor
+            current = arguments.get('allocated_storage', 20)
+            storage_options = [max(current, tier.min_storage_gb or 0)]
+
+        candidates = []
+        for size in pricing:
+            vcpu, memory = specs.get(size, (0, 0))
+            if vcpu < tier.min_vcpu or memory < tier.min_memory_gib:
+                continue
+            headroom = (vcpu - tier.min_vcpu) + (memory - tier.min_memory_gib)
+
+            for multi_az in (multi_az_options if is_db else [None]):
+                for storage in storage_options:
+                    changes = {size_arg: size}
+                    if multi_az is not None:
+                        changes['multi_az'] = multi_az
+                    if storage is not None:
+                        changes['allocated_storage'] = storage
+                    changes = {k: v for k, v in changes.items() if arguments.get(k) != v}
+                    candidates.append(Candidate(
+                        arguments={**arguments, **changes},
+                        changes=changes,
+                        headroom=headroom
+                    ))
+
+        return candidates
+
+    def optimize(
+        self,
+        graph: Dict[str, Any],
+        stack_type: str,
+        constraints: OptimizationConstraints
+    ) -> Dict[str, Any]:
+        """Find the cheapest feasible configuration and the cost/headroom frontier"""
+        resources = graph.get('resources', [])
+        domains = {d.get('id'): d for d in graph.get('domains', [])}
+        assumptions = get_assumptions(stack_type, constraints.scenario)
+
+        sized = [r for r in resources if r.get('type') in SIZED_RESOURCES]
+        fixed = [r for r in resources if r.get('type') not in SIZED_RESOURCES]
+
+        base_candidates = []
+        for resource in sized:
+            candidates = self._candidates(resource, constraints.tier_for(resource, domains))
+            if not candidates:
+                raise ValueError(f"No configuration of '{resource.get('name')}' satisfies its tier constraints")
+            base_candidates.append(candidates)
+
+        # Price every candidate in every region
+        priced: Dict[str, Tuple[float, List[List[Candidate]]]] = {}
+        for region in constraints.regions:
+            fixed_cost = sum(self._cost(r, r.get('arguments', {}), assumptions, region) for r in fixed)
+            per_resource = []
+            for resource, candidates in zip(sized, base_candidates):
+                per_resource.append([
+                    Candidate(c.arguments, c.changes, c.headroom, self._cost(resource, c.arguments, assumptions, region))
+                    for c in candidates
+                ])
+            priced[region] = (fixed_cost, per_resource)
+
+        regions = self._prune_regions(priced)
+
+        frontier: List[Tuple[float, float, str, Any]] = []
+        for region in regions:
+            fixed_cost, per_resource = priced[region]
+            for cost, headroom, choices in self._frontier(per_resource):
+                frontier.append((fixed_cost + cost, headroom, region, choices))
+        frontier = self._pareto(frontier)
+
+        current_cost = self._current_cost(resources, assumptions, constraints.region)
+
+        points = []
+        for cost, headroom, region, choices in frontier:
+            changes = {}
+            for resource, candidate in zip(sized, self._unwind(choices)):
+                if candidate.changes:
+                    changes[resource.get('id') or resource.get('name', 'unknown')] = candidate.changes
+            points.append({
+                'region': region,
+                'monthly_cost': cost,
+                'headroom': headroom,
+                'changes': changes
+            })
+
+        logger.info(f"Cost optimization: {len(sized)} sized resources, "
+                   f"{len(regions)}/{len(constraints.regions)} regions searched, "
+                   f"{len(points)} frontier points")
+
+        cheapest = points[0] if points else None
+        return {
+            'stack_type': stack_type,
+            'scenario': constraints.scenario.value,
+            'current_monthly': current_cost,
+            'cheapest': cheapest,
+            'savings_monthly': current_cost - cheapest['monthly_cost'] if cheapest else 0.0,
+            'frontier': points
+        }
+
+    def _current_cost(self, resources: List[Dict[str, Any]], assumptions: Dict[str, Any], region: str) -> float:
+        return sum(self._cost(r, r.get('arguments', {}), assumptions, region) for r in resources)
+
+    def _prune_regions(self, priced: Dict[str, Tuple[float, List[List[Candidate]]]]) -> List[str]:
+        """Drop regions where every candidate is at least as expensive as in a cheaper region"""
+        order = sorted(priced, key=get_regional_multiplier)
+        kept: List[str] = []
+        for region in order:
+            fixed_cost, per_resource = priced[region]
+            dominated = False
+            for other in kept:
+                other_fixed, other_per_resource = priced[other]
+                if fixed_cost >= other_fixed and all(
+                    c.cost >= o.cost
+                    for cands, other_cands in zip(per_resource, other_per_resource)
+                    for c, o in zip(cands, other_cands)
+                ):
+                    dominated = True
+                    break
+            if not dominated:
+                kept.append(region)
+        return kept
+
+    def _frontier(self, per_resource: List[List[Candidate]]) -> List[Tuple[float, float, Any]]:
+        """Merge per-resource candidates into non-dominated (cost, headroom) points"""
+        max_headroom = sum(max(c.headroom for c in cands) for cands in per_resource) or 1.0
+        bucket_size = max_headroom / MAX_FRONTIER_BUCKETS
+
+        # choices are a linked list (candidate, previous) to avoid copying assignments
+        frontier: List[Tuple[float, float, Any]] = [(0.0, 0.0, None)]
+        for candidates in per_resource:
+            candidates = self._prune_candidates(candidates)
+            buckets: Dict[int, Tuple[float, float, Any]] = {}
+            for cost, headroom, choices in frontier:
+                for candidate in candidates:
+                    point = (cost + candidate.cost, headroom + candidate.headroom, (candidate, choices))
+                    key = int(point[1] / bucket_size)
+                    best = buckets.get(key)
+                    if best is None or point[0] < best[0] or (point[0] == best[0] and point[1] > best[1]):
+                        buckets[key] = point
+            frontier = self._pareto(list(buckets.values()))
+        return frontier
+
+    @staticmethod
+    def _prune_candidates(candidates: List[Candidate]) -> List[Candidate]:
+        """Keep candidates that are not beaten on both cost and headroom"""
+        kept = []
+        for c in sorted(candidates, key=lambda c: (c.cost, -c.headroom)):
+            if not kept or c.headroom > kept[-1].headroom:
+                kept.append(c)
+        return kept
+
+    @staticmethod
+    def _pareto(points: List[tuple]) -> List[tuple]:
+        """Non-dominated points ordered by cost (lower cost, higher headroom wins)"""
+        kept = []
+        for point in sorted(points, key=lambda p: (p[0], -p[1])):
+            if not kept or point[1] > kept[-1][1]:
+                kept.append(point)
+        return kept
+
+    @staticmethod
+    def _unwind(choices: Any) -> List[Candidate]:
+        ordered = []
+        while choices is not None:
+            candidate, choices = choices
+            ordered.append(candidate)
+        ordered.reverse()
+        return ordered
@@ -0,0 +1,222 @@
+"""
+Shared Pricing Table
+
+Read-only, memory-mapped columnar price file shared by all uvicorn workers.
+
+File layout (little-endian):
+    header   magic 'TMPT', format u16, reserved u16, catalogue version u64,
+             row count u32, key blob length u32
+    offsets  u32[rows + 1]  - start of each key in the key blob
+    values   f64[rows]      - price column, 8-byte aligned
+    keys     utf-8 blob     - sorted '<table>/<key>' strings
+
+Columns are cast straight from the mapping, so files are only portable
+between little-endian hosts (every platform we deploy on).
+
+Rows are sorted by key, so lookups binary-search the mapped pages directly
+and no parse step is needed at startup. Pages live in the OS page cache and
+are shared between workers, keeping per-worker RSS flat as the catalogue grows.
+"""
+
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'TMPT'
+FORMAT_VERSION = 1
+_HEADER = struct.Struct('<4sHHQII')
+
+
+class _Snapshot:
+    """One mapped catalogue version; never modified once built"""
+
+    __slots__ = ('map', 'file_id', 'version', 'rows', 'offsets', 'values', 'keys')
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, fmt, _, version, rows, key_len = _HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            mapped.close()
+            raise ValueError(f"Not a Terramod price table: {path}")
+
+        view = memoryview(mapped)
+        offsets_start = _HEADER.size
+        values_start = offsets_start + 4 * (rows + 1)
+        values_start += -values_start % 8
+        keys_start = values_start + 8 * rows
+
+        self.map = mapped
+        self.file_id = (stat.st_ino, stat.st_mtime_ns)
+        self.version = version
+        self.rows = rows
+        self.offsets = view[offsets_start:offsets_start + 4 * (rows + 1)].cast('I')
+        self.values = view[values_start:keys_start].cast('d')
+        self.keys = view[keys_start:keys_start + key_len]
+
+    def key_at(self, idx: int) -> bytes:
+        return bytes(self.keys[self.offsets[idx]:self.offsets[idx + 1]])
+
+    def find(self, key: bytes) -> int:
+        lo, hi = 0, self.rows
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.rows and self.key_at(lo) == key:
+            return lo
+        return -1
+
+
+class PriceTable:
+    """
+    Zero-copy view over a memory-mapped price file
+
+    Each mapped version is a _Snapshot published with a single attribute
+    assignment, so a lookup racing a refresh reads one consistent version.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._snapshot = _Snapshot(path)
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    @property
+    def rows(self) -> int:
+        return self._snapshot.rows
+
+    def get(self, table: str, key: str, default: Optional[float] = None) -> Optional[float]:
+        """Look up a single price, e.g. get('ec2', 't3.micro')"""
+        snapshot = self._snapshot
+        idx = snapshot.find(f"{table}/{key}".encode('utf-8'))
+        if idx < 0:
+            return default
+        return snapshot.values[idx]
+
+    def refresh(self) -> bool:
+        """
+        Remap if the file was atomically replaced since it was opened.
+
+        Returns True when a new catalogue version was mapped. The previous
+        mapping is left to the garbage collector so in-flight lookups that
+        still hold the old snapshot stay valid.
+        """
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+
+        if (stat.st_ino, stat.st_mtime_ns) == self._snapshot.file_id:
+            return False
+
+        with self._lock:
+            previous = self._snapshot
+            if (stat.st_ino, stat.st_mtime_ns) == previous.file_id:
+                return False
+            self._snapshot = _Snapshot(self.path)
+            logger.info(f"Price table swapped: version {previous.version} -> {self._snapshot.version}")
+        return True
+
+
+def write_price_table(
+    path: str,
+    tables: Dict[str, Dict[str, float]],
+    version: Optional[int] = None
+) -> int:
+    """
+    Write a price file and atomically swap it into place.
+
+    The file is written next to the target and moved with os.replace, so
+    readers either see the old catalogue or the new one, never a partial file.
+
+    Returns:
+        The catalogue version written to the header
+    """
+    if version is None:
+        version = time.time_ns()
+
+    rows = sorted(
+        (f"{table}/{key}".encode('utf-8'), float(value))
+        for table, prices in tables.items()
+        for key, value in prices.items()
+    )
+
+    offsets = [0]
+    for key, _ in rows:
+        offsets.append(offsets[-1] + len(key))
+    key_blob = b''.join(key for key, _ in rows)
+
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, 0, version, len(rows), len(key_blob))
+    offsets_blob = struct.pack(f'<{len(offsets)}I', *offsets)
+    padding = b'\x00' * (-(len(header) + len(offsets_blob)) % 8)
+    values_blob = struct.pack(f'<{len(rows)}d', *(value for _, value in rows))
+
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(header + offsets_blob + padding + values_blob + key_blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, target)
+
+    logger.info(f"Wrote price table {path}: {len(rows)} prices, version {version}")
+    return version
+
+
+def iter_catalogue() -> Iterable[Tuple[str, Dict[str, float]]]:
+    """Yield the built-in pricing dicts as (table, prices) pairs"""
+    from app.cost import pricing
+
+    yield 'region', pricing.REGIONAL_MULTIPLIERS
+    yield 'ec2', pricing.EC2_PRICING
+    yield 'rds', pricing.RDS_PRICING
+    yield 'lambda', pricing.LAMBDA_PRICING
+    yield 's3', pricing.S3_PRICING
+    yield 'dynamodb', pricing.DYNAMODB_PRICING
+    yield 'alb', pricing.ALB_PRICING
+    yield 'nat', pricing.NAT_GATEWAY_PRICING
+    yield 'cloudwatch', pricing.CLOUDWATCH_PRICING
+    yield 'ebs', pricing.EBS_PRICING
+
+
+def export_builtin_catalogue(path: str, version: Optional[int] = None) -> int:
+    """Write the built-in pricing dicts to a shared price file"""
+    return write_price_table(path, dict(iter_catalogue()), version)
+
+
+# Process-wide table, mapped once per worker
+_shared_table: Optional[PriceTable] = None
+
+
+def load_price_table(path: str) -> PriceTable:
+    """Map the shared price file, exporting the built-in catalogue if missing"""
+    global _shared_table
+
+    if not Path(path).exists():
+        export_builtin_catalogue(path)
+
+    _shared_table = PriceTable(path)
+    logger.info(f"Mapped price table {path}: {_shared_table.rows} prices, "
+               f"version {_shared_table.version}")
+    return _shared_table
+
+
+def get_price_table() -> Optional[PriceTable]:
+    """Get the shared price table, or None when pricing uses the built-in dicts"""
+    return _shared_table
@@ -6,6 +6,7 @@ Last updated: 2025-01-28
 """
 
 from typing import Dict, Optional
+from app.cost.price_table import get_price_table
 
 # Regional pricing multipliers (relative to us-east-1)
 REGIONAL_MULTIPLIERS = {
@@ -40,6 +41,26 @@ RDS_PRICING = {
     'db.t3.large': 0.136,
 }
 
+# Instance specs (vCPU, memory GiB) used by the cost optimizer
+EC2_SPECS = {
+    't3.micro': (2, 1),
+    't3.small': (2, 2),
+    't3.medium': (2, 4),
+    't3.large': (2, 8),
+    't3.xlarge': (4, 16),
+    't4g.micro': (2, 1),
+    't4g.small': (2, 2),
+    't4g.medium': (2, 4),
+    't4g.large': (2, 8),
+}
+
+RDS_SPECS = {
+    'db.t3.micro': (2, 1),
+    'db.t3.small': (2, 2),
+    'db.t3.medium': (2, 4),
+    'db.t3.large': (2, 8),
+}
+
 # Lambda Pricing
 LAMBDA_PRICING = {
     'request': 0.20 / 1_000_000,  # Per request
@@ -106,17 +127,38 @@ EBS_PRICING = {
 }
 
 
+def _lookup(table: str, prices: Dict[str, float], key: str, default: float) -> float:
+    """Look up a price in the shared price table, falling back to the built-in dicts"""
+    shared = get_price_table()
+    if shared is not None:
+        return shared.get(table, key, default)
+    return prices.get(key, default)
+
+
+def is_known_region(region: str) -> bool:
+    """Whether the catalogue has a price multiplier for the region"""
+    shared = get_price_table()
+    if shared is not None:
+        return shared.get('region', region) is not None
+    return region in REGIONAL_MULTIPLIERS
+
+
+def get_regional_multiplier(region: str) -> float:
+    """Get pricing multiplier for a region (relative to us-east-1)"""
+    return _lookup('region', REGIONAL_MULTIPLIERS, region, 1.0)
+
+
 def get_ec2_price(instance_type: str, region: str = 'us-east-1') -> float:
     """Get EC2 instance price per hour"""
-    base_price = EC2_PRICING.get(instance_type, 0.0104)  # Default to t3.micro
-    multiplier = REGIONAL_MULTIPLIERS.get(region, 1.0)
+    base_price = _lookup('ec2', EC2_PRICING, instance_type, 0.0104)  # Default to t3.micro
+    multiplier = get_regional_multiplier(region)
     return base_price * multiplier
 
 
 def get_rds_price(instance_class: str, region: str = 'us-east-1') -> float:
     """Get RDS instance price per hour"""
-    base_price = RDS_PRICING.get(instance_class, 0.017)  # Default to db.t3.micro
-    multiplier = REGIONAL_MULTIPLIERS.get(region, 1.0)
+    base_price = _lookup('rds', RDS_PRICING, instance_class, 0.017)  # Default to db.t3.micro
+    multiplier = get_regional_multiplier(region)
     return base_price * multiplier
 
 
@@ -127,7 +169,7 @@ def get_lambda_cost(
     include_free_tier: bool = True
 ) -> float:
     """Calculate Lambda cost"""
-    multiplier = REGIONAL_MULTIPLIERS.get(region, 1.0)
+    multiplier = get_regional_multiplier(region)
     
     # Apply free tier
     if include_free_tier:
@@ -149,7 +191,7 @@ def get_s3_cost(
     include_free_tier: bool = True
 ) -> float:
     """Calculate S3 cost"""
-    multiplier = REGIONAL_MULTIPLIERS.get(region, 1.0)
+    multiplier = get_regional_multiplier(region)
     
     # Apply free tier
     if include_free_tier:
@@ -174,7 +216,7 @@ def get_dynamodb_cost(
     include_free_tier: bool = True
 ) -> float:
     """Calculate DynamoDB on-demand cost"""
-    multiplier = REGIONAL_MULTIPLIERS.get(region, 1.0)
+    multiplier = get_regional_multiplier(region)
     
     # Apply free tier
     if include_free_tier:
@@ -197,7 +239,7 @@ def calculate_alb_cost(
     region: str = 'us-east-1'
 ) -> float:
     """Calculate ALB cost including LCU calculation"""
-    multiplier = REGIONAL_MULTIPLIERS.get(region, 1.0)
+    multiplier = get_regional_multiplier(region)
     
     # Calculate LCU consumption
     # 1 LCU = 25 new connections/sec OR 3000 active connections/min OR 1GB/hour processed
@@ -216,7 +258,7 @@ def calculate_alb_cost(
 
 def apply_regional_multiplier(cost: float, region: str) -> float:
     """Apply regional pricing multiplier"""
-    return cost * REGIONAL_MULTIPLIERS.get(region, 1.0)
+    return cost * get_regional_multiplier(region)
 
 
 def convert_currency(usd_amount: float, target_currency: str) -> float:
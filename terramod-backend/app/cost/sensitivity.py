@@ -0,0 +1,236 @@
+"""
+Cost Sensitivity Analysis
+
+Ranks assumptions and priced arguments by how much they move total cost.
+
+Every resource is estimated once with the regular CostEstimator while
+recording which assumptions and arguments it reads. A perturbation then
+only re-estimates the resources that depend on the perturbed input and
+adjusts the base total, so all perturbations are evaluated in a single
+batched pass instead of one full estimate each.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple
+from app.cost import Scenario
+from app.cost.estimator import CostEstimator
+from app.cost.assumptions import get_assumptions
+from app.cost.pricing import EC2_PRICING, RDS_PRICING
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Priced arguments per resource type and how to perturb them
+PRICED_ARGUMENTS: Dict[str, Dict[str, str]] = {
+    'aws_instance': {
+        'instance_type': 'tier',
+        'ebs_volume_size': 'numeric',
+    },
+    'aws_db_instance': {
+        'instance_class': 'tier',
+        'allocated_storage': 'numeric',
+        'multi_az': 'toggle',
+    },
+    'aws_lambda_function': {
+        'memory_size': 'numeric',
+    },
+}
+
+TIER_PRICING: Dict[str, Dict[str, float]] = {
+    'instance_type': EC2_PRICING,
+    'instance_class': RDS_PRICING,
+}
+
+
+@dataclass
+class SensitivityEntry:
+    """One bar of the tornado chart"""
+    parameter: str
+    kind: str  # 'assumption' or 'argument'
+    resource_id: Optional[str]
+    base_value: Any
+    low_value: Any
+    high_value: Any
+    low_total: float
+    high_total: float
+    swing: float
+    elasticity: Optional[float]  # % cost change per % input change (numeric inputs only)
+
+    def to_dict(self) -> dict:
+        return {
+            'parameter': self.parameter,
+            'kind': self.kind,
+            'resource_id': self.resource_id,
+            'base_value': self.base_value,
+            'low_value': self.low_value,
+            'high_value': self.high_value,
+            'low_total': self.low_total,
+            'high_total': self.high_total,
+            'swing': self.swing,
+            'elasticity': self.elasticity
+        }
+
+
+class _RecordingDict(dict):
+    """Dict that records every key read through get(), with the value returned"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.reads: Dict[str, Any] = {}
+
+    def get(self, key, default=None):
+        value = super().get(key, default)
+        self.reads[key] = value
+        return value
+
+
+def _tier_neighbours(pricing: Dict[str, float], current: str) -> Tuple[Optional[str], Optional[str]]:
+    """Next cheaper and next pricier size within the same instance family"""
+    family = current.rsplit('.', 1)[0]
+    ladder = sorted(
+        (name for name in pricing if name.rsplit('.', 1)[0] == family),
+        key=lambda name: pricing[name]
+    )
+    if current not in ladder:
+        return None, None
+    idx = ladder.index(current)
+    lower = ladder[idx - 1] if idx > 0 else None
+    upper = ladder[idx + 1] if idx + 1 < len(ladder) else None
+    return lower, upper
+
+
+class SensitivityAnalyzer:
+    """Batched one-at-a-time perturbation of cost inputs"""
+
+    def __init__(self, region: str = 'us-east-1'):
+        self.estimator = CostEstimator()
+        self.estimator.region = region
+
+    def _cost(self, resource: Dict[str, Any], arguments: Dict[str, Any], assumptions: Dict[str, Any]) -> float:
+        cost = self.estimator._estimate_resource_cost(
+            resource.get('type'),
+            resource.get('name', 'unknown'),
+            arguments,
+            assumptions
+        )
+        return cost.monthly_cost if cost else 0.0
+
+    def analyze(
+        self,
+        graph: Dict[str, Any],
+        stack_type: str,
+        scenario: Scenario = Scenario.USERS_100,
+        step: float = 0.1
+    ) -> Dict[str, Any]:
+        """
+        Perturb every numeric assumption by ±step and every priced argument
+        to its neighbouring values, ranked by the swing in total monthly cost
+        """
+        assumptions = get_assumptions(stack_type, scenario)
+        resources = graph.get('resources', [])
+
+        # Base pass: estimate once, recording what each resource depends on
+        base_costs: List[float] = []
+        argument_reads: List[Dict[str, Any]] = []
+        dependents: Dict[str, List[int]] = {}
+
+        for idx, resource in enumerate(resources):
+            recorded_assumptions = _RecordingDict(assumptions)
+            recorded_arguments = _RecordingDict(resource.get('arguments', {}))
+            base_costs.append(self._cost(resource, recorded_arguments, recorded_assumptions))
+            argument_reads.append(recorded_arguments.reads)
+            for key in recorded_assumptions.reads:
+                dependents.setdefault(key, []).append(idx)
+
+        base_total = sum(base_costs)
+
+        def total_with(indices: List[int], arguments_for, assumptions_for) -> float:
+            total = base_total
+            for i in indices:
+                total += self._cost(resources[i], arguments_for(i), assumptions_for) - base_costs[i]
+            return total
+
+        entries: List[SensitivityEntry] = []
+
+        # Assumption perturbations only touch resources that read the key
+        for key, value in assumptions.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or key not in dependents:
+                continue
+            indices = dependents[key]
+            low_value, high_value = value * (1 - step), value * (1 + step)
+            original_arguments = lambda i: resources[i].get('arguments', {})  # noqa: E731
+            low_total = total_with(indices, original_arguments, {**assumptions, key: low_value})
+            high_total = total_with(indices, original_arguments, {**assumptions, key: high_value})
+            entries.append(self._entry(key, 'assumption', None, value, low_value, high_value,
+                                       low_total, high_total, base_total, step))
+
+        # Argument perturbations only touch the owning resource
+        for idx, resource in enumerate(resources):
+            priced = PRICED_ARGUMENTS.get(resource.get('type'), {})
+            arguments = resource.get('arguments', {})
+            resource_id = resource.get('id') or resource.get('name', 'unknown')
+
+            for arg_name, kind in priced.items():
+                if arg_name not in argument_reads[idx]:
+                    continue
+                value = argument_reads[idx][arg_name]
+
+                if kind == 'numeric':
+                    if isinstance(value, bool) or not isinstance(value, (int, float)):
+                        continue
+                    low_value, high_value = value * (1 - step), value * (1 + step)
+                elif kind == 'tier':
+                    lower, upper = _tier_neighbours(TIER_PRICING[arg_name], str(value))
+                    low_value, high_value = lower or value, upper or value
+                else:
+                    low_value, high_value = False, True
+
+                low_total = total_with([idx], lambda i: {**arguments, arg_name: low_value}, assumptions)
+                high_total = total_with([idx], lambda i: {**arguments, arg_name: high_value}, assumptions)
+                entries.append(self._entry(arg_name, 'argument', resource_id, value, low_value,
+                                           high_value, low_total, high_total, base_total,
+                                           step if kind == 'numeric' else None))
+
+        entries = [e for e in entries if e.swing > 0]
+        entries.sort(key=lambda e: e.swing, reverse=True)
+
+        logger.info(f"Sensitivity analysis: {len(resources)} resources, "
+                   f"{len(entries)} influential inputs")
+
+        return {
+            'stack_type': stack_type,
+            'scenario': scenario.value,
+            'step': step,
+            'base_monthly': base_total,
+            'entries': [e.to_dict() for e in entries]
+        }
+
+    def _entry(
+        self,
+        parameter: str,
+        kind: str,
+        resource_id: Optional[str],
+        base_value: Any,
+        low_value: Any,
+        high_value: Any,
+        low_total: float,
+        high_total: float,
+        base_total: float,
+        step: Optional[float]
+    ) -> SensitivityEntry:
+        elasticity = None
+        if step and base_total > 0:
+            elasticity = ((high_total - low_total) / base_total) / (2 * step)
+
+        return SensitivityEntry(
+            parameter=parameter,
+            kind=kind,
+            resource_id=resource_id,
+            base_value=base_value,
+            low_value=low_value,
+            high_value=high_value,
+            low_total=low_total,
+            high_total=high_total,
+            swing=abs(high_total - low_total),
+            elasticity=elasticity
+        )
@@ -0,0 +1,178 @@
+"""
+Incremental Cost Sessions
+
+Keeps per-resource cost results between edits so a graph delta only
+re-estimates the resources that actually changed.
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+from app.cost import Scenario, ResourceCost, ScenarioCost, CostEstimateReport
+from app.cost.estimator import CostEstimator
+from app.cost.assumptions import get_assumptions
+from app.cost.price_table import get_price_table
+from app.utils.hash import hash_resource
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (resource content hash, stack_type, region, scenario)
+CostKey = Tuple[str, str, str, str]
+
+
+def _resource_key(resource: Dict[str, Any]) -> str:
+    """Identify a resource across graph versions"""
+    resource_id = resource.get('id')
+    if not resource_id:
+        raise ValueError(f"Resource {resource.get('name', 'unknown')} has no id")
+    return resource_id
+
+
+def format_cost_delta(delta: float) -> str:
+    """Format a monthly cost change for display, e.g. '+$42.10/mo'"""
+    sign = '-' if delta < -0.005 else '+'
+    return f"{sign}${abs(delta):,.2f}/mo"
+
+
+class CostSession:
+    """Incremental cost estimation over successive versions of one graph"""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.estimator = CostEstimator()
+        self._cache: Dict[CostKey, Optional[ResourceCost]] = {}
+        self._context: Optional[Tuple[str, str]] = None
+        self._hashes: Dict[str, str] = {}
+        self._costs: Dict[str, Dict[str, Optional[ResourceCost]]] = {}
+        self._totals: Dict[str, float] = {}
+
+    def update(
+        self,
+        graph: Dict[str, Any],
+        stack_type: str,
+        region: str = 'us-east-1',
+        currency: str = 'USD'
+    ) -> Dict[str, Any]:
+        """
+        Apply a new version of the graph and re-estimate only what changed
+
+        Returns:
+            Dict with the full report, per-scenario deltas against the previous
+            version and the number of resources that were re-estimated
+        """
+        self.estimator.region = region
+        self.estimator.currency = currency
+
+        # A swapped price file invalidates everything computed so far
+        price_table = get_price_table()
+        if price_table is not None and price_table.refresh():
+            self._cache.clear()
+            self._context = None
+
+        # Totals only carry over within the same stack type and region
+        if self._context != (stack_type, region):
+            self._context = (stack_type, region)
+            self._hashes = {}
+            self._costs = {s.value: {} for s in Scenario}
+            self._totals = {s.value: 0.0 for s in Scenario}
+
+        previous_totals = dict(self._totals)
+
+        resources = graph.get('resources', [])
+        hashes = {_resource_key(r): hash_resource(r) for r in resources}
+        if len(hashes) != len(resources):
+            raise ValueError("Resource ids must be unique within a cost session")
+
+        changed = [r for r in resources
+                   if self._hashes.get(_resource_key(r)) != hashes[_resource_key(r)]]
+        removed = [key for key in self._hashes if key not in hashes]
+
+        recomputed = 0
+        for scenario in Scenario:
+            costs = self._costs[scenario.value]
+            total = self._totals[scenario.value]
+            assumptions = None
+
+            for resource_key in removed:
+                old = costs.pop(resource_key, None)
+                if old:
+                    total -= old.monthly_cost
+
+            for resource in changed:
+                resource_key = _resource_key(resource)
+                cache_key = (hashes[resource_key], stack_type, region, scenario.value)
+
+                if cache_key in self._cache:
+                    cost = self._cache[cache_key]
+                else:
+                    if assumptions is None:
+                        assumptions = get_assumptions(stack_type, scenario)
+                    cost = self.estimator._estimate_resource_cost(
+                        resource.get('type'),
+                        resource.get('name', 'unknown'),
+                        resource.get('arguments', {}),
+                        assumptions
+                    )
+                    self._cache[cache_key] = cost
+                    recomputed += 1
+
+                old = costs.get(resource_key)
+                if old:
+                    total -= old.monthly_cost
+                if cost:
+                    total += cost.monthly_cost
+                costs[resource_key] = cost
+
+            self._totals[scenario.value] = total
+
+        self._prune_cache(set(self._hashes.values()) | set(hashes.values()), stack_type, region)
+        self._hashes = hashes
+
+        report = self._build_report(resources, stack_type, region, currency)
+        deltas = {
+            key: self._totals[key] - previous_totals.get(key, 0.0)
+            for key in self._totals
+        }
+
+        logger.info(f"Cost session {self.session_id}: {len(changed)} changed, "
+                   f"{len(removed)} removed, {recomputed} estimates recomputed")
+
+        return {
+            'report': report,
+            'deltas': deltas,
+            'changed_resources': len(changed) + len(removed),
+            'recomputed': recomputed
+        }
+
+    def _build_report(
+        self,
+        resources: List[Dict[str, Any]],
+        stack_type: str,
+        region: str,
+        currency: str
+    ) -> CostEstimateReport:
+        """Assemble a report from the cached per-resource costs, in graph order"""
+        scenarios = {}
+        for scenario in Scenario:
+            costs = self._costs[scenario.value]
+            breakdown = []
+            for resource in resources:
+                cost = costs.get(_resource_key(resource))
+                if cost:
+                    breakdown.append(cost)
+
+            total_monthly = self._totals[scenario.value]
+            scenarios[scenario.value] = ScenarioCost(
+                scenario=scenario,
+                total_monthly=total_monthly,
+                total_annual=total_monthly * 12,
+                breakdown=breakdown
+            )
+
+        return self.estimator.build_report(stack_type, region, currency, scenarios)
+
+    def _prune_cache(self, live: set, stack_type: str, region: str) -> None:
+        """Drop cached results outside the current and previous graph versions (keeps undo cheap)"""
+        self._cache = {
+            key: cost for key, cost in self._cache.items()
+            if key[0] in live and key[1] == stack_type and key[2] == region
+        }
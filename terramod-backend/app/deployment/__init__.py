@@ -5,9 +5,11 @@ This module handles the expansion of resource deployment strategies into
 concrete Terraform resources with proper for_each or count expressions.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
 from enum import Enum
+from app.deployment.cidr import CidrAllocator, DEFAULT_SUBNET_PREFIX
+from app.terraform.hcl import HCLWriter
 
 class DeploymentStrategy(str, Enum):
     SINGLE = 'single'
@@ -15,6 +17,59 @@ class DeploymentStrategy(str, Enum):
     MULTI_AZ = 'multi-az'
     REGIONAL = 'regional'
 
+# Resource types with an `availability_zone` argument; only these can be placed per AZ
+AZ_RESOURCE_TYPES = frozenset({
+    'aws_subnet',
+    'aws_default_subnet',
+    'aws_instance',
+    'aws_spot_instance_request',
+    'aws_ebs_volume',
+    'aws_db_instance',
+    'aws_elasticache_cluster',
+    'aws_redshift_cluster',
+    'aws_dms_replication_instance',
+    'aws_ec2_capacity_reservation',
+    'aws_ec2_host',
+    'aws_lightsail_instance',
+})
+
+# Resource types without an availability_zone argument that can still be deployed
+# per AZ: each instance lands in the AZ of the per-AZ subnet the argument names
+# (None: nothing to place, e.g. one Elastic IP per AZ for the NAT gateways)
+AZ_PLACEMENT_ARGUMENTS = {
+    'aws_nat_gateway': 'subnet_id',
+    'aws_eip': None,
+}
+
+# Regional expansion sets the per-resource `region` argument, added in AWS provider 6.0
+AWS_PROVIDER_VERSION = '~> 5.0'
+REGIONAL_AWS_PROVIDER_VERSION = '~> 6.0'
+
+def effective_strategy(strategy: DeploymentStrategy, resource_type: str) -> DeploymentStrategy:
+    """The strategy a resource is actually deployed with: per-AZ needs an AZ or a subnet to place it"""
+    if (strategy == DeploymentStrategy.PER_AZ and resource_type not in AZ_RESOURCE_TYPES
+            and resource_type not in AZ_PLACEMENT_ARGUMENTS):
+        return DeploymentStrategy.SINGLE
+    return strategy
+
+def strategy_warning(resource_type: str, name: str, requested: DeploymentStrategy) -> Optional[str]:
+    """Why a resource is not deployed with the strategy it asks for, None when it is"""
+    effective = effective_strategy(requested, resource_type)
+    if effective == requested:
+        return None
+    return (f"{resource_type}.{name} cannot be placed in an availability zone, "
+            f"deployed as '{effective.value}' instead of '{requested.value}'")
+
+def strategy_warnings(resources: List[Dict[str, Any]]) -> List[str]:
+    """strategy_warning for every resource deployed with another strategy than it asks for"""
+    warnings = []
+    for resource in resources:
+        requested = DeploymentStrategy((resource.get('deployment') or {}).get('strategy', 'single'))
+        warning = strategy_warning(resource.get('type'), resource.get('name', 'unknown'), requested)
+        if warning:
+            warnings.append(warning)
+    return warnings
+
 @dataclass
 class DeploymentAlias:
     """Represents a specific instance in a deployment"""
@@ -58,6 +113,25 @@ class DeploymentConfig:
     primary_region: str
     availability_zones: List[str]
     replica_regions: Optional[List[Dict[str, Any]]] = None
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DeploymentConfig':
+        """Deserialize deployment config (frontend camelCase keys)"""
+        return cls(
+            primary_region=data.get('primaryRegion', 'us-east-1'),
+            availability_zones=data.get('availabilityZones', ['us-east-1a', 'us-east-1b', 'us-east-1c']),
+            replica_regions=data.get('replicaRegions')
+        )
+    
+    def regions(self) -> Dict[str, List[str]]:
+        """Availability zones by region, primary region first"""
+        regions = {self.primary_region: list(self.availability_zones)}
+        suffixes = [az[len(self.primary_region):] for az in self.availability_zones if az.startswith(self.primary_region)]
+        for replica in self.replica_regions or []:
+            region = replica['region']
+            # Replicas without their own AZ list mirror the primary's AZ letters
+            regions[region] = list(replica.get('azs') or [f"{region}{suffix}" for suffix in suffixes])
+        return regions
 
 class DeploymentExpander:
     """Expands deployment strategies into concrete resource instances"""
@@ -135,47 +209,80 @@ class DeploymentExpander:
         else:
             raise ValueError(f"Unknown deployment strategy: {strategy}")
     
+    def alias_count(self, strategy: DeploymentStrategy) -> int:
+        """Number of aliases expand_resource returns for a strategy"""
+        return sum(self.region_counts(strategy).values())
+    
+    def region_counts(self, strategy: DeploymentStrategy) -> Dict[str, int]:
+        """Aliases expand_resource returns for a strategy, by region"""
+        if strategy == DeploymentStrategy.PER_AZ:
+            return {self.config.primary_region: len(self.config.availability_zones)}
+        elif strategy == DeploymentStrategy.REGIONAL:
+            counts = {self.config.primary_region: 1}
+            for replica in self.config.replica_regions or []:
+                counts[replica['region']] = counts.get(replica['region'], 0) + 1
+            return counts
+        return {self.config.primary_region: 1}
+    
     def generate_terraform_expression(
         self,
         strategy: DeploymentStrategy,
         resource_type: str,
-        base_arguments: Dict[str, Any]
+        base_arguments: Dict[str, Any],
+        az_subnets: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Generate the appropriate Terraform meta-argument (for_each, count)
         for a given deployment strategy.
+        
+        Values are "${...}" expressions. az_subnets is the address of a
+        per-AZ subnet block that multi-AZ load balancers spread across and
+        per-AZ NAT gateways without a subnet_id are placed in.
         """
         
         if strategy == DeploymentStrategy.SINGLE:
             return {}  # No meta-arguments needed
         
         elif strategy == DeploymentStrategy.PER_AZ:
-            return {
-                'for_each': 'toset(local.availability_zones)',
-                'availability_zone': 'each.value',
-                'tags': {
-                    **base_arguments.get('tags', {}),
-                    'AZ': '${each.value}'
-                }
+            tags = {
+                **base_arguments.get('tags', {}),
+                'AZ': '${each.value}'
             }
+            if resource_type in AZ_RESOURCE_TYPES:
+                return {
+                    'for_each': '${toset(local.availability_zones)}',
+                    'availability_zone': '${each.value}',
+                    'tags': tags
+                }
+            if resource_type in AZ_PLACEMENT_ARGUMENTS:
+                meta = {'for_each': '${toset(local.availability_zones)}', 'tags': tags}
+                argument = AZ_PLACEMENT_ARGUMENTS[resource_type]
+                if argument and argument not in base_arguments and az_subnets:
+                    # Per-AZ subnets are keyed by AZ, like this resource's instances
+                    meta[argument] = f'${{{az_subnets}[each.key].id}}'
+                return meta
+            return {}
         
         elif strategy == DeploymentStrategy.MULTI_AZ:
             # For resources like ALB, RDS that span AZs
             if resource_type in ['aws_lb', 'aws_alb', 'aws_nlb']:
-                return {
-                    'subnets': '${[for s in aws_subnet.main : s.id]}'
-                }
+                if az_subnets and 'subnets' not in base_arguments:
+                    return {
+                        'subnets': f'${{[for s in {az_subnets} : s.id]}}'
+                    }
+                return {}
             elif resource_type == 'aws_rds_cluster':
                 return {
-                    'availability_zones': 'local.availability_zones'
+                    'availability_zones': '${local.availability_zones}'
                 }
             else:
                 return {}
         
         elif strategy == DeploymentStrategy.REGIONAL:
+            # Per-resource region needs REGIONAL_AWS_PROVIDER_VERSION
             return {
-                'for_each': 'toset(local.regions)',
-                'region': 'each.value',
+                'for_each': '${toset(local.regions)}',
+                'region': '${each.value}',
                 'tags': {
                     **base_arguments.get('tags', {}),
                     'Region': '${each.value}'
@@ -185,46 +292,42 @@ class DeploymentExpander:
         else:
             return {}
     
-    def generate_locals_block(self) -> str:
-        """Generate Terraform locals block with AZ/region configuration"""
-        lines = ['locals {']
-        lines.append(f'  availability_zones = {self._to_terraform_list(self.config.availability_zones)}')
-        lines.append(f'  az_count = length(local.availability_zones)')
-        lines.append(f'  primary_region = "{self.config.primary_region}"')
-        
+    def locals_map(self) -> Dict[str, Any]:
+        """Locals the generated expressions can reference, by name"""
+        regions = [self.config.primary_region]
         if self.config.replica_regions:
-            regions = [self.config.primary_region] + [r['region'] for r in self.config.replica_regions]
-            lines.append(f'  regions = {self._to_terraform_list(regions)}')
-        
-        lines.append('}')
-        return '\n'.join(lines)
+            regions.extend(r['region'] for r in self.config.replica_regions)
+        return {
+            'availability_zones': list(self.config.availability_zones),
+            'az_count': '${length(local.availability_zones)}',
+            'primary_region': self.config.primary_region,
+            'regions': regions
+        }
     
-    def _to_terraform_list(self, items: List[str]) -> str:
-        """Convert Python list to Terraform list syntax"""
-        quoted = [f'"{item}"' for item in items]
-        return f'[{", ".join(quoted)}]'
+    def generate_locals_block(self) -> str:
+        """Generate Terraform locals block with AZ/region configuration (rendered from locals_map)"""
+        writer = HCLWriter()
+        writer.block('locals', [], self.locals_map())
+        return writer.getvalue().rstrip('\n')
     
     def generate_cidr_calculations(
         self,
         vpc_cidr: str,
-        resource_name: str
+        resource_name: str,
+        prefix_length: int = DEFAULT_SUBNET_PREFIX,
+        existing: Optional[List[str]] = None
     ) -> Dict[str, str]:
         """
         Generate CIDR calculations for per-AZ subnets.
         
-        Returns a dict mapping AZ names to CIDR blocks.
+        Returns a dict mapping AZ names to CIDR blocks packed into the VPC
+        around any existing subnets (see app.deployment.cidr).
         """
-        # Extract base octets from VPC CIDR
-        base_ip = vpc_cidr.split('/')[0]
-        octets = base_ip.split('.')
-        
-        cidrs = {}
-        for idx, az in enumerate(self.config.availability_zones):
-            new_octets = octets.copy()
-            new_octets[2] = str(int(octets[2]) + idx)
-            cidrs[az] = f"{'.'.join(new_octets)}/24"
-        
-        return cidrs
+        allocator = CidrAllocator(vpc_cidr, existing or [])
+        return {
+            az: str(allocator.allocate(prefix_length))
+            for az in self.config.availability_zones
+        }
     
     def generate_subnet_terraform(
         self,
@@ -249,6 +352,80 @@ class DeploymentExpander:
         ]
         return '\n'.join(lines)
 
+@dataclass
+class ExpansionPreview:
+    """What a deployment config expands a graph into, counted without expanding it"""
+    total_resources: int
+    total_aliases: int
+    by_resource: List[Dict[str, Any]]  # id, name, type, domain_id, strategy, aliases
+    by_domain: Dict[str, int]
+    by_region: Dict[str, int]
+    by_strategy: Dict[str, int]
+    strategy_regions: Dict[str, Dict[str, int]]  # aliases of one resource, by strategy and region
+    locals: Dict[str, Any]
+    locals_block: str
+    warnings: List[str] = field(default_factory=list)  # resources deployed with another strategy
+
+
+def preview_expansion(
+    resources: List[Dict[str, Any]],
+    deployment_config: DeploymentConfig
+) -> ExpansionPreview:
+    """
+    Count the aliases each resource expands into, per resource, domain and region.
+    
+    Counts come from the strategy alone (one region breakdown per strategy),
+    so the cost is linear in resources however many aliases they expand to.
+    """
+    expander = DeploymentExpander(deployment_config)
+    strategy_regions = {strategy.value: expander.region_counts(strategy) for strategy in DeploymentStrategy}
+    totals = {strategy: sum(regions.values()) for strategy, regions in strategy_regions.items()}
+    
+    by_resource = []
+    by_domain: Dict[str, int] = {}
+    strategy_resources: Dict[str, int] = {}
+    warnings: List[str] = []
+    for resource in resources:
+        strategy = (resource.get('deployment') or {}).get('strategy', 'single')
+        if strategy not in totals:
+            raise ValueError(f"Unknown deployment strategy: {strategy}")
+        warning = strategy_warning(resource.get('type'), resource.get('name', 'unknown'), DeploymentStrategy(strategy))
+        if warning:
+            warnings.append(warning)
+        strategy = effective_strategy(DeploymentStrategy(strategy), resource.get('type')).value
+        aliases = totals[strategy]
+        domain_id = resource.get('domain_id') or resource.get('domainId') or ''
+        by_resource.append({
+            'id': resource.get('id'),
+            'name': resource.get('name'),
+            'type': resource.get('type'),
+            'domain_id': domain_id,
+            'strategy': strategy,
+            'aliases': aliases
+        })
+        by_domain[domain_id] = by_domain.get(domain_id, 0) + aliases
+        strategy_resources[strategy] = strategy_resources.get(strategy, 0) + 1
+    
+    by_region: Dict[str, int] = {}
+    for strategy, resource_count in strategy_resources.items():
+        for region, aliases in strategy_regions[strategy].items():
+            by_region[region] = by_region.get(region, 0) + aliases * resource_count
+    by_strategy = {strategy: totals[strategy] * count for strategy, count in strategy_resources.items()}
+    
+    return ExpansionPreview(
+        total_resources=len(resources),
+        total_aliases=sum(by_strategy.values()),
+        by_resource=by_resource,
+        by_domain=by_domain,
+        by_region=by_region,
+        by_strategy=by_strategy,
+        strategy_regions=strategy_regions,
+        locals=expander.locals_map(),
+        locals_block=expander.generate_locals_block(),
+        warnings=warnings
+    )
+
+
 def expand_infrastructure_for_deployment(
     resources: List[Dict[str, Any]],
     deployment_config: DeploymentConfig
@@ -257,43 +434,52 @@ def expand_infrastructure_for_deployment(
     Main entry point: Expand all resources based on deployment strategies.
     
     Returns an expanded representation with:
-    - expanded_resources: List of concrete resource instances
+    - expanded_resources: Concrete resource instances, produced lazily
+      while iterated (one pass)
     - terraform_locals: Locals block content
     - deployment_metadata: Metadata about expansion
+    
+    Generated Terraform does not need the aliases (see the pipeline's
+    deployment stage); they are only materialised for consumers that price
+    or inspect individual instances.
     """
     
     expander = DeploymentExpander(deployment_config)
-    expanded_resources = []
-    
-    for resource in resources:
-        strategy = DeploymentStrategy(resource.get('deployment', {}).get('strategy', 'single'))
-        
-        aliases = expander.expand_resource(
-            resource_id=resource['id'],
-            resource_type=resource['type'],
-            base_name=resource['name'],
-            strategy=strategy,
-            arguments=resource.get('arguments', {})
+    strategies = [
+        effective_strategy(
+            DeploymentStrategy((resource.get('deployment') or {}).get('strategy', 'single')),
+            resource['type']
         )
-        
-        for alias in aliases:
-            expanded_resource = {
-                **resource,
-                'deployment_alias': alias.to_dict(),
-                'terraform_meta': expander.generate_terraform_expression(
-                    strategy,
-                    resource['type'],
-                    resource.get('arguments', {})
-                )
-            }
-            expanded_resources.append(expanded_resource)
+        for resource in resources
+    ]
+    
+    def expanded_resources():
+        for resource, strategy in zip(resources, strategies):
+            aliases = expander.expand_resource(
+                resource_id=resource['id'],
+                resource_type=resource['type'],
+                base_name=resource['name'],
+                strategy=strategy,
+                arguments=resource.get('arguments', {})
+            )
+            terraform_meta = expander.generate_terraform_expression(
+                strategy,
+                resource['type'],
+                resource.get('arguments', {})
+            )
+            for alias in aliases:
+                yield {
+                    **resource,
+                    'deployment_alias': alias.to_dict(),
+                    'terraform_meta': terraform_meta
+                }
     
     return {
-        'expanded_resources': expanded_resources,
+        'expanded_resources': expanded_resources(),
         'terraform_locals': expander.generate_locals_block(),
         'deployment_metadata': {
             'primary_region': deployment_config.primary_region,
             'availability_zones': deployment_config.availability_zones,
-            'total_aliases': len(expanded_resources)
+            'total_aliases': sum(expander.alias_count(strategy) for strategy in strategies)
         }
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,240 @@
+"""
+CIDR allocation for per-AZ and multi-region subnets
+
+Subnets are carved out of each region's VPC CIDR with a buddy allocator:
+free space is kept as aligned blocks in one heap per prefix length, and a
+request for a /p takes the lowest free block of the longest prefix that
+still fits, splitting it down and returning the upper halves to the free
+lists. Existing subnets are taken out of the free space up front and are
+checked for overlaps through a sorted interval index, so planning n subnets
+costs O(n log n).
+"""
+
+import heapq
+import ipaddress
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+DEFAULT_VPC_CIDR = '10.0.0.0/16'
+DEFAULT_SUBNET_PREFIX = 24
+
+
+def _span(network: Network) -> Tuple[int, int]:
+    return int(network.network_address), int(network.broadcast_address)
+
+
+def find_overlaps(networks: Iterable[Network]) -> List[Tuple[Network, Network]]:
+    """
+    Every pair of overlapping networks (outer, inner), found with one sort and a sweep
+
+    CIDR blocks either nest or are disjoint, so the blocks still open when a
+    block starts form a chain that all contain it: it overlaps each of them.
+    The cost is O(n log n) plus the number of pairs.
+    """
+    ordered = sorted(networks, key=lambda n: (int(n.network_address), n.prefixlen))
+    overlaps = []
+    open_blocks: List[Network] = []
+    for network in ordered:
+        start = int(network.network_address)
+        while open_blocks and int(open_blocks[-1].broadcast_address) < start:
+            open_blocks.pop()
+        overlaps.extend((outer, network) for outer in open_blocks)
+        open_blocks.append(network)
+    return overlaps
+
+
+class IntervalIndex:
+    """Disjoint address ranges sorted by start, queried by binary search"""
+
+    def __init__(self, networks: Iterable[Network] = ()):
+        ordered = sorted(networks, key=lambda n: int(n.network_address))
+        self._starts = [int(n.network_address) for n in ordered]
+        self._ends = [int(n.broadcast_address) for n in ordered]
+        self._networks = ordered
+
+    def __len__(self) -> int:
+        return len(self._networks)
+
+    def __iter__(self):
+        return iter(self._networks)
+
+    def overlapping(self, network: Network) -> Optional[Network]:
+        """An indexed network overlapping `network`, or None"""
+        start, end = _span(network)
+        # Ranges are disjoint: if any range overlaps, the last one starting
+        # at or before `end` does
+        idx = bisect_right(self._starts, end) - 1
+        if idx >= 0 and self._ends[idx] >= start:
+            return self._networks[idx]
+        return None
+
+
+class CidrAllocator:
+    """Packs subnets of requested prefix lengths into one VPC CIDR"""
+
+    def __init__(self, vpc_cidr: str, existing: Iterable[str] = ()):
+        self.vpc = ipaddress.ip_network(vpc_cidr)
+        self._address = type(self.vpc.network_address)
+        self._max_prefix = self.vpc.max_prefixlen
+
+        inside = []
+        for cidr in existing:
+            network = ipaddress.ip_network(cidr)
+            if network.version == self.vpc.version and network.subnet_of(self.vpc):
+                inside.append(network)
+            elif network.version == self.vpc.version and network.overlaps(self.vpc):
+                raise ValueError(f"Existing subnet {network} extends outside VPC {self.vpc}")
+
+        # Nested existing blocks only reserve their outermost block
+        nested = {id(inner) for _, inner in find_overlaps(inside)}
+        self.existing = IntervalIndex(n for n in inside if id(n) not in nested)
+
+        self._free: Dict[int, List[int]] = {}
+        cursor, vpc_end = _span(self.vpc)
+        for network in self.existing:
+            start, end = _span(network)
+            if start > cursor:
+                self._release(cursor, start - 1)
+            cursor = end + 1
+        if cursor <= vpc_end:
+            self._release(cursor, vpc_end)
+
+    def _release(self, first: int, last: int) -> None:
+        """Add the range first..last to the free lists as aligned blocks"""
+        for block in ipaddress.summarize_address_range(self._address(first), self._address(last)):
+            heapq.heappush(self._free.setdefault(block.prefixlen, []), int(block.network_address))
+
+    def free_addresses(self) -> int:
+        """Addresses not yet allocated or reserved"""
+        return sum(len(starts) << (self._max_prefix - prefix) for prefix, starts in self._free.items())
+
+    def allocate(self, prefix_length: int) -> Network:
+        """Lowest free /prefix_length in the VPC, preferring the smallest free block that fits"""
+        if not self.vpc.prefixlen <= prefix_length <= self._max_prefix:
+            raise ValueError(f"A /{prefix_length} subnet does not fit in VPC {self.vpc}")
+
+        length = prefix_length
+        while not self._free.get(length):
+            length -= 1
+            if length < self.vpc.prefixlen:
+                raise ValueError(f"VPC {self.vpc} has no room left for a /{prefix_length} subnet")
+
+        start = heapq.heappop(self._free[length])
+        while length < prefix_length:
+            length += 1
+            heapq.heappush(self._free.setdefault(length, []), start + (1 << (self._max_prefix - length)))
+        return ipaddress.ip_network((self._address(start), prefix_length))
+
+
+@dataclass
+class SubnetRequest:
+    name: str
+    prefix_length: int = DEFAULT_SUBNET_PREFIX
+    per_az: bool = True  # one subnet per AZ, otherwise one per region
+
+
+@dataclass
+class SubnetAllocation:
+    name: str
+    region: str
+    cidr: str
+    availability_zone: Optional[str] = None
+
+
+@dataclass
+class RegionPlan:
+    region: str
+    vpc_cidr: str
+    availability_zones: List[str]
+    subnets: List[SubnetAllocation] = field(default_factory=list)
+    free_addresses: int = 0
+
+
+def region_vpc_cidrs(
+    regions: List[str],
+    vpc_cidr: str = DEFAULT_VPC_CIDR,
+    overrides: Optional[Dict[str, str]] = None
+) -> Dict[str, str]:
+    """
+    VPC CIDR per region
+
+    The first region uses vpc_cidr; regions without an override get the
+    following blocks of the same size, so regional VPCs never overlap and
+    can be peered.
+    """
+    overrides = overrides or {}
+    base = ipaddress.ip_network(vpc_cidr)
+    assigned = {region: ipaddress.ip_network(cidr) for region, cidr in overrides.items() if region in regions}
+    if regions and regions[0] not in assigned:
+        assigned[regions[0]] = base
+
+    conflicts = find_overlaps(assigned.values())
+    if conflicts:
+        first, second = conflicts[0]
+        raise ValueError(f"Regional VPC CIDRs {first} and {second} overlap")
+
+    index = IntervalIndex(assigned.values())
+    size = base.num_addresses
+    candidate = int(base.network_address)
+    result = {}
+    for region in regions:
+        if region in assigned:
+            result[region] = str(assigned[region])
+            continue
+        while True:
+            candidate += size
+            if candidate + size > 2 ** base.max_prefixlen:
+                raise ValueError(f"No room for another /{base.prefixlen} VPC after {vpc_cidr}")
+            network = ipaddress.ip_network((type(base.network_address)(candidate), base.prefixlen))
+            if index.overlapping(network) is None:
+                break
+        result[region] = str(network)
+    return result
+
+
+def plan_subnets(
+    regions: Dict[str, List[str]],
+    vpc_cidrs: Dict[str, str],
+    requests: List[SubnetRequest],
+    existing: Iterable[str] = ()
+) -> List[RegionPlan]:
+    """
+    Allocate every requested subnet in every region (per AZ where asked)
+
+    regions maps region -> availability zones, vpc_cidrs region -> VPC CIDR.
+    Larger subnets are placed first to keep the free space unfragmented;
+    allocations are reported in request and AZ order.
+    """
+    existing = list(existing)
+    plans = []
+    for region, availability_zones in regions.items():
+        allocator = CidrAllocator(vpc_cidrs[region], existing)
+
+        slots = []
+        for position, request in enumerate(requests):
+            zones = availability_zones if request.per_az else [None]
+            for zone_index, zone in enumerate(zones):
+                slots.append((request.prefix_length, position, zone_index, request, zone))
+
+        allocations = []
+        for prefix_length, position, zone_index, request, zone in sorted(slots, key=lambda s: s[:3]):
+            network = allocator.allocate(prefix_length)
+            allocations.append(((position, zone_index), SubnetAllocation(
+                name=request.name,
+                region=region,
+                cidr=str(network),
+                availability_zone=zone
+            )))
+        allocations.sort(key=lambda a: a[0])
+
+        plans.append(RegionPlan(
+            region=region,
+            vpc_cidr=str(allocator.vpc),
+            availability_zones=list(availability_zones),
+            subnets=[allocation for _, allocation in allocations],
+            free_addresses=allocator.free_addresses()
+        ))
+    return plans
@@ -4,7 +4,7 @@ import logging
 import os
 
 # Import routes - these import the router objects
-from app.api.routes import graph, terraform, registry
+from app.api.routes import graph, terraform, registry, deployment
 
 # Import other dependencies
 from app.registry.loader import ServiceRegistry
@@ -28,6 +28,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Module-Cache", "X-Module-Cache-Hits", "X-Dependency-Edges", "X-Redundant-Edges-Removed"],
 )
 
 # Startup event - load service registry
@@ -41,16 +42,38 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Failed to load service registry: {e}")
         raise
+    
+    # Compile Terraform templates once per worker (bytecode persisted between restarts)
+    try:
+        from app.terraform.environment import get_template_environment
+        get_template_environment()
+    except Exception as e:
+        logger.error(f"Failed to precompile Terraform templates: {e}")
+        raise
+    
+    # Map the shared pricing table (optional, falls back to built-in prices)
+    pricing_table_path = os.getenv('PRICING_TABLE_PATH')
+    if pricing_table_path:
+        try:
+            from app.cost.price_table import load_price_table
+            load_price_table(pricing_table_path)
+        except Exception as e:
+            logger.error(f"Failed to map pricing table, using built-in prices: {e}")
 
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Application shutting down")
+    from app.terraform.generator import shutdown_render_pool
+    from app.terraform.parser import shutdown_parse_pool
+    shutdown_render_pool()
+    shutdown_parse_pool()
 
 # Include routers - CRITICAL: graph, terraform, registry must have .router attribute
 app.include_router(graph.router, prefix="/api/v1/graph", tags=["graph"])
 app.include_router(terraform.router, prefix="/api/v1/terraform", tags=["terraform"])
 app.include_router(registry.router, prefix="/api/v1/registry", tags=["registry"])
+app.include_router(deployment.router, prefix="/api/v1/deployment", tags=["deployment"])
 
 # Load cost estimation routes
 try:
@@ -1,4 +1,5 @@
 import yaml
+import hashlib
 from typing import Dict, List, Optional
 from pathlib import Path
 from app.registry.service import ServiceDefinition
@@ -16,6 +17,8 @@ class ServiceRegistry:
     def __init__(self):
         self.services: Dict[str, ServiceDefinition] = {}
         self.domains: Dict[DomainType, List[str]] = {}
+        self.version: str = ''
+        self.path: Optional[str] = None
     
     @classmethod
     def get_instance(cls) -> 'ServiceRegistry':
@@ -31,8 +34,9 @@ class ServiceRegistry:
         if not registry_path.exists():
             raise FileNotFoundError(f"Registry file not found: {path}")
         
-        with open(registry_path, 'r') as f:
-            registry_data = yaml.safe_load(f)
+        with open(registry_path, 'rb') as f:
+            raw = f.read()
+        registry_data = yaml.safe_load(raw)
         
         # Validate structure
         errors = validate_registry_structure(registry_data)
@@ -58,7 +62,11 @@ class ServiceRegistry:
                     self.domains[service.domain] = []
                 self.domains[service.domain].append(resource_type)
         
-        logger.info(f"Loaded {len(self.services)} services from registry")
+        # Content hash, used to invalidate caches derived from registry data
+        self.version = hashlib.sha256(raw).hexdigest()[:16]
+        self.path = str(registry_path.resolve())
+        
+        logger.info(f"Loaded {len(self.services)} services from registry (version {self.version})")
     
     def get_service(self, resource_type: str) -> Optional[ServiceDefinition]:
         """Get service definition by resource type"""
@@ -0,0 +1,221 @@
+"""
+for_each compression of structurally identical resources
+
+Resources of the same type whose arguments have the same shape (same keys,
+nested blocks and value types) and the same meta-arguments are collapsed into
+one block iterating over a local map. Only the values that differ between
+members go into the map; everything shared stays literal in the block.
+
+    resource "aws_subnet" "subnet" {
+      for_each   = local.aws_subnet_subnet
+      vpc_id     = aws_vpc.main.id
+      cidr_block = each.value.cidr_block
+    }
+
+References to members (aws_subnet.subnet_1.id) are rewritten to the
+instance address (aws_subnet.subnet["subnet_1"].id), and depends_on entries
+to the whole resource.
+"""
+
+import os
+import re
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Tuple
+from app.core.resource import Resource
+from config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+FOR_EACH_MIN_GROUP = settings.FOR_EACH_MIN_GROUP
+
+# Arguments that must be identical across members and cannot come from each.value
+META_ARGUMENTS = ('depends_on', 'count', 'for_each', 'provider', 'lifecycle', 'provisioner')
+
+_NON_IDENTIFIER = re.compile(r'[^A-Za-z0-9_]')
+
+
+@dataclass
+class CompressedModule:
+    resources: List[Resource]  # blocks to render, groups in place of their first member
+    locals: Dict[str, Any] = field(default_factory=dict)
+    addresses: Dict[str, str] = field(default_factory=dict)  # 'type.name' -> instance address
+    compressed: int = 0  # resources folded into for_each blocks
+
+
+def _is_block_list(value: Any) -> bool:
+    return isinstance(value, list) and bool(value) and all(isinstance(v, dict) for v in value)
+
+
+def _shape(value: Any) -> Any:
+    """Structure of a value: keys, nested blocks and leaf types, without leaf values"""
+    if isinstance(value, dict):
+        return ('map', tuple((k, _shape(v)) for k, v in sorted(value.items())))
+    if _is_block_list(value):
+        return ('blocks', tuple(_shape(v) for v in value))
+    if isinstance(value, (list, tuple)):
+        return ('list',)
+    return ('scalar', type(value).__name__)
+
+
+def _leaves(value: Any, path: Tuple = ()):
+    """(path, value) for every leaf; scalar lists are leaves"""
+    if isinstance(value, dict):
+        for key, inner in value.items():
+            yield from _leaves(inner, path + (key,))
+    elif _is_block_list(value):
+        for idx, inner in enumerate(value):
+            yield from _leaves(inner, path + (idx,))
+    else:
+        yield path, value
+
+
+def _substitute(value: Any, path: Tuple, replacement: Any) -> Any:
+    """Copy of value with the leaf at path replaced"""
+    if not path:
+        return replacement
+    head, rest = path[0], path[1:]
+    if isinstance(value, dict):
+        return {k: (_substitute(v, rest, replacement) if k == head else v) for k, v in value.items()}
+    return [(_substitute(v, rest, replacement) if i == head else v) for i, v in enumerate(value)]
+
+
+def _strings(value: Any):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for inner in value.values():
+            yield from _strings(inner)
+    elif isinstance(value, (list, tuple)):
+        for inner in value:
+            yield from _strings(inner)
+
+
+def _reference_pattern(resource_type: str, names: List[str]) -> re.Pattern:
+    alternatives = '|'.join(re.escape(name) for name in sorted(names, key=len, reverse=True))
+    return re.compile(rf'(?<![\w.-]){re.escape(resource_type)}\.({alternatives})(?![\w-])')
+
+
+def _block_name(resource_type: str, names: List[str], taken: set) -> str:
+    """Common prefix of member names (e.g. subnet_1, subnet_2 -> subnet), unique in the module"""
+    prefix = os.path.commonprefix(names).rstrip('_-0123456789')
+    base = _NON_IDENTIFIER.sub('_', prefix) or f"{resource_type.replace('aws_', '', 1)}_group"
+    if base[0].isdigit():
+        base = f"r_{base}"
+    name, suffix = base, 1
+    while name in taken:
+        suffix += 1
+        name = f"{base}_{suffix}"
+    taken.add(name)
+    return name
+
+
+def _leaf_keys(paths: List[Tuple]) -> Dict[Tuple, str]:
+    keys: Dict[Tuple, str] = {}
+    used = set()
+    for path in paths:
+        base = _NON_IDENTIFIER.sub('_', '_'.join(str(p) for p in path)) or 'value'
+        key, suffix = base, 1
+        while key in used:
+            suffix += 1
+            key = f"{base}_{suffix}"
+        used.add(key)
+        keys[path] = key
+    return keys
+
+
+def compress_resources(resources: List[Resource], min_group: int = FOR_EACH_MIN_GROUP) -> CompressedModule:
+    """Collapse groups of at least min_group structurally identical resources into for_each blocks"""
+    groups: Dict[Any, List[Resource]] = {}
+    for resource in resources:
+        meta = tuple(repr(resource.arguments.get(name)) for name in META_ARGUMENTS)
+        if resource.arguments.get('count') is not None or resource.arguments.get('for_each') is not None:
+            continue
+        key = (resource.type, _shape(resource.arguments), meta)
+        groups.setdefault(key, []).append(resource)
+
+    taken = {r.name for r in resources}
+    first_of: Dict[str, Resource] = {}
+    folded = set()
+    locals_map: Dict[str, Any] = {}
+    addresses: Dict[str, str] = {}
+
+    for members in groups.values():
+        if len(members) < min_group:
+            continue
+
+        # Members referencing each other would make the for_each block depend on itself
+        pattern = _reference_pattern(members[0].type, [m.name for m in members])
+        if any(pattern.search(s) for m in members for s in _strings(m.arguments)):
+            continue
+
+        leaves = [dict(_leaves(m.arguments)) for m in members]
+        differing = [
+            path for path, value in leaves[0].items()
+            if path and path[0] not in META_ARGUMENTS and any(l[path] != value for l in leaves[1:])
+        ]
+        if not differing:
+            continue  # identical copies; leave them to the caller's deduplication
+
+        block_name = _block_name(members[0].type, [m.name for m in members], taken)
+        local_name = _NON_IDENTIFIER.sub('_', f"{members[0].type}_{block_name}")
+        leaf_keys = _leaf_keys(differing)
+
+        arguments = {'for_each': f"${{local.{local_name}}}"}
+        template = members[0].arguments
+        for path in differing:
+            template = _substitute(template, path, f"${{each.value.{leaf_keys[path]}}}")
+        arguments.update(template)
+
+        locals_map[local_name] = {
+            m.name: {leaf_keys[path]: l[path] for path in differing}
+            for m, l in zip(members, leaves)
+        }
+        for m in members:
+            addresses[f"{m.type}.{m.name}"] = f'{m.type}.{block_name}["{m.name}"]'
+            folded.add(m.id)
+        first_of[members[0].id] = replace(members[0], name=block_name, arguments=arguments)
+
+    if not first_of:
+        return CompressedModule(resources=list(resources))
+
+    rendered = [first_of.get(r.id, r) for r in resources if r.id in first_of or r.id not in folded]
+    rewrite = make_rewriter(addresses)
+    rendered = [replace(r, arguments=rewrite_arguments(r.arguments, rewrite)) for r in rendered]
+    locals_map = rewrite_arguments(locals_map, rewrite)
+
+    logger.info(f"for_each compression: {len(folded)} resources folded into {len(first_of)} blocks")
+    return CompressedModule(resources=rendered, locals=locals_map, addresses=addresses, compressed=len(folded))
+
+
+def make_rewriter(addresses: Dict[str, str]):
+    """Function rewriting member references in a string; whole=True drops the instance key"""
+    if not addresses:
+        return lambda text, whole=False: text
+
+    by_type: Dict[str, List[str]] = {}
+    for address in addresses:
+        resource_type, name = address.split('.', 1)
+        by_type.setdefault(resource_type, []).append(name)
+    patterns = [(t, _reference_pattern(t, names)) for t, names in by_type.items()]
+
+    def rewrite(text: str, whole: bool = False) -> str:
+        for resource_type, pattern in patterns:
+            def substitute(match):
+                address = addresses[f"{resource_type}.{match.group(1)}"]
+                return address.split('[', 1)[0] if whole else address
+            text = pattern.sub(substitute, text)
+        return text
+
+    return rewrite
+
+
+def rewrite_arguments(value: Any, rewrite, key: str = None) -> Any:
+    """Apply rewrite to every string in an argument tree (depends_on entries to whole resources)"""
+    if isinstance(value, str):
+        return rewrite(value, key == 'depends_on')
+    if isinstance(value, dict):
+        return {k: rewrite_arguments(v, rewrite, k) for k, v in value.items()}
+    if isinstance(value, list):
+        return [rewrite_arguments(v, rewrite, key) for v in value]
+    return value
@@ -0,0 +1,77 @@
+"""
+Process-wide Jinja environment for the Terraform generators
+
+The environment is built once per process, its templates are compiled at
+startup, and compiled bytecode is persisted on disk so restarts skip
+template compilation as well.
+"""
+
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, select_autoescape
+from app.terraform.hcl import to_hcl_body, to_hcl_value
+from app.utils.cache import private_directory
+from config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_DIR = Path(__file__).parent / 'templates'
+TEMPLATE_NAMES = ('module.tf.j2', 'variables.tf.j2', 'outputs.tf.j2')
+
+_lock = threading.Lock()
+_environment: Optional[Environment] = None
+_templates: Dict[str, Template] = {}
+
+
+def _bytecode_cache_dir() -> str:
+    return settings.TEMPLATE_CACHE_DIR
+
+
+def _build_environment() -> Environment:
+    """Create the environment and compile every generator template"""
+    cache_dir = _bytecode_cache_dir()
+    bytecode_cache = None
+    try:
+        # Bytecode is unmarshalled on load, so the directory must be ours alone
+        bytecode_cache = FileSystemBytecodeCache(str(private_directory(cache_dir)))
+    except OSError as e:
+        logger.warning(f"Template bytecode cache disabled ({cache_dir}): {e}")
+
+    environment = Environment(
+        loader=FileSystemLoader(str(TEMPLATE_DIR)),
+        autoescape=select_autoescape(),
+        trim_blocks=True,
+        lstrip_blocks=True,
+        bytecode_cache=bytecode_cache,
+        auto_reload=False
+    )
+    environment.filters['to_hcl'] = to_hcl_value
+    environment.filters['hcl_body'] = to_hcl_body
+
+    for name in TEMPLATE_NAMES:
+        _templates[name] = environment.get_template(name)
+
+    logger.info(f"Compiled {len(_templates)} Terraform templates (bytecode cache: {cache_dir})")
+    return environment
+
+
+def get_template_environment() -> Environment:
+    """Get the shared template environment, building it on first use"""
+    global _environment
+
+    if _environment is None:
+        with _lock:
+            if _environment is None:
+                _environment = _build_environment()
+    return _environment
+
+
+def get_template(name: str) -> Template:
+    """Get a precompiled generator template by file name"""
+    environment = get_template_environment()
+    template = _templates.get(name)
+    if template is None:
+        template = environment.get_template(name)
+    return template
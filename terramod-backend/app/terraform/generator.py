@@ -1,21 +1,111 @@
-from typing import Dict, List, Any
-from dataclasses import dataclass
-from jinja2 import Environment, FileSystemLoader, select_autoescape
-from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from dataclasses import dataclass, field, replace
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+import threading
 from app.core.graph import InfrastructureGraph
-from app.core.domain import Domain, DomainOutput
+from app.core.domain import Domain
 from app.core.resource import Resource
+from app.deployment import (
+    AWS_PROVIDER_VERSION,
+    REGIONAL_AWS_PROVIDER_VERSION,
+    DeploymentConfig,
+    DeploymentStrategy,
+    effective_strategy
+)
 from app.registry.loader import ServiceRegistry
+from app.terraform.environment import get_template_environment
+from app.terraform.hcl import to_hcl_value
+from app.terraform import tfjson
+from app.terraform.pipeline import ModulePipeline, TerraformModule, default_pipeline
+from app.terraform.wiring import ModuleWiring, compute_wiring, wired_domain, wired_resources
+from app.utils.cache import DiskCache, LRUCache
+from app.utils.hash import hash_domain, hash_module_content
+from config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
-@dataclass
-class TerraformModule:
-    name: str
-    main_tf: str
-    variables_tf: str
-    outputs_tf: str
+# Output format -> file suffix ('hcl' renders templates, 'json' emits Terraform JSON syntax)
+OUTPUT_FORMATS = {'hcl': '.tf', 'json': '.tf.json'}
+
+# Rendered modules keyed by domain content hash, shared across requests
+_module_cache = LRUCache(max_entries=settings.MODULE_CACHE_SIZE)
+
+def get_module_cache() -> LRUCache:
+    """Get process-wide rendered module cache"""
+    return _module_cache
+
+# Generated file contents keyed by content hash, served by the per-file endpoint.
+# Kept on disk so any worker can serve a manifest another worker produced.
+FILE_CACHE_SIZE = settings.FILE_CACHE_SIZE
+_file_cache: Optional[Union[DiskCache, LRUCache]] = None
+_file_cache_lock = threading.Lock()
+
+def get_file_cache() -> Union[DiskCache, LRUCache]:
+    """Get the generated file cache, in memory only when its directory is unusable"""
+    global _file_cache
+    
+    if _file_cache is None:
+        with _file_cache_lock:
+            if _file_cache is None:
+                cache_dir = settings.FILE_CACHE_DIR
+                try:
+                    _file_cache = DiskCache(cache_dir, max_entries=FILE_CACHE_SIZE)
+                except OSError as e:
+                    logger.warning(f"Generated files cached in memory only ({cache_dir}): {e}")
+                    _file_cache = LRUCache(max_entries=FILE_CACHE_SIZE)
+    return _file_cache
+
+# Module rendering fans out to worker processes from this many domains on
+PARALLEL_MODULE_THRESHOLD = settings.PARALLEL_MODULE_THRESHOLD
+RENDER_WORKERS = settings.GENERATOR_WORKERS
+
+_render_pool: Optional[ProcessPoolExecutor] = None
+_render_pool_lock = threading.Lock()
+
+def _init_render_worker(registry_path: Optional[str]) -> None:
+    """Load the service registry in spawned workers (forked workers inherit it)"""
+    registry = ServiceRegistry.get_instance()
+    if not registry.services and registry_path:
+        registry.load_registry(registry_path)
+
+def _render_module_entry(entry: Tuple[Domain, List[Resource]], pipeline: ModulePipeline) -> TerraformModule:
+    domain, resources = entry
+    return pipeline.build(domain, resources)
+
+def _get_render_pool() -> ProcessPoolExecutor:
+    """Get process-wide module rendering pool, started on first use"""
+    global _render_pool
+    
+    if _render_pool is None:
+        with _render_pool_lock:
+            if _render_pool is None:
+                _render_pool = ProcessPoolExecutor(
+                    max_workers=RENDER_WORKERS,
+                    initializer=_init_render_worker,
+                    initargs=(ServiceRegistry.get_instance().path,)
+                )
+    return _render_pool
+
+def _discard_render_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool (e.g. a worker was OOM-killed) so the next call starts a fresh one"""
+    global _render_pool
+    
+    with _render_pool_lock:
+        if _render_pool is pool:
+            _render_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def shutdown_render_pool() -> None:
+    """Stop the module rendering pool"""
+    global _render_pool
+    
+    with _render_pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(wait=True)
+            _render_pool = None
 
 @dataclass
 class TerraformProject:
@@ -23,332 +113,348 @@ class TerraformProject:
     root_main: str
     providers: str
     terraform_config: str
+    module_cache_hits: Dict[str, bool] = field(default_factory=dict)
+    output_format: str = 'hcl'
+    dependency_edges: int = 0
+    removed_dependency_edges: int = 0
+    module_sources: Dict[str, str] = field(default_factory=dict)  # domain name -> module under modules/
+    
+    def files(self) -> Dict[str, str]:
+        """Project files by path, in archive order"""
+        suffix = OUTPUT_FORMATS[self.output_format]
+        files = {}
+        for name, module in self.modules.items():
+            files[f"modules/{name}/main{suffix}"] = module.main_tf
+            files[f"modules/{name}/variables{suffix}"] = module.variables_tf
+            files[f"modules/{name}/outputs{suffix}"] = module.outputs_tf
+        files[f"main{suffix}"] = self.root_main
+        files[f"providers{suffix}"] = self.providers
+        files[f"terraform{suffix}"] = self.terraform_config
+        return files
 
 class TerraformGenerator:
     """Terraform HCL code generator with fixes for duplicate resources and proper HCL rendering"""
     
-    def __init__(self):
-        template_dir = Path(__file__).parent / 'templates'
-        self.template_env = Environment(
-            loader=FileSystemLoader(str(template_dir)),
-            autoescape=select_autoescape(),
-            trim_blocks=True,
-            lstrip_blocks=True
-        )
-        
-        # Add custom filters
-        self.template_env.filters['to_hcl'] = self._to_hcl_value
+    def __init__(
+        self,
+        use_cache: bool = True,
+        parallel: bool = True,
+        output_format: str = 'hcl',
+        compress: bool = False,
+        share_modules: bool = True,
+        deployment: Optional[DeploymentConfig] = None,
+        pipeline: Optional[ModulePipeline] = None
+    ):
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported output format: {output_format}")
+        
+        # Shared, precompiled environment (see app.terraform.environment)
+        self.template_env = get_template_environment()
+        self.use_cache = use_cache
+        self.parallel = parallel
+        self.output_format = output_format
+        self.file_suffix = OUTPUT_FORMATS[output_format]
+        # Fold structurally identical resources into for_each blocks (changes resource addresses)
+        self.compress = compress
+        # Render domains with identical content once and instantiate the module per domain
+        self.share_modules = share_modules
+        # Expand per-AZ / regional resources into one block per alias
+        self.deployment = deployment
+        # expand -> compress -> infer outputs -> render (see app.terraform.pipeline)
+        self.pipeline = pipeline or default_pipeline(output_format, compress, deployment)
     
     def _to_hcl_value(self, value, indent_level: int = 0) -> str:
-        """
-        Convert Python value to HCL representation with proper nested structure handling.
-        
-        ✅ FIX #7: This now properly handles nested structures like CloudFront origin blocks
-        """
-        indent = "  " * indent_level
-        next_indent = "  " * (indent_level + 1)
-        
-        if isinstance(value, str):
-            # Check if it's a Terraform interpolation
-            if value.startswith('${') and value.endswith('}'):
-                return value  # Don't quote interpolations
-            return f'"{value}"'
-        
-        elif isinstance(value, bool):
-            return 'true' if value else 'false'
-        
-        elif isinstance(value, (int, float)):
-            return str(value)
-        
-        elif isinstance(value, list):
-            if not value:
-                return '[]'
-            
-            # ✅ FIX #7: Check if list contains dict objects (HCL blocks)
-            if value and isinstance(value[0], dict):
-                # This is a list of blocks - render each as a separate block
-                blocks = []
-                for item in value:
-                    block_lines = ['{']
-                    for k, v in item.items():
-                        hcl_val = self._to_hcl_value(v, indent_level + 1)
-                        block_lines.append(f'{next_indent}{k} = {hcl_val}')
-                    block_lines.append(f'{indent}}}')
-                    blocks.append('\n'.join(block_lines))
-                return '\n'.join(blocks)
-            else:
-                # Simple list - render inline
-                items = ', '.join(self._to_hcl_value(v, indent_level) for v in value)
-                return f'[{items}]'
-        
-        elif isinstance(value, dict):
-            if not value:
-                return '{}'
-            
-            # ✅ Render as HCL block with proper nesting
-            lines = ['{']
-            for k, v in value.items():
-                hcl_val = self._to_hcl_value(v, indent_level + 1)
-                lines.append(f'{next_indent}{k} = {hcl_val}')
-            lines.append(f'{indent}}}')
-            return '\n'.join(lines)
-        
-        elif value is None:
-            return 'null'
-        
-        else:
-            return str(value)
+        """Convert Python value to HCL representation"""
+        return to_hcl_value(value, indent_level)
     
     def generate_project(self, graph: InfrastructureGraph) -> TerraformProject:
         """Generate complete Terraform project"""
+        
+        wiring, sources, entries = self._wired_entries(graph)
+        
+        # Reuse modules whose domain content is unchanged
+        keys = [None] * len(entries)
+        results: List[Optional[TerraformModule]] = [None] * len(entries)
+        if self.use_cache:
+            registry_version = ServiceRegistry.get_instance().version
+            for idx, (domain, domain_resources) in enumerate(entries):
+                keys[idx] = self._module_cache_key(domain, domain_resources, registry_version)
+                results[idx] = _module_cache.get(keys[idx])
+        
+        # Render the rest, serially or across the worker pool
+        misses = [idx for idx, module in enumerate(results) if module is None]
+        rendered = self.render_modules([entries[idx] for idx in misses])
+        for idx, module in zip(misses, rendered):
+            results[idx] = module
+            if keys[idx] is not None:
+                _module_cache.set(keys[idx], module)
+        
+        # Merge in domain order so output is identical however it was rendered
+        missed = {entries[idx][0].name for idx in misses}
         modules = {}
+        for (domain, _), module in zip(entries, results):
+            modules[domain.name] = module
         
-        # Generate module for each domain
-        for domain in graph.domains.values():
-            domain_resources = [
-                graph.resources[rid] for rid in domain.resource_ids
-                if rid in graph.resources
-            ]
-            
-            if domain_resources:
-                module = self.generate_module(domain, domain_resources)
-                modules[domain.name] = module
+        # A domain instantiating a module rendered for an earlier domain counts as a hit
+        cache_hits = {}
+        first_instance = set()
+        for domain_name, module_name in sources.items():
+            cache_hits[domain_name] = module_name not in missed or module_name in first_instance
+            first_instance.add(module_name)
         
         # Generate root files
-        root_main = self.generate_root_main(list(graph.domains.values()))
-        providers = self.generate_providers()
+        root_main = self.generate_root_main(graph, wiring, sources)
+        providers = self.generate_providers(graph)
         terraform_config = self.generate_terraform_config()
         
         return TerraformProject(
             modules=modules,
             root_main=root_main,
             providers=providers,
-            terraform_config=terraform_config
+            terraform_config=terraform_config,
+            module_cache_hits=cache_hits,
+            output_format=self.output_format,
+            dependency_edges=wiring.dependency_edges,
+            removed_dependency_edges=wiring.removed_edges,
+            module_sources=sources
         )
     
-    def generate_module(self, domain: Domain, resources: List[Resource]) -> TerraformModule:
+    def iter_project_files(self, graph: InfrastructureGraph) -> Iterator[Tuple[str, str]]:
         """
-        Generate Terraform module for domain
+        (path, content) for every project file, rendering one module at a time
         
-        ✅ FIX #3: Deduplicates resources by ID before rendering
+        Wiring is computed and checked up front, so an invalid graph (e.g.
+        cyclic domains) raises here rather than once files are being read.
+        Only the module being written is held by the caller, so exports can
+        stream projects of any size.
         """
-        
-        # ✅ FIX #3: Deduplicate resources by ID
-        unique_resources = {r.id: r for r in resources}.values()
-        unique_resources_list = list(unique_resources)
-        
-        logger.info(f"Generating module for domain '{domain.name}': "
-                   f"{len(resources)} resources provided, "
-                   f"{len(unique_resources_list)} unique resources after deduplication")
-        
-        # Generate main.tf
-        main_template = self.template_env.get_template('module.tf.j2')
-        main_tf = main_template.render(
-            domain=domain, 
-            resources=unique_resources_list  # Use deduplicated list
-        )
-        
-        # Generate variables.tf with DB passwords if needed
-        variables_tf = self._generate_variables(domain, unique_resources_list)
-        
-        # Infer outputs from resources
-        outputs = self.infer_outputs(domain, unique_resources_list)
-        
-        # Generate outputs.tf
-        outputs_template = self.template_env.get_template('outputs.tf.j2')
-        outputs_tf = outputs_template.render(outputs=outputs)
-        
-        return TerraformModule(
-            name=domain.name,
-            main_tf=main_tf,
-            variables_tf=variables_tf,
-            outputs_tf=outputs_tf
-        )
+        wiring, sources, entries = self._wired_entries(graph)
+        return self._render_project_files(graph, wiring, sources, entries)
+    
+    def _render_project_files(
+        self,
+        graph: InfrastructureGraph,
+        wiring: ModuleWiring,
+        sources: Dict[str, str],
+        entries: List[Tuple[Domain, List[Resource]]]
+    ) -> Iterator[Tuple[str, str]]:
+        registry_version = ServiceRegistry.get_instance().version if self.use_cache else None
+        for domain, domain_resources in entries:
+            key = None
+            module = None
+            if self.use_cache:
+                key = self._module_cache_key(domain, domain_resources, registry_version)
+                module = _module_cache.get(key)
+            if module is None:
+                module = self.generate_module(domain, domain_resources)
+                if key is not None:
+                    _module_cache.set(key, module)
+            
+            suffix = self.file_suffix
+            yield f"modules/{domain.name}/main{suffix}", module.main_tf
+            yield f"modules/{domain.name}/variables{suffix}", module.variables_tf
+            yield f"modules/{domain.name}/outputs{suffix}", module.outputs_tf
+        
+        yield f"main{self.file_suffix}", self.generate_root_main(graph, wiring, sources)
+        yield f"providers{self.file_suffix}", self.generate_providers(graph)
+        yield f"terraform{self.file_suffix}", self.generate_terraform_config()
     
-    def _generate_variables(self, domain: Domain, resources: List[Resource]) -> str:
+    def _share_modules(
+        self,
+        entries: List[Tuple[Domain, List[Resource]]]
+    ) -> Tuple[Dict[str, str], List[Tuple[Domain, List[Resource]]]]:
         """
-        Generate variables.tf with database passwords for RDS instances
+        Collapse domains whose module content is identical into one shared module
         
-        ✅ FIX #5: Adds required DB password variables
+        Returns domain name -> module name, and the modules to render (first
+        instance order). A shared module is named '<type>_<content hash>'.
         """
-        variables = list(domain.inputs)
-        
-        # ✅ FIX #5: Add DB password variables for RDS instances
-        db_password_envs = set()
-        for resource in resources:
-            if resource.type == 'aws_db_instance':
-                # Extract environment from resource name (assumes naming like 'rds-dev', 'rds-staging', 'rds-prod')
-                name_parts = resource.name.split('-')
-                if len(name_parts) >= 2:
-                    env = name_parts[-1]
-                    if env in ['dev', 'staging', 'prod']:
-                        db_password_envs.add(env)
-        
-        # Add password variables for each environment
-        for env in sorted(db_password_envs):
-            var_name = f'db_password_{env}'
-            if not any(v.name == var_name for v in variables):
-                variables.append(DomainOutput(  # Using DomainOutput as it has name/type/description
-                    name=var_name,
-                    type='string',
-                    description=f'Database password for {env} environment (sensitive)'
-                ))
-        
-        # Render template
-        variables_template = self.template_env.get_template('variables.tf.j2')
-        
-        # Convert DomainOutput objects to dicts for template
-        variables_dicts = []
-        for v in variables:
-            is_password = 'password' in v.name.lower()
-            var_dict = {
-                'name': v.name,
-                'type': v.type,
-                'required': True if is_password else getattr(v, 'required', False),
-                'description': v.description if v.description else v.name,
-                'sensitive': True if is_password else False  # Boolean, not string expression
-            }
-            variables_dicts.append(var_dict)
-        
-        return variables_template.render(inputs=variables_dicts)
+        if not self.share_modules:
+            return {domain.name: domain.name for domain, _ in entries}, entries
+        
+        registry_version = ServiceRegistry.get_instance().version
+        groups: Dict[str, List[int]] = {}
+        for idx, (domain, resources) in enumerate(entries):
+            unique_resources = list({r.id: r for r in resources}.values())
+            groups.setdefault(hash_module_content(domain, unique_resources, registry_version), []).append(idx)
+        
+        taken = {domain.name for domain, _ in entries}
+        module_names: List[str] = [''] * len(entries)
+        unique: List[Tuple[Domain, List[Resource]]] = []
+        for content_hash, indices in groups.items():
+            domain, resources = entries[indices[0]]
+            if len(indices) > 1:
+                name = f"{domain.type.value}_{content_hash[:8]}"
+                while name in taken:
+                    name = f"{name}_shared"
+                taken.add(name)
+                domain = replace(domain, name=name)
+            for idx in indices:
+                module_names[idx] = domain.name
+            unique.append((domain, resources))
+        sources = {domain.name: module_name for (domain, _), module_name in zip(entries, module_names)}
+        
+        shared = len(entries) - len(unique)
+        if shared:
+            logger.info(f"Module sharing: {len(entries)} domains rendered as {len(unique)} modules")
+        return sources, unique
+    
+    def _wired_entries(
+        self,
+        graph: InfrastructureGraph
+    ) -> Tuple[ModuleWiring, Dict[str, str], List[Tuple[Domain, List[Resource]]]]:
+        """Wiring, domain -> module names, and the wired modules to render"""
+        entries = self._domain_entries(graph)
+        wiring = self.module_wiring(graph, entries)
+        entries = [
+            (wired_domain(domain, wiring), wired_resources(resources, graph, wiring))
+            for domain, resources in entries
+        ]
+        sources, entries = self._share_modules(entries)
+        return wiring, sources, entries
     
-    def infer_outputs(self, domain: Domain, resources: List[Resource]) -> List[DomainOutput]:
+    def module_wiring(
+        self,
+        graph: InfrastructureGraph,
+        entries: Optional[List[Tuple[Domain, List[Resource]]]] = None
+    ) -> ModuleWiring:
+        """Connection-driven wiring for the modules this project renders"""
+        if entries is None:
+            entries = self._domain_entries(graph)
+        return compute_wiring(graph, [domain.id for domain, _ in entries])
+    
+    def _module_cache_key(self, domain: Domain, resources: List[Resource], registry_version: str) -> str:
+        return f"{hash_domain(domain, resources, registry_version)}:{self.pipeline.cache_key}"
+    
+    def _domain_entries(self, graph: InfrastructureGraph) -> List[Tuple[Domain, List[Resource]]]:
+        """Domains that have resources, with their resources, in graph order"""
+        entries = []
+        for domain in graph.domains.values():
+            domain_resources = [
+                graph.resources[rid] for rid in domain.resource_ids
+                if rid in graph.resources
+            ]
+            if domain_resources:
+                entries.append((domain, domain_resources))
+        return entries
+    
+    def render_modules(self, entries: List[Tuple[Domain, List[Resource]]]) -> List[TerraformModule]:
         """
-        Infer module outputs from resources
+        Render modules, fanning out to worker processes for large projects
         
-        ✅ FIX #4: Generates standard outputs per domain type for cross-module references
+        Results are returned in input order.
         """
-        outputs = list(domain.outputs)
-        
-        # ✅ FIX #4: Add standard outputs based on domain type
-        if domain.type.value == 'networking':
-            # Add standard networking outputs
-            standard_outputs = [
-                ('vpc_id', 'string', 'VPC ID'),
-                ('public_subnet_ids', 'list(string)', 'Public subnet IDs'),
-                ('private_subnet_ids', 'list(string)', 'Private subnet IDs'),
-                ('security_group_web_id', 'string', 'Web security group ID'),
-                ('security_group_db_id', 'string', 'Database security group ID'),
-            ]
-            for out_name, out_type, out_desc in standard_outputs:
-                if not any(o.name == out_name for o in outputs):
-                    outputs.append(DomainOutput(
-                        name=out_name,
-                        type=out_type,
-                        description=out_desc
-                    ))
-        
-        elif domain.type.value == 'compute':
-            standard_outputs = [
-                ('asg_name', 'string', 'Auto Scaling Group name'),
-                ('launch_template_id', 'string', 'Launch Template ID'),
-            ]
-            for out_name, out_type, out_desc in standard_outputs:
-                if not any(o.name == out_name for o in outputs):
-                    outputs.append(DomainOutput(
-                        name=out_name,
-                        type=out_type,
-                        description=out_desc
-                    ))
-        
-        elif domain.type.value == 'data':
-            standard_outputs = [
-                ('db_endpoint', 'string', 'Database endpoint'),
-                ('db_name', 'string', 'Database name'),
-                ('db_port', 'number', 'Database port'),
-            ]
-            for out_name, out_type, out_desc in standard_outputs:
-                if not any(o.name == out_name for o in outputs):
-                    outputs.append(DomainOutput(
-                        name=out_name,
-                        type=out_type,
-                        description=out_desc
-                    ))
-        
-        # Add service-specific outputs from registry
-        registry = ServiceRegistry.get_instance()
-        for resource in resources:
-            service = registry.get_service(resource.type)
-            if service:
-                for export in service.exports:
-                    output_name = f"{resource.name}_{export}"
-                    if not any(o.name == output_name for o in outputs):
-                        outputs.append(DomainOutput(
-                            name=output_name,
-                            type='string',
-                            description=f"{export} from {resource.name}"
-                        ))
-        
-        return outputs
+        if self.parallel and len(entries) >= PARALLEL_MODULE_THRESHOLD and RENDER_WORKERS > 1:
+            pool = None
+            try:
+                pool = _get_render_pool()
+                chunk_size = max(1, len(entries) // (RENDER_WORKERS * 4))
+                render = partial(_render_module_entry, pipeline=self.pipeline)
+                return list(pool.map(render, entries, chunksize=chunk_size))
+            except BrokenProcessPool as e:
+                logger.warning(f"Module rendering pool broke, rendering serially: {e}")
+                _discard_render_pool(pool)
+            except Exception as e:
+                logger.warning(f"Parallel module rendering failed, rendering serially: {e}")
+        
+        return [self.generate_module(domain, resources) for domain, resources in entries]
     
-    def generate_root_main(self, domains: List[Domain]) -> str:
+    def generate_module(self, domain: Domain, resources: List[Resource]) -> TerraformModule:
+        """Generate Terraform module for domain by running it through the pipeline"""
+        return self.pipeline.build(domain, resources)
+    
+    def generate_root_main(
+        self,
+        graph: InfrastructureGraph,
+        wiring: Optional[ModuleWiring] = None,
+        module_sources: Optional[Dict[str, str]] = None
+    ) -> str:
         """
         Generate root main.tf that wires modules together
         
-        ✅ FIX #4: Properly passes outputs between modules for cross-module references
+        Modules are emitted in topological order of the graph's connections and
+        receive the outputs their connections name (see app.terraform.wiring).
         """
-        lines = ['# Root module - wires all domains together\n']
+        if wiring is None:
+            wiring = self.module_wiring(graph)
+        module_sources = module_sources or {}
         
-        # Generate modules in dependency order (networking first)
-        domain_order = ['networking', 'compute', 'data', 'storage', 'edge', 'identity', 'observability']
-        sorted_domains = sorted(domains, key=lambda d: domain_order.index(d.type.value) if d.type.value in domain_order else 999)
+        blocks = []
+        for domain_id in wiring.order:
+            domain = graph.domains[domain_id]
+            depends_on = [graph.domains[d].name for d in wiring.depends_on.get(domain_id, [])]
+            source = module_sources.get(domain.name, domain.name)
+            blocks.append((domain.name, wiring.inputs.get(domain_id, {}), depends_on, source))
         
-        for domain in sorted_domains:
-            lines.append(f'\nmodule "{domain.name}" {{')
-            lines.append(f'  source = "./modules/{domain.name}"')
-            
-            # ✅ FIX #4: Pass outputs from other modules as inputs
-            if domain.type.value == 'compute':
-                # Compute module needs networking outputs
-                lines.append('  # Networking outputs')
-                lines.append('  vpc_id = module.networking.vpc_id')
-                lines.append('  private_subnet_ids = module.networking.private_subnet_ids')
-                lines.append('  security_group_web_id = module.networking.security_group_web_id')
-            
-            elif domain.type.value == 'data':
-                # Data module needs networking outputs
-                lines.append('  # Networking outputs')
-                lines.append('  vpc_id = module.networking.vpc_id')
-                lines.append('  private_subnet_ids = module.networking.private_subnet_ids')
-                lines.append('  security_group_db_id = module.networking.security_group_db_id')
-            
-            elif domain.type.value == 'edge':
-                # Edge module needs compute outputs
-                lines.append('  # Compute outputs')
-                lines.append('  asg_name = module.compute.asg_name')
+        if self.output_format == 'json':
+            return tfjson.dumps(tfjson.modules_document(blocks))
+        
+        lines = ['# Root module - wires all domains together\n']
+        for name, inputs, depends_on, source in blocks:
+            lines.append(f'\nmodule "{name}" {{')
+            lines.append(f'  source = "./modules/{source}"')
+            if depends_on:
+                lines.append(f'  depends_on = [{", ".join(f"module.{d}" for d in depends_on)}]')
             
-            # Add user-defined input variables
-            for inp in domain.inputs:
-                lines.append(f'  {inp.name} = var.{inp.name}')
+            # Group references to other modules under a comment naming the source module
+            current_source = None
+            for input_name, expression in inputs.items():
+                parts = expression.split('.')
+                if parts[0] == 'module' and parts[1] != current_source:
+                    current_source = parts[1]
+                    lines.append(f'  # From module.{current_source}')
+                lines.append(f'  {input_name} = {expression}')
             
             lines.append('}')
         
         return '\n'.join(lines)
     
-    def generate_providers(self) -> str:
-        """Generate providers.tf"""
-        return '''terraform {
-  required_providers {
-    aws = {
+    def uses_regional_expansion(self, graph: InfrastructureGraph) -> bool:
+        """Whether any resource is expanded per region (and so sets the per-resource region)"""
+        return self.deployment is not None and any(
+            effective_strategy(
+                DeploymentStrategy(resource.deployment.get('strategy', 'single')),
+                resource.type
+            ) == DeploymentStrategy.REGIONAL
+            for resource in graph.resources.values()
+        )
+    
+    def generate_providers(self, graph: Optional[InfrastructureGraph] = None) -> str:
+        """
+        Generate providers.tf (the default region is the deployment's primary region)
+        
+        Regional expansion needs the per-resource `region` argument, so the
+        AWS provider is pinned to 6.x when the graph uses it.
+        """
+        region = self.deployment.primary_region if self.deployment else 'us-east-1'
+        regional = graph is not None and self.uses_regional_expansion(graph)
+        version = REGIONAL_AWS_PROVIDER_VERSION if regional else AWS_PROVIDER_VERSION
+        if self.output_format == 'json':
+            return tfjson.dumps(tfjson.providers_document(region, version))
+        return f'''terraform {{
+  required_providers {{
+    aws = {{
       source  = "hashicorp/aws"
-      version = "~> 5.0"
-    }
-  }
-}
+      version = "{version}"
+    }}
+  }}
+}}
 
-provider "aws" {
+provider "aws" {{
   region = var.aws_region
-}
+}}
 
-variable "aws_region" {
+variable "aws_region" {{
   type        = string
   description = "AWS region"
-  default     = "us-east-1"
-}
+  default     = "{region}"
+}}
 '''
     
     def generate_terraform_config(self) -> str:
         """Generate terraform.tf"""
+        if self.output_format == 'json':
+            return tfjson.dumps(tfjson.TERRAFORM_CONFIG_DOCUMENT)
         return '''terraform {
   required_version = ">= 1.5.0"
 }
@@ -0,0 +1,292 @@
+"""
+HCL rendering shared by the Terraform generators
+
+HCLWriter appends tokens to a single output buffer, so rendering is linear in
+output size no matter how deeply arguments are nested (policy documents,
+CloudFront origins, ...). It can be used directly or through the `to_hcl` and
+`hcl_body` template filters.
+"""
+
+import re
+from typing import Any, List, Mapping, Sequence
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_-]*$')
+_ESCAPES = {'\\': '\\\\', '"': '\\"', '\n': '\\n', '\r': '\\r', '\t': '\\t'}
+_ESCAPE_PATTERN = re.compile(r'[\\"\n\r\t]')
+# Template sequences in literal text: `${` left unclosed and `%{` directives,
+# unless already escaped as `$${` / `%%{`
+_TEMPLATE_PATTERN = re.compile(r'[$%]\{')
+_UNESCAPED_TEMPLATE_PATTERN = re.compile(r'(?<!\$)\$\{|(?<!%)%\{')
+
+
+# Number of labels each top-level block type takes in a Terraform JSON-shaped document
+BLOCK_LABELS = {
+    'resource': 2,
+    'data': 2,
+    'module': 1,
+    'output': 1,
+    'variable': 1,
+    'provider': 1,
+    'locals': 0,
+    'terraform': 0,
+}
+
+
+def _interpolation_end(value: str, start: int) -> int:
+    """Index just past the `}` closing the `${` at start, or -1 when it is never closed"""
+    depth = 0
+    quoted = False
+    idx = start + 2
+    while idx < len(value):
+        char = value[idx]
+        if quoted:
+            if char == '\\':
+                idx += 1
+            elif char == '"':
+                quoted = False
+        elif char == '"':
+            quoted = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            if depth == 0:
+                return idx + 1
+            depth -= 1
+        idx += 1
+    return -1
+
+
+def _split_interpolations(value: str) -> List[str]:
+    """Alternating literal text and `${...}` segments (odd indexes), braces and quotes balanced"""
+    segments = []
+    literal_start = 0
+    start = value.find('${')
+    while start != -1:
+        if start and value[start - 1] == '$':
+            # `$${` is an escaped, literal `${`
+            start = value.find('${', start + 2)
+            continue
+        end = _interpolation_end(value, start)
+        if end == -1:
+            break
+        segments.append(value[literal_start:start])
+        segments.append(value[start:end])
+        literal_start = end
+        start = value.find('${', end)
+    segments.append(value[literal_start:])
+    return segments
+
+
+def escape_template(text: str) -> str:
+    """Literal text as a template: `${` and `%{` doubled so neither is interpolated"""
+    return _TEMPLATE_PATTERN.sub(lambda m: m.group()[0] + m.group(), text)
+
+
+def _escape_literal_templates(text: str) -> str:
+    return _UNESCAPED_TEMPLATE_PATTERN.sub(lambda m: m.group()[0] + m.group(), text)
+
+
+def _is_block_list(value: Any) -> bool:
+    """A non-empty list of dicts is rendered as repeated nested blocks"""
+    return isinstance(value, list) and bool(value) and all(isinstance(v, dict) for v in value)
+
+
+class HCLWriter:
+    """Streaming HCL emitter writing into one buffer"""
+
+    def __init__(self, indent: str = '  ', templates: bool = True):
+        self._parts: List[str] = []
+        self._indent = indent
+        # Without templates every string is literal text, `${` included (backend settings, ...)
+        self._templates = templates
+
+    def getvalue(self) -> str:
+        """Everything written so far"""
+        return ''.join(self._parts)
+
+    def write(self, text: str) -> None:
+        self._parts.append(text)
+
+    def block(self, block_type: str, labels: Sequence[str], body: Mapping[str, Any], level: int = 0) -> None:
+        """Write `type "label" ... { body }`"""
+        indent = self._indent * level
+        self._parts.append(indent)
+        self._parts.append(block_type)
+        for label in labels:
+            self._parts.append(' ')
+            self._string(str(label), level)
+        self._parts.append(' {\n')
+        self.body(body, level + 1)
+        self._parts.append(indent)
+        self._parts.append('}\n')
+
+    def document(self, document: Mapping[str, Any]) -> None:
+        """Write a Terraform JSON-shaped document ({block type: {labels...: body}}) as HCL"""
+        first = True
+        for block_type, content in document.items():
+            for labels, body in self._labeled(content, BLOCK_LABELS.get(block_type, 0), ()):
+                if not first:
+                    self._parts.append('\n')
+                first = False
+                self.block(block_type, labels, body)
+    
+    def _labeled(self, content: Mapping[str, Any], depth: int, labels: tuple):
+        if depth == 0:
+            yield labels, content
+            return
+        for label, inner in content.items():
+            yield from self._labeled(inner, depth - 1, labels + (label,))
+    
+    def body(self, arguments: Mapping[str, Any], level: int = 1) -> None:
+        """Write block contents: attributes, and nested blocks for lists of dicts"""
+        for name, value in arguments.items():
+            if _is_block_list(value):
+                for item in value:
+                    self.block(name, (), item, level)
+            else:
+                self.attribute(name, value, level)
+
+    def attribute(self, name: str, value: Any, level: int = 1) -> None:
+        """Write `name = value`"""
+        self._parts.append(self._indent * level)
+        self._key(name)
+        self._parts.append(' = ')
+        self.expression(value, level)
+        self._parts.append('\n')
+
+    def expression(self, value: Any, level: int = 0) -> None:
+        """Write a value in expression position"""
+        if isinstance(value, str):
+            self._string(value, level)
+
+        elif isinstance(value, bool):
+            self._parts.append('true' if value else 'false')
+
+        elif isinstance(value, (int, float)):
+            self._parts.append(repr(value))
+
+        elif value is None:
+            self._parts.append('null')
+
+        elif isinstance(value, dict):
+            if not value:
+                self._parts.append('{}')
+                return
+            inner = self._indent * (level + 1)
+            self._parts.append('{\n')
+            for k, v in value.items():
+                self._parts.append(inner)
+                self._key(k)
+                self._parts.append(' = ')
+                self.expression(v, level + 1)
+                self._parts.append('\n')
+            self._parts.append(self._indent * level)
+            self._parts.append('}')
+
+        elif isinstance(value, (list, tuple)):
+            if not value:
+                self._parts.append('[]')
+            elif any(isinstance(v, (dict, list, tuple)) for v in value):
+                # Structured items go one per line
+                inner = self._indent * (level + 1)
+                self._parts.append('[\n')
+                for item in value:
+                    self._parts.append(inner)
+                    self.expression(item, level + 1)
+                    self._parts.append(',\n')
+                self._parts.append(self._indent * level)
+                self._parts.append(']')
+            else:
+                self._parts.append('[')
+                for idx, item in enumerate(value):
+                    if idx:
+                        self._parts.append(', ')
+                    self.expression(item, level)
+                self._parts.append(']')
+
+        else:
+            self._parts.append(str(value))
+
+    def _key(self, key: Any) -> None:
+        key = str(key)
+        if _IDENTIFIER.match(key):
+            self._parts.append(key)
+        else:
+            self._quoted(key)
+
+    def _string(self, value: str, level: int) -> None:
+        if not self._templates:
+            self._quoted(value)
+        # A lone interpolation is emitted as a bare expression
+        elif value.startswith('${') and _interpolation_end(value, 0) == len(value):
+            self._parts.append(value[2:-1])
+        elif value.endswith('\n'):
+            # A heredoc's value always ends with a newline, so other multi-line strings stay quoted
+            self._heredoc(value, level)
+        else:
+            self._quoted(value)
+
+    def _quoted(self, value: str) -> None:
+        self._parts.append('"')
+        if not self._templates:
+            self._parts.append(escape_template(self._escape(value)))
+        elif '${' in value or '%{' in value:
+            # Interpolations are expressions (aws_subnet.s["a"].id); only literal text is escaped
+            for idx, segment in enumerate(_split_interpolations(value)):
+                self._parts.append(segment if idx % 2 else _escape_literal_templates(self._escape(segment)))
+        else:
+            self._parts.append(self._escape(value))
+        self._parts.append('"')
+    
+    @staticmethod
+    def _escape(text: str) -> str:
+        return _ESCAPE_PATTERN.sub(lambda m: _ESCAPES[m.group()], text)
+
+    def _heredoc(self, value: str, level: int) -> None:
+        if '${' in value or '%{' in value:
+            # Heredocs are templates too, but take no backslash escapes
+            value = ''.join(
+                segment if idx % 2 else _escape_literal_templates(segment)
+                for idx, segment in enumerate(_split_interpolations(value))
+            )
+        lines = value[:-1].split('\n')
+
+        stripped = {line.strip() for line in lines}
+        delimiter = 'EOT'
+        suffix = 0
+        while delimiter in stripped:
+            suffix += 1
+            delimiter = f'EOT{suffix}'
+
+        indent = self._indent * (level + 1)
+        self._parts.append('<<-')
+        self._parts.append(delimiter)
+        self._parts.append('\n')
+        for line in lines:
+            # Blank lines are indented too, so `<<-` strips exactly the added indent from every line
+            self._parts.append(indent)
+            self._parts.append(line)
+            self._parts.append('\n')
+        self._parts.append(self._indent * level)
+        self._parts.append(delimiter)
+
+
+def to_hcl_value(value: Any, indent_level: int = 0) -> str:
+    """Convert Python value to an HCL expression (`to_hcl` template filter)"""
+    writer = HCLWriter()
+    writer.expression(value, indent_level)
+    return writer.getvalue()
+
+
+def to_hcl_body(arguments: Mapping[str, Any], indent_level: int = 1) -> str:
+    """Render block contents, including nested blocks (`hcl_body` template filter)"""
+    writer = HCLWriter()
+    writer.body(arguments, indent_level)
+    return writer.getvalue()
+
+
+def to_hcl_document(document: Mapping[str, Any]) -> str:
+    """Render a Terraform JSON-shaped document as HCL"""
+    writer = HCLWriter()
+    writer.document(document)
+    return writer.getvalue()
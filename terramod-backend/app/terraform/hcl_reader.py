@@ -0,0 +1,327 @@
+"""
+Fast HCL reading for Terraform import
+
+A tokenizer and recursive-descent parser for the part of HCL2 Terramod
+imports: blocks, attributes, lists, objects, heredocs, quoted templates,
+references, function calls and simple for expressions. Its output matches
+`hcl2.loads` (python-hcl2 4.x) exactly, including that library's
+conventions: template strings are kept raw, references, calls and for
+expressions become "${...}" strings, and `var.x.0` is written `var.x[0]`.
+
+Anything outside that subset (operators, conditionals, `if` filters,
+nested quotes inside interpolations, ...) raises UnsupportedSyntax, and
+`loads` falls back to hcl2 for the whole file.
+"""
+
+import re
+from typing import Any, Dict, List
+import hcl2
+
+
+# Bump whenever the reader's output changes, so cached parse results made
+# by an older reader are not reused
+READER_VERSION = 2
+
+
+class UnsupportedSyntax(ValueError):
+    """The file uses syntax the fast reader does not handle"""
+
+
+# One regex pass yields every token as a plain string; the parser tells
+# kinds apart by their first character. Any character no other alternative
+# matches comes out alone and is rejected by the parser.
+_TOKEN = re.compile(r'[ \t]*(' + '|'.join([
+    r'\n',
+    r'#[^\n]*|//[^\n]*|/\*.*?\*/',
+    r'<<-?([A-Za-z_][A-Za-z0-9_-]*)\n(?:.*?\n)??[ \t]*\2[ \t]*(?=\n|\Z)',
+    # Interpolations may not nest braces or quotes; those files go to hcl2
+    r'"(?:[^"\\\n$%]|\\.|[$%](?!\{)|[$%]\{[^{}"\n]*\})*"',
+    r'\d+(?:\.\d+)?(?![A-Za-z0-9_])',
+    r'[A-Za-z_][A-Za-z0-9_-]*',
+    r'\.\.\.|=>',
+    r'[ \t]+|.',
+]) + ')', re.DOTALL)
+
+_IDENT_START = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_')
+_KEYWORDS = {'true': True, 'false': False, 'null': None}
+_END = ''
+
+
+def tokenize(text: str) -> List[str]:
+    """Split HCL source into tokens, dropping blanks and comments"""
+    if '\r' in text:
+        raise UnsupportedSyntax("Carriage returns")
+    return [
+        token for token, _ in _TOKEN.findall(text)
+        if token[0] not in ' \t#/' or token == '/'
+    ]
+
+
+def _is_ident(token: str) -> bool:
+    return token[:1] in _IDENT_START
+
+
+def _is_string(token: str) -> bool:
+    return len(token) > 1 and token[0] == '"'
+
+
+def _is_number(token: str) -> bool:
+    return token[:1].isdigit()
+
+
+def _number(token: str) -> Any:
+    return float(token) if '.' in token else int(token)
+
+
+def _heredoc(token: str) -> str:
+    lines = token.split('\n')
+    # hcl2 drops trailing newlines, tabs and spaces from the body
+    text = '\n'.join(lines[1:-1]).rstrip('\n\t ')
+    if lines[0].startswith('<<-'):
+        # ... then strips the smallest run of leading spaces, counting blank lines
+        content = text.split('\n')
+        indent = min(len(line) - len(line.lstrip(' ')) for line in content)
+        text = '\n'.join(line[indent:] for line in content)
+    return text
+
+
+class _Parser:
+    """Recursive descent over tokenize() output"""
+
+    def __init__(self, tokens: List[str]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self, offset: int = 0) -> str:
+        index = self.pos + offset
+        return self.tokens[index] if index < len(self.tokens) else _END
+
+    def next(self) -> str:
+        token = self.peek()
+        self.pos += 1
+        return token
+
+    def expect(self, value: str) -> None:
+        token = self.next()
+        if token != value:
+            raise UnsupportedSyntax(f"Expected {value!r}, found {token!r}")
+
+    def skip_newlines(self) -> None:
+        tokens = self.tokens
+        while self.pos < len(tokens) and tokens[self.pos] == '\n':
+            self.pos += 1
+
+    def body(self, closing: str) -> Dict[str, Any]:
+        """Attributes and blocks up to `closing` ('}', or _END for end of file)"""
+        items: Dict[str, Any] = {}
+        blocks = set()
+        while True:
+            self.skip_newlines()
+            name = self.next()
+            if name == closing:
+                return items
+            if not _is_ident(name):
+                raise UnsupportedSyntax(f"Expected an attribute or block, found {name!r}")
+
+            if self.peek() == '=':
+                self.pos += 1
+                if name in items:
+                    raise UnsupportedSyntax(f"Duplicate attribute {name}")
+                items[name] = self.expression()
+            else:
+                labels = []
+                while _is_string(self.peek()) or _is_ident(self.peek()):
+                    label = self.next()
+                    labels.append(label[1:-1] if label[0] == '"' else label)
+                self.expect('{')
+                value: Any = self.body('}')
+                for label in reversed(labels):
+                    value = {label: value}
+                if name in items and name not in blocks:
+                    raise UnsupportedSyntax(f"Block {name} repeats an attribute name")
+                blocks.add(name)
+                items.setdefault(name, []).append(value)
+
+            following = self.peek()
+            if following != '\n' and following != closing:
+                raise UnsupportedSyntax(f"Expected a new line, found {following!r}")
+
+    def expression(self) -> Any:
+        token = self.next()
+        if _is_string(token):
+            return token[1:-1]
+        if _is_ident(token):
+            if token in _KEYWORDS:
+                return _KEYWORDS[token]
+            return f"${{{self.reference(token)}}}"
+        if _is_number(token):
+            return _number(token)
+        if token == '[':
+            return self.sequence()
+        if token == '{':
+            return self.mapping()
+        if token.startswith('<<'):
+            return _heredoc(token)
+        raise UnsupportedSyntax(f"Unsupported expression at {token!r}")
+
+    def at_for(self) -> bool:
+        self.skip_newlines()
+        return self.peek() == 'for' and _is_ident(self.peek(1))
+
+    def for_clause(self) -> str:
+        """`for k, v in collection :` as hcl2 writes it ("k , v")"""
+        self.pos += 1
+        names = [self.identifier()]
+        if self.peek() == ',':
+            self.pos += 1
+            names.append(self.identifier())
+        self.expect('in')
+        collection = self.argument()
+        self.skip_newlines()
+        self.expect(':')
+        return f"for {' , '.join(names)} in {collection} : "
+
+    def identifier(self) -> str:
+        token = self.next()
+        if not _is_ident(token):
+            raise UnsupportedSyntax(f"Expected an identifier, found {token!r}")
+        return token
+
+    def for_end(self, closing: str) -> None:
+        self.skip_newlines()
+        token = self.next()
+        if token != closing:
+            raise UnsupportedSyntax(f"Unsupported for expression ending at {token!r}")
+
+    def sequence(self) -> Any:
+        if self.at_for():
+            clause = self.for_clause()
+            value = self.argument()
+            self.for_end(']')
+            return f"${{[{clause}{value}]}}"
+
+        values = []
+        while True:
+            self.skip_newlines()
+            if self.peek() == ']':
+                self.pos += 1
+                return values
+            values.append(self.expression())
+            self.skip_newlines()
+            token = self.peek()
+            if token == ',':
+                self.pos += 1
+            elif token != ']':
+                raise UnsupportedSyntax(f"Expected ',' or ']', found {token!r}")
+
+    def mapping(self) -> Any:
+        if self.at_for():
+            clause = self.for_clause()
+            key = self.argument()
+            self.expect('=>')
+            value = self.argument()
+            self.for_end('}')
+            return f"${{{{{clause}{key} => {value}}}}}"
+
+        values = {}
+        while True:
+            self.skip_newlines()
+            key = self.next()
+            if key == '}':
+                return values
+            if _is_string(key) and '${' not in key:
+                key = key[1:-1]
+            elif not _is_ident(key):
+                raise UnsupportedSyntax(f"Unsupported object key {key!r}")
+            if self.peek() not in ('=', ':'):
+                raise UnsupportedSyntax(f"Expected '=' after {key!r}")
+            self.pos += 1
+            values[key] = self.expression()
+            token = self.peek()
+            if token == ',':
+                self.pos += 1
+            elif token != '\n' and token != '}':
+                raise UnsupportedSyntax(f"Expected a new line, found {token!r}")
+
+    def reference(self, name: str) -> str:
+        """A traversal or function call starting at identifier `name`, as hcl2 writes it"""
+        if self.peek() == '(':
+            return self.call(name)
+
+        parts = [name]
+        while True:
+            token = self.peek()
+            if token == '.':
+                following = self.peek(1)
+                if _is_ident(following):
+                    parts.append(f".{following}")
+                elif len(following) == 1 and following.isdigit():
+                    # Legacy `.0` index; hcl2 misreads longer ones, so leave those to it
+                    parts.append(f"[{following}]")
+                elif following == '*':
+                    parts.append('.*')
+                else:
+                    raise UnsupportedSyntax(f"Unsupported traversal after {''.join(parts)}")
+                self.pos += 2
+            elif token == '[':
+                self.pos += 1
+                parts.append(f"[{self.index()}]")
+                self.expect(']')
+            else:
+                return ''.join(parts)
+
+    def index(self) -> str:
+        token = self.next()
+        if token == '*':
+            return '*'
+        if token.isdigit() and (token == '0' or not token.startswith('0')):
+            return token
+        if _is_string(token) and '${' not in token:
+            return token
+        if _is_ident(token) and token not in _KEYWORDS:
+            return self.reference(token)
+        raise UnsupportedSyntax(f"Unsupported index {token!r}")
+
+    def call(self, name: str) -> str:
+        self.expect('(')
+        arguments = []
+        while True:
+            self.skip_newlines()
+            if self.peek() == ')':
+                self.pos += 1
+                return f"{name}({', '.join(arguments)})"
+            arguments.append(self.argument())
+            if self.peek() == '...':
+                self.pos += 1  # hcl2 drops argument expansion
+            self.skip_newlines()
+            token = self.peek()
+            if token == ',':
+                self.pos += 1
+            elif token != ')':
+                raise UnsupportedSyntax(f"Expected ',' or ')', found {token!r}")
+
+    def argument(self) -> str:
+        """An operand inside a call or for expression, as hcl2 writes it"""
+        token = self.next()
+        if _is_string(token):
+            return token
+        if _is_ident(token):
+            if token in _KEYWORDS:
+                return str(_KEYWORDS[token])
+            return self.reference(token)
+        if _is_number(token):
+            return str(_number(token))
+        raise UnsupportedSyntax(f"Unsupported operand at {token!r}")
+
+
+def parse(text: str) -> Dict[str, Any]:
+    """Parse HCL with the fast reader only, raising UnsupportedSyntax outside its subset"""
+    return _Parser(tokenize(text)).body(_END)
+
+
+def loads(text: str) -> Dict[str, Any]:
+    """Parse HCL like `hcl2.loads`, using the fast reader whenever it can"""
+    try:
+        return parse(text)
+    except UnsupportedSyntax:
+        return hcl2.loads(text)
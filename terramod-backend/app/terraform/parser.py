@@ -1,57 +1,245 @@
-from typing import Dict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
 import hcl2
+import logging
+import os
+import threading
 from app.core.graph import InfrastructureGraph
 from app.core.domain import Domain, DomainType, Position
 from app.core.resource import Resource
 from app.registry.loader import ServiceRegistry
-import logging
+from app.terraform import hcl_reader
+from app.utils.cache import DiskCache, private_directory
+from app.utils.hash import hash_content
+from config import settings
 
 logger = logging.getLogger(__name__)
 
+# HCL parsing fans out to worker processes from this many files on
+PARALLEL_PARSE_THRESHOLD = settings.PARALLEL_PARSE_THRESHOLD
+PARSE_WORKERS = settings.PARSER_WORKERS
+
+# Parse with the fast reader (falling back to hcl2 per file); 0 forces hcl2 everywhere
+FAST_HCL_READER = settings.FAST_HCL_READER
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_lock = threading.Lock()
+
+# Parsed HCL by SHA-256 of file content, one directory per hcl2 version
+PARSE_CACHE_SIZE = settings.PARSE_CACHE_SIZE
+_parse_cache: Optional[DiskCache] = None
+_parse_cache_lock = threading.Lock()
+_parse_cache_disabled = False
+
+def _parse_cache_dir() -> str:
+    # The base directory holds trusted parse results too, so it is private as well
+    base_dir = private_directory(settings.PARSE_CACHE_DIR)
+    # Results depend on the reader that made them: keep each reader's apart
+    reader = f"hcl2-{hcl2.__version__}"
+    if FAST_HCL_READER:
+        reader += f"-fast{hcl_reader.READER_VERSION}"
+    return os.path.join(base_dir, reader)
+
+def get_parse_cache() -> Optional[DiskCache]:
+    """Get the on-disk parse cache, or None when its directory is unusable"""
+    global _parse_cache, _parse_cache_disabled
+    
+    if _parse_cache is None and not _parse_cache_disabled:
+        with _parse_cache_lock:
+            if _parse_cache is None and not _parse_cache_disabled:
+                try:
+                    _parse_cache = DiskCache(_parse_cache_dir(), max_entries=PARSE_CACHE_SIZE)
+                except OSError as e:
+                    logger.warning(f"Parse cache disabled: {e}")
+                    _parse_cache_disabled = True
+    return _parse_cache
+
+def _parse_file(item: Tuple[str, str]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Parse one file's HCL, returning (parsed, error) so one bad file never fails the batch"""
+    filename, content = item
+    try:
+        if FAST_HCL_READER:
+            return hcl_reader.loads(content), None
+        return hcl2.loads(content), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    """Get process-wide HCL parsing pool, started on first use"""
+    global _parse_pool
+    
+    if _parse_pool is None:
+        with _parse_pool_lock:
+            if _parse_pool is None:
+                _parse_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+    return _parse_pool
+
+def _discard_parse_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken pool (e.g. a worker was OOM-killed) so the next call starts a fresh one"""
+    global _parse_pool
+    
+    with _parse_pool_lock:
+        if _parse_pool is pool:
+            _parse_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def shutdown_parse_pool() -> None:
+    """Stop the HCL parsing pool"""
+    global _parse_pool
+    
+    with _parse_pool_lock:
+        if _parse_pool is not None:
+            _parse_pool.shutdown(wait=True)
+            _parse_pool = None
+
+@dataclass
+class FileParseReport:
+    filename: str
+    resources: int = 0
+    error: Optional[str] = None
+    cached: bool = False  # parsed HCL came from the parse cache
+
+@dataclass
+class ImportResult:
+    graph: InfrastructureGraph
+    files: List[FileParseReport] = field(default_factory=list)
+    
+    @property
+    def errors(self) -> List[FileParseReport]:
+        return [report for report in self.files if report.error]
+    
+    @property
+    def cache_hits(self) -> int:
+        return sum(1 for report in self.files if report.cached)
+
 class TerraformParser:
     """Terraform HCL parser"""
     
-    def __init__(self):
+    def __init__(self, parallel: bool = True, use_cache: bool = True):
         self.registry = ServiceRegistry.get_instance()
+        self.parallel = parallel
+        self.use_cache = use_cache
     
     def parse_project(self, files: Dict[str, str]) -> InfrastructureGraph:
         """Parse Terraform files into infrastructure graph"""
-        graph = InfrastructureGraph()
+        return self.import_project(files).graph
+    
+    def import_project(self, files: Dict[str, str]) -> ImportResult:
+        """
+        Parse Terraform files into a graph, reporting each file's outcome
         
-        # Parse each file
-        for filename, content in files.items():
-            try:
-                parsed = hcl2.loads(content)
-                
-                # Extract resources
-                if 'resource' in parsed:
-                    resources = self.extract_resources(parsed['resource'], filename)
+        Files are merged in filename order, so the graph does not depend on
+        upload order or on which worker finished first. A file that fails to
+        parse, or declares a resource another file already declared, is
+        reported with its error and contributes nothing.
+        """
+        items = sorted(files.items())
+        parsed_files, cached = self.parse_cached(items)
+        
+        graph = InfrastructureGraph()
+        reports = []
+        for (filename, _), (parsed, error), hit in zip(items, parsed_files, cached):
+            report = FileParseReport(filename=filename, error=error, cached=hit)
+            if parsed is not None:
+                try:
+                    resources = self.extract_resources(parsed.get('resource', []), filename)
+                    self._check_duplicates(graph, resources)
                     for resource in resources:
-                        # Assign domain
-                        domain_type = self.assign_domain(resource.type)
-                        
-                        # Create or get domain
-                        domain_id = f"domain_{domain_type.value}"
-                        if not graph.get_domain(domain_id):
-                            domain = Domain(
-                                id=domain_id,
-                                name=domain_type.value,
-                                type=domain_type,
-                                position=Position(0, 0)
-                            )
-                            graph.add_domain(domain)
-                        
-                        # Add resource to domain
-                        resource.domain_id = domain_id
-                        graph.add_resource(resource)
-                        
-            except Exception as e:
-                logger.error(f"Failed to parse {filename}: {e}")
+                        self.add_resource(graph, resource)
+                    report.resources = len(resources)
+                except Exception as e:
+                    report.error = f"{type(e).__name__}: {e}"
+            if report.error:
+                logger.error(f"Failed to parse {filename}: {report.error}")
+            reports.append(report)
         
         # Reconstruct connections
         self.reconstruct_connections(graph)
         
-        return graph
+        return ImportResult(graph=graph, files=reports)
+    
+    def parse_cached(
+        self,
+        items: List[Tuple[str, str]]
+    ) -> Tuple[List[Tuple[Optional[Dict[str, Any]], Optional[str]]], List[bool]]:
+        """
+        Parse (filename, content) pairs, reusing cached results for unchanged content
+        
+        Only cache misses are parsed; files that parse cleanly are cached by
+        the SHA-256 of their content. Returns results in input order and
+        whether each came from the cache.
+        """
+        cache = get_parse_cache() if self.use_cache else None
+        if cache is None:
+            return self.parse_files(items), [False] * len(items)
+        
+        keys = [hash_content(content) for _, content in items]
+        results: List[Tuple[Optional[Dict[str, Any]], Optional[str]]] = [(None, None)] * len(items)
+        cached = [False] * len(items)
+        misses = []
+        for position, key in enumerate(keys):
+            parsed = cache.get(key)
+            if parsed is None:
+                misses.append(position)
+            else:
+                results[position] = (parsed, None)
+                cached[position] = True
+        
+        for position, result in zip(misses, self.parse_files([items[p] for p in misses])):
+            results[position] = result
+            if result[0] is not None:
+                try:
+                    cache.set(keys[position], result[0])
+                except (OSError, TypeError) as e:
+                    logger.warning(f"Failed to cache parsed {items[position][0]}: {e}")
+        return results, cached
+    
+    def parse_files(self, items: List[Tuple[str, str]]) -> List[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+        """
+        Parse (filename, content) pairs, fanning out to worker processes for large imports
+        
+        Results are returned in input order.
+        """
+        if self.parallel and len(items) >= PARALLEL_PARSE_THRESHOLD and PARSE_WORKERS > 1:
+            pool = None
+            try:
+                pool = _get_parse_pool()
+                chunk_size = max(1, len(items) // (PARSE_WORKERS * 4))
+                return list(pool.map(_parse_file, items, chunksize=chunk_size))
+            except BrokenProcessPool as e:
+                logger.warning(f"HCL parsing pool broke, parsing serially: {e}")
+                _discard_parse_pool(pool)
+            except Exception as e:
+                logger.warning(f"Parallel HCL parsing failed, parsing serially: {e}")
+        
+        return [_parse_file(item) for item in items]
+    
+    def _check_duplicates(self, graph: InfrastructureGraph, resources: List[Resource]) -> None:
+        """Reject a file up front rather than half-merging it"""
+        seen = set()
+        for resource in resources:
+            if resource.id in graph.resources or resource.id in seen:
+                raise ValueError(f"Resource {resource.id} already exists")
+            seen.add(resource.id)
+    
+    def add_resource(self, graph: InfrastructureGraph, resource: Resource) -> None:
+        """Add resource to graph under its domain, creating the domain on first use"""
+        domain_type = self.assign_domain(resource.type)
+        
+        domain_id = f"domain_{domain_type.value}"
+        if not graph.get_domain(domain_id):
+            domain = Domain(
+                id=domain_id,
+                name=domain_type.value,
+                type=domain_type,
+                position=Position(0, 0)
+            )
+            graph.add_domain(domain)
+        
+        resource.domain_id = domain_id
+        graph.add_resource(resource)
     
     def extract_resources(self, resource_data: list, source_file: str) -> list[Resource]:
         """Extract resources from parsed HCL"""
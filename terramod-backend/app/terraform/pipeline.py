@@ -0,0 +1,478 @@
+"""
+Staged module pipeline
+
+Every module is built by running its domain through the same stages:
+
+    expand (optional) -> compress (optional) -> infer outputs -> render
+
+and the generator assembles the rendered modules into a project (root
+module, providers, terraform block). Stages read and update a ModuleBuild,
+so a stage can be added, replaced or dropped without touching the others.
+
+Each stage contributes a cache token describing its configuration; the
+pipeline's cache key is part of the module cache key, so modules built by
+different pipelines never share cache entries. Stages are plain picklable
+objects, so pipelines also run unchanged in render worker processes.
+"""
+
+import ipaddress
+import json
+import re
+from dataclasses import asdict, dataclass, field, replace
+from typing import Any, Dict, List, Optional
+from app.core.domain import Domain, DomainOutput
+from app.core.resource import Resource
+from app.deployment import (
+    AZ_PLACEMENT_ARGUMENTS,
+    DeploymentConfig,
+    DeploymentExpander,
+    DeploymentStrategy,
+    effective_strategy,
+    strategy_warning
+)
+from app.deployment.cidr import DEFAULT_SUBNET_PREFIX, DEFAULT_VPC_CIDR, SubnetRequest, plan_subnets
+from app.registry.loader import ServiceRegistry
+from app.terraform import tfjson
+from app.terraform.compression import FOR_EACH_MIN_GROUP, compress_resources, make_rewriter, rewrite_arguments
+from app.terraform.environment import get_template
+from app.utils.hash import hash_content
+import logging
+
+logger = logging.getLogger(__name__)
+
+_LOCAL_REFERENCE = re.compile(r'\blocal\.([A-Za-z_][A-Za-z0-9_]*)')
+_VPC_REFERENCE = re.compile(r'\baws_vpc\.([A-Za-z_][A-Za-z0-9_-]*)\.id\b')
+
+
+@dataclass
+class TerraformModule:
+    name: str
+    main_tf: str
+    variables_tf: str
+    outputs_tf: str
+
+
+@dataclass
+class ExpandedResource:
+    """A resource rendered as one block iterating over AZs or regions"""
+    alias_type: str  # 'az' or 'region'
+    address: str  # 'type.name' of the for_each block, instances keyed by AZ / region
+
+
+@dataclass
+class ModuleBuild:
+    """State passed from stage to stage while one module is built"""
+    domain: Domain
+    resources: List[Resource]  # unique resources as modelled
+    blocks: List[Resource]  # resource blocks to render
+    locals: Dict[str, Any] = field(default_factory=dict)
+    addresses: Dict[str, str] = field(default_factory=dict)  # 'type.name' -> rendered address
+    expanded: Dict[str, ExpandedResource] = field(default_factory=dict)  # resource id -> expansion
+    outputs: List[DomainOutput] = field(default_factory=list)
+    values: Dict[str, str] = field(default_factory=dict)  # output name -> value expression
+    module: Optional[TerraformModule] = None
+
+
+class Stage:
+    """One pipeline step; cache_token identifies its configuration"""
+    name = 'stage'
+
+    def cache_token(self) -> str:
+        return self.name
+
+    def run(self, build: ModuleBuild) -> None:
+        raise NotImplementedError
+
+
+class DeploymentExpansionStage(Stage):
+    """
+    Expand per-AZ and regional resources natively
+
+    Each resource stays one block iterating over the deployment's AZs or
+    regions (for_each over a module local), so the module grows with the
+    number of resources, not resources x aliases. No alias is materialised;
+    outputs reach the instances through for expressions. Per-AZ subnets get
+    non-overlapping CIDRs from app.deployment.cidr, looked up by AZ, and a
+    per-AZ resource referencing another per-AZ resource (a NAT gateway's
+    subnet_id, ...) takes the instance in its own AZ.
+    """
+    name = 'deploy'
+
+    def __init__(self, config: DeploymentConfig):
+        self.config = config
+
+    def cache_token(self) -> str:
+        config = json.dumps(asdict(self.config), sort_keys=True, default=str)
+        return f"{self.name}-{hash_content(config)[:12]}"
+
+    def run(self, build: ModuleBuild) -> None:
+        expander = DeploymentExpander(self.config)
+        strategies = {}
+        for r in build.blocks:
+            requested = DeploymentStrategy(r.deployment.get('strategy', 'single'))
+            strategies[r.id] = effective_strategy(requested, r.type)
+            warning = strategy_warning(r.type, r.name, requested)
+            if warning:
+                logger.warning(warning)
+        az_subnets = next((
+            f"aws_subnet.{r.name}" for r in build.blocks
+            if r.type == 'aws_subnet' and strategies[r.id] == DeploymentStrategy.PER_AZ
+        ), None)
+
+        subnet_cidrs = self._subnet_cidrs(build, strategies)
+
+        # Instances of per-AZ blocks are keyed by AZ, so per-AZ blocks reference each other's by each.key
+        rewrite = make_rewriter({
+            f"{r.type}.{r.name}": f"{r.type}.{r.name}[each.key]"
+            for r in build.blocks
+            if strategies[r.id] == DeploymentStrategy.PER_AZ
+            and not ('for_each' in r.arguments or 'count' in r.arguments)
+        })
+
+        blocks = []
+        for resource in build.blocks:
+            strategy = strategies[resource.id]
+            meta = expander.generate_terraform_expression(strategy, resource.type, resource.arguments, az_subnets)
+            if resource.id in subnet_cidrs:
+                local_name, cidrs = subnet_cidrs[resource.id]
+                build.locals[local_name] = cidrs
+                meta['cidr_block'] = f"${{local.{local_name}[each.value]}}"
+            if not meta:
+                blocks.append(resource)
+                continue
+            if 'for_each' in meta and ('for_each' in resource.arguments or 'count' in resource.arguments):
+                logger.warning(f"{resource.type}.{resource.name} already sets count/for_each, "
+                               f"'{strategy.value}' deployment not applied")
+                blocks.append(resource)
+                continue
+
+            # for_each leads the block, like any meta-argument
+            arguments = {k: v for k, v in meta.items() if k == 'for_each'}
+            if strategy == DeploymentStrategy.PER_AZ:
+                arguments.update(rewrite_arguments(resource.arguments, rewrite))
+                placement = AZ_PLACEMENT_ARGUMENTS.get(resource.type)
+                if placement and '[each.key]' not in str(arguments.get(placement, meta.get(placement, ''))):
+                    logger.warning(f"{resource.type}.{resource.name}: {placement} does not name a per-AZ "
+                                   f"subnet of this module, every instance is placed in the same subnet")
+            else:
+                arguments.update(resource.arguments)
+            arguments.update({k: v for k, v in meta.items() if k != 'for_each'})
+            blocks.append(replace(resource, arguments=arguments))
+            if 'for_each' in meta:
+                alias_type = 'az' if strategy == DeploymentStrategy.PER_AZ else 'region'
+                build.expanded[resource.id] = ExpandedResource(alias_type, f"{resource.type}.{resource.name}")
+
+        # Declare the deployment locals the expressions use
+        available = expander.locals_map()
+        for block in blocks:
+            for name in _LOCAL_REFERENCE.findall(json.dumps(block.arguments, default=str)):
+                if name in available:
+                    build.locals.setdefault(name, available[name])
+
+        if build.expanded:
+            aliases = sum(
+                expander.alias_count(strategies[resource_id]) for resource_id in build.expanded
+            )
+            logger.info(f"Deployment expansion of '{build.domain.name}': {len(build.expanded)} resources "
+                        f"iterate over {aliases} instances")
+        build.blocks = blocks
+
+    def _subnet_cidrs(self, build: ModuleBuild, strategies: Dict[str, DeploymentStrategy]) -> Dict[str, tuple]:
+        """
+        resource id -> (local name, {AZ: CIDR}) for per-AZ subnets
+
+        Each subnet is packed into the VPC its vpc_id references (that VPC's
+        literal cidr_block, or the default VPC CIDR), around the literal
+        CIDRs of the other subnets in the same VPC; a per-AZ subnet's own
+        cidr_block only gives the prefix length. A vpc_id pointing outside
+        the module resolves to the module's only VPC, if it has exactly one.
+        """
+        vpcs = {r.name: r for r in build.blocks if r.type == 'aws_vpc'}
+        sole_vpc = next(iter(vpcs)) if len(vpcs) == 1 else None
+
+        def vpc_of(subnet: Resource) -> Optional[str]:
+            match = _VPC_REFERENCE.search(str(subnet.arguments.get('vpc_id', '')))
+            return match.group(1) if match and match.group(1) in vpcs else sole_vpc
+
+        per_az: Dict[Optional[str], List[Resource]] = {}
+        existing: Dict[Optional[str], List[str]] = {}
+        for resource in build.blocks:
+            if resource.type != 'aws_subnet':
+                continue
+            cidr = _literal_network(resource.arguments.get('cidr_block'))
+            if strategies[resource.id] == DeploymentStrategy.PER_AZ:
+                per_az.setdefault(vpc_of(resource), []).append(resource)
+            elif cidr:
+                existing.setdefault(vpc_of(resource), []).append(cidr)
+
+        primary = self.config.primary_region
+        result = {}
+        for vpc_name, subnets in per_az.items():
+            vpc = vpcs.get(vpc_name)
+            vpc_cidr = (_literal_network(vpc.arguments.get('cidr_block')) if vpc else None) or DEFAULT_VPC_CIDR
+            requests = []
+            for subnet in subnets:
+                cidr = _literal_network(subnet.arguments.get('cidr_block'))
+                prefix_length = int(cidr.split('/')[1]) if cidr else DEFAULT_SUBNET_PREFIX
+                requests.append(SubnetRequest(name=subnet.id, prefix_length=prefix_length))
+
+            plan = plan_subnets(
+                {primary: self.config.availability_zones},
+                {primary: vpc_cidr},
+                requests,
+                existing.get(vpc_name, [])
+            )[0]
+            cidrs: Dict[str, Dict[str, str]] = {}
+            for allocation in plan.subnets:
+                cidrs.setdefault(allocation.name, {})[allocation.availability_zone] = allocation.cidr
+            for subnet in subnets:
+                local_name = f"{subnet.type}_{subnet.name}_cidr_blocks".replace('-', '_')
+                result[subnet.id] = (local_name, cidrs[subnet.id])
+        return result
+
+
+def _literal_network(value: Any) -> Optional[str]:
+    """value as a normalised CIDR when it is a literal (not an expression) CIDR"""
+    if not isinstance(value, str) or '${' in value:
+        return None
+    try:
+        return str(ipaddress.ip_network(value, strict=False))
+    except ValueError:
+        return None
+
+
+class CompressionStage(Stage):
+    """Fold structurally identical blocks into for_each blocks (see app.terraform.compression)"""
+    name = 'for_each'
+
+    def __init__(self, min_group: int = FOR_EACH_MIN_GROUP):
+        self.min_group = min_group
+
+    def cache_token(self) -> str:
+        return f"{self.name}-{self.min_group}"
+
+    def run(self, build: ModuleBuild) -> None:
+        compressed = compress_resources(build.blocks, self.min_group)
+        build.blocks = compressed.resources
+        build.locals.update(compressed.locals)
+        build.addresses.update(compressed.addresses)
+
+
+class OutputInferenceStage(Stage):
+    """Module outputs: declared, standard per domain type and registry exports"""
+    name = 'outputs'
+
+    def run(self, build: ModuleBuild) -> None:
+        build.outputs = infer_outputs(build.domain, build.resources, build.expanded)
+        rewrite = make_rewriter(build.addresses)
+        build.values = {
+            name: rewrite(expression)
+            for name, expression in output_values(build.resources, build.expanded).items()
+        }
+
+
+class RenderStage(Stage):
+    """Render main, variables and outputs as HCL (templates) or Terraform JSON"""
+
+    def __init__(self, output_format: str = 'hcl'):
+        self.output_format = output_format
+        self.name = output_format
+
+    def run(self, build: ModuleBuild) -> None:
+        domain = build.domain
+        variables = module_variables(domain, build.resources)
+
+        if self.output_format == 'json':
+            main_tf = tfjson.dumps({**tfjson.locals_document(build.locals), **tfjson.resources_document(build.blocks)})
+            variables_tf = tfjson.dumps(tfjson.variables_document(variables))
+            outputs_tf = tfjson.dumps(tfjson.outputs_document(build.outputs, build.values))
+        else:
+            main_tf = get_template('module.tf.j2').render(domain=domain, resources=build.blocks, locals=build.locals)
+            variables_tf = get_template('variables.tf.j2').render(inputs=variables)
+            outputs_tf = get_template('outputs.tf.j2').render(outputs=build.outputs, values=build.values)
+
+        build.module = TerraformModule(
+            name=domain.name,
+            main_tf=main_tf,
+            variables_tf=variables_tf,
+            outputs_tf=outputs_tf
+        )
+
+
+class ModulePipeline:
+    """Ordered stages that turn a domain and its resources into a TerraformModule"""
+
+    def __init__(self, stages: List[Stage]):
+        if not stages or not isinstance(stages[-1], RenderStage):
+            raise ValueError("A module pipeline must end with a render stage")
+        self.stages = list(stages)
+
+    @property
+    def cache_key(self) -> str:
+        return ':'.join(stage.cache_token() for stage in self.stages)
+
+    def build(self, domain: Domain, resources: List[Resource]) -> TerraformModule:
+        """
+        Run every stage for one domain
+
+        ✅ FIX #3: Deduplicates resources by ID before the first stage
+        """
+        unique_resources = list({r.id: r for r in resources}.values())
+
+        logger.info(f"Generating module for domain '{domain.name}': "
+                   f"{len(resources)} resources provided, "
+                   f"{len(unique_resources)} unique resources after deduplication")
+
+        build = ModuleBuild(domain=domain, resources=unique_resources, blocks=unique_resources)
+        for stage in self.stages:
+            stage.run(build)
+        return build.module
+
+
+def default_pipeline(
+    output_format: str = 'hcl',
+    compress: bool = False,
+    deployment: Optional[DeploymentConfig] = None
+) -> ModulePipeline:
+    """expand (with a deployment config) -> compress (when asked) -> infer outputs -> render"""
+    stages: List[Stage] = []
+    if deployment is not None:
+        stages.append(DeploymentExpansionStage(deployment))
+    if compress:
+        stages.append(CompressionStage())
+    stages.append(OutputInferenceStage())
+    stages.append(RenderStage(output_format))
+    return ModulePipeline(stages)
+
+
+# Standard outputs per domain type, for cross-module references
+STANDARD_OUTPUTS = {
+    'networking': [
+        ('vpc_id', 'string', 'VPC ID'),
+        ('public_subnet_ids', 'list(string)', 'Public subnet IDs'),
+        ('private_subnet_ids', 'list(string)', 'Private subnet IDs'),
+        ('security_group_web_id', 'string', 'Web security group ID'),
+        ('security_group_db_id', 'string', 'Database security group ID'),
+    ],
+    'compute': [
+        ('asg_name', 'string', 'Auto Scaling Group name'),
+        ('launch_template_id', 'string', 'Launch Template ID'),
+    ],
+    'data': [
+        ('db_endpoint', 'string', 'Database endpoint'),
+        ('db_name', 'string', 'Database name'),
+        ('db_port', 'number', 'Database port'),
+    ],
+}
+
+
+def infer_outputs(
+    domain: Domain,
+    resources: List[Resource],
+    expanded: Optional[Dict[str, ExpandedResource]] = None
+) -> List[DomainOutput]:
+    """
+    Infer module outputs from resources
+
+    ✅ FIX #4: Generates standard outputs per domain type for cross-module references
+
+    An expanded resource exports a list of its instances' values under the
+    usual '<resource>_<export>' name, and per-AZ resources also a map by AZ.
+    """
+    expanded = expanded or {}
+    outputs = list(domain.outputs)
+    names = {o.name for o in outputs}
+
+    def add(name: str, output_type: str, description: str) -> None:
+        if name not in names:
+            names.add(name)
+            outputs.append(DomainOutput(name=name, type=output_type, description=description))
+
+    for out_name, out_type, out_desc in STANDARD_OUTPUTS.get(domain.type.value, []):
+        add(out_name, out_type, out_desc)
+
+    # Add service-specific outputs from registry
+    registry = ServiceRegistry.get_instance()
+    for resource in resources:
+        service = registry.get_service(resource.type)
+        if not service:
+            continue
+        expansion = expanded.get(resource.id)
+        for export in service.exports:
+            if expansion is None:
+                add(f"{resource.name}_{export}", 'string', f"{export} from {resource.name}")
+                continue
+            add(f"{resource.name}_{export}", 'list(string)', f"List of {export} from {resource.name} instances")
+            if expansion.alias_type == 'az':
+                add(f"{resource.name}_{export}_by_az", 'map(string)', f"{export} from {resource.name} mapped by AZ")
+
+    return outputs
+
+
+def output_values(
+    resources: List[Resource],
+    expanded: Optional[Dict[str, ExpandedResource]] = None
+) -> Dict[str, str]:
+    """Value expressions for the '<resource>_<export>' outputs inferred from the registry"""
+    expanded = expanded or {}
+    registry = ServiceRegistry.get_instance()
+    values = {}
+    for resource in resources:
+        service = registry.get_service(resource.type)
+        if not service:
+            continue
+        expansion = expanded.get(resource.id)
+        for export in service.exports:
+            name = f"{resource.name}_{export}"
+            if expansion is None:
+                values[name] = f"{resource.type}.{resource.name}.{export}"
+                continue
+            values[name] = f"[for instance in {expansion.address} : instance.{export}]"
+            if expansion.alias_type == 'az':
+                values[f"{name}_by_az"] = f"{{for az, instance in {expansion.address} : az => instance.{export}}}"
+    return values
+
+
+def module_variables(domain: Domain, resources: List[Resource]) -> List[Dict[str, Any]]:
+    """
+    Variable dicts for variables.tf, with database passwords for RDS instances
+
+    ✅ FIX #5: Adds required DB password variables
+    """
+    variables = list(domain.inputs)
+
+    # ✅ FIX #5: Add DB password variables for RDS instances
+    db_password_envs = set()
+    for resource in resources:
+        if resource.type == 'aws_db_instance':
+            # Extract environment from resource name (assumes naming like 'rds-dev', 'rds-staging', 'rds-prod')
+            name_parts = resource.name.split('-')
+            if len(name_parts) >= 2:
+                env = name_parts[-1]
+                if env in ['dev', 'staging', 'prod']:
+                    db_password_envs.add(env)
+
+    # Add password variables for each environment
+    for env in sorted(db_password_envs):
+        var_name = f'db_password_{env}'
+        if not any(v.name == var_name for v in variables):
+            variables.append(DomainOutput(  # Using DomainOutput as it has name/type/description
+                name=var_name,
+                type='string',
+                description=f'Database password for {env} environment (sensitive)'
+            ))
+
+    # Convert DomainOutput objects to dicts for template
+    variables_dicts = []
+    for v in variables:
+        is_password = 'password' in v.name.lower()
+        var_dict = {
+            'name': v.name,
+            'type': v.type,
+            'required': True if is_password else getattr(v, 'required', False),
+            'description': v.description if v.description else v.name,
+            'sensitive': True if is_password else False  # Boolean, not string expression
+        }
+        variables_dicts.append(var_dict)
+
+    return variables_dicts
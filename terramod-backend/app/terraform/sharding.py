@@ -0,0 +1,289 @@
+"""
+State-sharded project generation
+
+Instead of one root configuration (and one state) for the whole graph, every
+domain - or every user-defined group of domains - becomes an independent
+root stack under stacks/<name>/ with its own backend. Modules are shared
+from modules/.
+
+Wiring inside a stack is unchanged (module references and depends_on).
+A reference to a module in another stack is read from that stack's state
+through a terraform_remote_state data source, and the source stack
+re-exports the output. Stack dependencies give the apply plan: waves of
+stacks that can be applied in parallel, in dependency order.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+from app.core.graph import InfrastructureGraph
+from app.deployment import DeploymentConfig
+from app.terraform import tfjson
+from app.terraform.generator import OUTPUT_FORMATS, TerraformGenerator
+from app.terraform.hcl import HCLWriter, escape_template, to_hcl_document
+from app.terraform.wiring import topological_order
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StateBackend:
+    """Where each stack keeps its state ('local' or 's3')"""
+    type: str = 'local'
+    bucket: Optional[str] = None
+    region: str = 'us-east-1'
+    key_prefix: str = 'terramod'
+    dynamodb_table: Optional[str] = None
+
+    def backend_config(self, stack: str) -> Dict[str, Any]:
+        if self.type == 's3':
+            config = {
+                'bucket': self.bucket,
+                'key': f"{self.key_prefix}/{stack}/terraform.tfstate",
+                'region': self.region
+            }
+            if self.dynamodb_table:
+                config['dynamodb_table'] = self.dynamodb_table
+            return config
+        return {'path': 'terraform.tfstate'}
+
+    def remote_state_config(self, stack: str) -> Dict[str, Any]:
+        """Config a sibling stack uses to read this stack's state"""
+        if self.type == 's3':
+            return {k: v for k, v in self.backend_config(stack).items() if k != 'dynamodb_table'}
+        return {'path': f"../{stack}/terraform.tfstate"}
+
+
+@dataclass
+class TerraformStack:
+    name: str
+    domains: List[str]  # domain names
+    depends_on: List[str]  # stack names whose state this stack reads or must follow
+    files: Dict[str, str] = field(default_factory=dict)  # file name -> content
+
+
+@dataclass
+class ShardedProject:
+    stacks: Dict[str, TerraformStack]
+    modules: Dict[str, Any]  # domain name -> TerraformModule
+    apply_plan: List[List[str]]  # waves of stack names, each wave after the previous one
+    output_format: str = 'hcl'
+
+    def files(self) -> Dict[str, str]:
+        """Project files by path"""
+        suffix = OUTPUT_FORMATS[self.output_format]
+        files = {}
+        for name, module in self.modules.items():
+            files[f"modules/{name}/main{suffix}"] = module.main_tf
+            files[f"modules/{name}/variables{suffix}"] = module.variables_tf
+            files[f"modules/{name}/outputs{suffix}"] = module.outputs_tf
+        for stack in self.stacks.values():
+            for file_name, content in stack.files.items():
+                files[f"stacks/{stack.name}/{file_name}"] = content
+        files['apply-plan.json'] = tfjson.dumps({
+            'waves': self.apply_plan,
+            'stacks': {s.name: {'domains': s.domains, 'depends_on': s.depends_on} for s in self.stacks.values()}
+        })
+        return files
+
+
+class ShardedGenerator:
+    """Generates one root stack per domain or per group of domains"""
+
+    def __init__(self, output_format: str = 'hcl', backend: Optional[StateBackend] = None, compress: bool = False,
+                 deployment: Optional[DeploymentConfig] = None):
+        self.generator = TerraformGenerator(output_format=output_format, compress=compress, deployment=deployment)
+        self.output_format = output_format
+        self.suffix = OUTPUT_FORMATS[output_format]
+        self.backend = backend or StateBackend()
+        if self.backend.type not in ('local', 's3'):
+            raise ValueError(f"Unsupported state backend: {self.backend.type}")
+        if self.backend.type == 's3' and not self.backend.bucket:
+            raise ValueError("The s3 state backend needs a bucket")
+
+    def assign_stacks(self, graph: InfrastructureGraph, domain_ids: List[str],
+                      groups: Optional[Dict[str, List[str]]] = None) -> Dict[str, str]:
+        """
+        Map domain id -> stack name
+
+        Groups list domain ids or names; domains outside every group get a
+        stack of their own named after the domain.
+        """
+        by_key = {}
+        for domain_id in domain_ids:
+            domain = graph.domains[domain_id]
+            by_key[domain.id] = domain.id
+            by_key[domain.name] = domain.id
+
+        assignment: Dict[str, str] = {}
+        for stack, members in (groups or {}).items():
+            for member in members:
+                domain_id = by_key.get(member)
+                if domain_id is None:
+                    logger.warning(f"Stack '{stack}' lists unknown or empty domain '{member}'")
+                    continue
+                if domain_id in assignment and assignment[domain_id] != stack:
+                    raise ValueError(f"Domain '{member}' is assigned to stacks "
+                                     f"'{assignment[domain_id]}' and '{stack}'")
+                assignment[domain_id] = stack
+
+        stack_names = set(assignment.values())
+        for domain_id in domain_ids:
+            if domain_id not in assignment:
+                name = graph.domains[domain_id].name
+                if name in stack_names:
+                    raise ValueError(f"Stack name '{name}' is used by a group and an ungrouped domain")
+                assignment[domain_id] = name
+        return assignment
+
+    def generate(self, graph: InfrastructureGraph,
+                 groups: Optional[Dict[str, List[str]]] = None) -> ShardedProject:
+        """Generate shared modules, per-stack roots and the apply plan"""
+        project = self.generator.generate_project(graph)
+        entries = self.generator._domain_entries(graph)
+        domain_ids = [domain.id for domain, _ in entries]
+        wiring = self.generator.module_wiring(graph, entries)
+        assignment = self.assign_stacks(graph, domain_ids, groups)
+        stack_of = {graph.domains[d].name: s for d, s in assignment.items()}
+
+        stack_names = list(dict.fromkeys(assignment[d] for d in wiring.order))
+        members: Dict[str, List[str]] = {name: [] for name in stack_names}
+        for domain_id in wiring.order:
+            members[assignment[domain_id]].append(domain_id)
+
+        # Cross-stack edges: value references become remote state reads, all links order stacks
+        stack_edges = set()
+        for link in wiring.links:
+            source, target = assignment[link.source_domain_id], assignment[link.target_domain_id]
+            if source != target:
+                stack_edges.add((source, target))
+        stack_order = topological_order(stack_names, stack_edges, 'stacks')
+
+        exports: Dict[str, Dict[str, str]] = {name: {} for name in stack_names}  # stack -> output -> expression
+        reads: Dict[str, List[str]] = {name: [] for name in stack_names}
+        blocks: Dict[str, List[tuple]] = {name: [] for name in stack_names}
+
+        for domain_id in wiring.order:
+            domain = graph.domains[domain_id]
+            stack = assignment[domain_id]
+            inputs = {}
+            for input_name, expression in wiring.inputs.get(domain_id, {}).items():
+                parts = expression.split('.')
+                source_stack = stack_of.get(parts[1]) if parts[0] == 'module' else None
+                if source_stack is not None and source_stack != stack:
+                    output_name = f"{parts[1]}_{parts[2]}"
+                    exports[source_stack][output_name] = expression
+                    if source_stack not in reads[stack]:
+                        reads[stack].append(source_stack)
+                    expression = f"data.terraform_remote_state.{source_stack}.outputs.{output_name}"
+                inputs[input_name] = expression
+            # depends_on can only name modules in the same state; the apply plan covers the rest
+            depends_on = [
+                graph.domains[d].name for d in wiring.depends_on.get(domain_id, [])
+                if assignment[d] == stack
+            ]
+            blocks[stack].append((domain.name, inputs, depends_on, project.module_sources.get(domain.name, domain.name)))
+
+        depends: Dict[str, List[str]] = {name: [] for name in stack_names}
+        for source, target in sorted(stack_edges, key=lambda e: (stack_order.index(e[1]), stack_order.index(e[0]))):
+            depends[target].append(source)
+
+        stacks = {}
+        for name in stack_order:
+            stack = TerraformStack(
+                name=name,
+                domains=[graph.domains[d].name for d in members[name]],
+                depends_on=depends[name]
+            )
+            stack.files = self._stack_files(name, blocks[name], reads[name], exports[name], project.providers)
+            stacks[name] = stack
+
+        apply_plan = self._waves(stack_order, depends)
+        logger.info(f"Sharded generation: {len(stacks)} stacks, {len(stack_edges)} cross-stack "
+                    f"dependencies, {len(apply_plan)} apply waves")
+
+        return ShardedProject(
+            stacks=stacks,
+            modules=project.modules,
+            apply_plan=apply_plan,
+            output_format=self.output_format
+        )
+
+    def _stack_files(self, name: str, blocks: List[tuple], reads: List[str],
+                     exports: Dict[str, str], providers: str) -> Dict[str, str]:
+        main: Dict[str, Any] = {}
+        modules = {}
+        for module_name, inputs, depends_on, source in blocks:
+            block: Dict[str, Any] = {'source': f"../../modules/{source}"}
+            if depends_on:
+                block['depends_on'] = [self._reference(f"module.{d}") for d in depends_on]
+            for input_name, expression in inputs.items():
+                block[input_name] = f"${{{expression}}}"
+            modules[module_name] = block
+        if modules:
+            main['module'] = modules
+        if reads:
+            main['data'] = {'terraform_remote_state': {
+                source: {
+                    'backend': self.backend.type,
+                    # Settings are literal text, not templates (HCL and JSON alike)
+                    'config': {
+                        key: escape_template(value) if isinstance(value, str) else value
+                        for key, value in self.backend.remote_state_config(source).items()
+                    }
+                }
+                for source in reads
+            }}
+
+        outputs = {
+            output_name: {'value': f"${{{expression}}}"}
+            for output_name, expression in exports.items()
+        }
+        terraform = {'terraform': {
+            'required_version': '>= 1.5.0',
+            'backend': {self.backend.type: self.backend.backend_config(name)}
+        }}
+
+        files = {
+            f"main{self.suffix}": self._render(main),
+            f"providers{self.suffix}": providers,
+            f"terraform{self.suffix}": self._render(terraform),
+        }
+        if outputs:
+            files[f"outputs{self.suffix}"] = self._render({'output': outputs})
+        return files
+
+    def _reference(self, expression: str) -> str:
+        # depends_on takes bare references: "${...}" unwraps in HCL, JSON wants the plain string
+        return expression if self.output_format == 'json' else f"${{{expression}}}"
+
+    def _render(self, document: Dict[str, Any]) -> str:
+        if self.output_format == 'json':
+            return tfjson.dumps(document)
+        if 'terraform' in document:
+            return self._render_terraform_block(document['terraform'])
+        return to_hcl_document(document)
+
+    @staticmethod
+    def _render_terraform_block(terraform: Dict[str, Any]) -> str:
+        """terraform {} with its labeled backend block, which a plain document cannot express"""
+        # Backend settings take no interpolation, so their strings are written literally
+        writer = HCLWriter(templates=False)
+        writer.write('terraform {\n')
+        writer.attribute('required_version', terraform['required_version'])
+        for backend_type, config in terraform.get('backend', {}).items():
+            writer.write('\n')
+            writer.block('backend', (backend_type,), config, level=1)
+        writer.write('}\n')
+        return writer.getvalue()
+
+    @staticmethod
+    def _waves(stack_order: List[str], depends: Dict[str, List[str]]) -> List[List[str]]:
+        """Group stacks by longest dependency chain; each wave only needs earlier waves"""
+        level: Dict[str, int] = {}
+        for name in stack_order:
+            level[name] = 1 + max((level[d] for d in depends[name]), default=-1)
+        waves: List[List[str]] = [[] for _ in range(max(level.values(), default=-1) + 1)]
+        for name in stack_order:
+            waves[level[name]].append(name)
+        return waves
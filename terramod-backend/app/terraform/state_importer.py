@@ -0,0 +1,355 @@
+"""
+Import from Terraform JSON: `terraform show -json` output and raw state files
+
+Reads the values Terraform actually has rather than the HCL that produced
+them, so computed attributes come through and dependencies are exact:
+
+- `terraform show -json` of a state (`values`) or of a plan
+  (`planned_values`, dependencies taken from `configuration` references,
+  followed through module inputs and outputs)
+- `terraform.tfstate` version 4 (`resources` with `instances`)
+
+Each resource instance becomes a resource keyed by its address
+(`module.net.aws_subnet.private["a"]`), each module a domain, and each
+dependency a connection. Sensitive attributes are left out.
+"""
+
+import json
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from app.core.connection import Connection, ConnectionType, NodeType
+from app.core.domain import Domain, Position
+from app.core.graph import InfrastructureGraph
+from app.core.resource import Resource
+from app.terraform.parser import FileParseReport, ImportResult, TerraformParser
+
+try:
+    import orjson
+except ImportError:  # Optional fast decoder
+    orjson = None
+
+_NON_IDENTIFIER = re.compile(r'[^A-Za-z0-9_-]+')
+_INDEX = re.compile(r'\[[^\]]*\]')
+
+# First traversal steps of configuration references that are never resources
+_NON_RESOURCE_ROOTS = {'var', 'local', 'each', 'count', 'path', 'terraform', 'self', 'module', 'data'}
+
+
+@dataclass
+class StateResource:
+    """One managed resource instance, whichever JSON format it came from"""
+    address: str
+    module: str  # module instance address, e.g. 'module.a["x"].module.b'; '' for the root module
+    type: str
+    name: str
+    index: Any = None
+    values: Dict[str, Any] = field(default_factory=dict)
+    depends_on: List[str] = field(default_factory=list)  # resource addresses, instance keys dropped
+
+
+def config_address(address: str) -> str:
+    """Address without instance keys: module.a["x"].aws_s3_bucket.b[0] -> module.a.aws_s3_bucket.b"""
+    return _INDEX.sub('', address)
+
+
+def _is_sensitive(marker: Any) -> bool:
+    """`sensitive_values` mirrors the values with true at sensitive leaves"""
+    if marker is True:
+        return True
+    if isinstance(marker, dict):
+        return any(_is_sensitive(value) for value in marker.values())
+    if isinstance(marker, list):
+        return any(_is_sensitive(value) for value in marker)
+    return False
+
+
+def _public_values(values: Optional[Dict[str, Any]], sensitive: set) -> Dict[str, Any]:
+    """Set attributes, without the sensitive ones"""
+    return {
+        key: value for key, value in (values or {}).items()
+        if value is not None and key not in sensitive
+    }
+
+
+def _module_resources(module: Dict[str, Any], module_address: str = '') -> Iterator[StateResource]:
+    """Managed resources of a `show -json` module and its child modules"""
+    for entry in module.get('resources', []):
+        if entry.get('mode', 'managed') != 'managed':
+            continue
+        sensitive_values = entry.get('sensitive_values') or {}
+        sensitive = {key for key, marker in sensitive_values.items() if _is_sensitive(marker)}
+        yield StateResource(
+            address=entry['address'],
+            module=module_address,
+            type=entry['type'],
+            name=entry['name'],
+            index=entry.get('index'),
+            values=_public_values(entry.get('values'), sensitive),
+            depends_on=[config_address(d) for d in entry.get('depends_on', [])]
+        )
+    for child in module.get('child_modules', []):
+        yield from _module_resources(child, child.get('address', ''))
+
+
+def _state_file_resources(document: Dict[str, Any]) -> Iterator[StateResource]:
+    """Managed resource instances of a raw version 4 state file"""
+    for entry in document.get('resources', []):
+        if entry.get('mode', 'managed') != 'managed':
+            continue
+        module = entry.get('module', '')
+        for instance in entry.get('instances', []):
+            index = instance.get('index_key')
+            address = f"{module}.{entry['type']}.{entry['name']}" if module else f"{entry['type']}.{entry['name']}"
+            if index is not None:
+                address += f"[{json.dumps(index)}]"
+            sensitive = {
+                path[0].get('value') for path in instance.get('sensitive_attributes', [])
+                if path and isinstance(path[0], dict) and path[0].get('type') == 'get_attr'
+            }
+            yield StateResource(
+                address=address,
+                module=module,
+                type=entry['type'],
+                name=entry['name'],
+                index=index,
+                values=_public_values(instance.get('attributes'), sensitive),
+                depends_on=[config_address(d) for d in instance.get('dependencies', [])]
+            )
+
+
+def _references(expression: Any) -> Iterator[str]:
+    """Every `references` entry in a configuration expression tree"""
+    if isinstance(expression, dict):
+        for key, value in expression.items():
+            if key == 'references' and isinstance(value, list):
+                yield from value
+            else:
+                yield from _references(value)
+    elif isinstance(expression, list):
+        for value in expression:
+            yield from _references(value)
+
+
+@dataclass
+class _ModuleScope:
+    """
+    One module of a plan's configuration, resolving references lazily
+
+    `var.x` stands for what the module call passed as x, resolved in the
+    caller's scope, `module.<name>.<output>` for the resources behind that
+    child module's output expression, resolved in the child's scope, and
+    `module.<name>` for every resource of that child module and the modules
+    it calls. Each is resolved once per module.
+    """
+    module: Dict[str, Any]
+    prefix: str = ''
+    parent: Optional['_ModuleScope'] = None
+    call: Dict[str, Any] = field(default_factory=dict)
+    _children: Dict[str, '_ModuleScope'] = field(default_factory=dict)
+    _resolved: Dict[Tuple[str, str], List[str]] = field(default_factory=dict)
+
+    def child(self, name: str) -> Optional['_ModuleScope']:
+        """Scope of the module called `name` from this module"""
+        if name not in self._children:
+            call = self.module.get('module_calls', {}).get(name)
+            if call is None:
+                return None
+            self._children[name] = _ModuleScope(call.get('module', {}), f"{self.prefix}module.{name}.", self, call)
+        return self._children[name]
+
+    def variable(self, name: str) -> List[str]:
+        """Resources behind what the module call passed as `name`"""
+        expression = self.call.get('expressions', {}).get(name)
+        if self.parent is None or expression is None:
+            return []
+        return self._once(('var', name), lambda: self.parent.resolve(_references(expression)))
+
+    def output(self, call_name: str, name: str) -> List[str]:
+        """Resources behind output `name` of the module called `call_name`"""
+        child = self.child(call_name)
+        output = child.module.get('outputs', {}).get(name) if child is not None else None
+        if output is None:
+            return []
+        references = list(_references(output.get('expression', {}))) + output.get('depends_on', [])
+        return self._once(('module', f"{call_name}.{name}"), lambda: child.resolve(references))
+
+    def module_resources(self, call_name: str) -> List[str]:
+        """Resources of the module called `call_name`, nested module calls included"""
+        child = self.child(call_name)
+        if child is None:
+            return []
+        return self._once(('module', call_name), child.resources)
+
+    def resources(self) -> List[str]:
+        """Managed resources of this module and the modules it calls"""
+        found = [
+            f"{self.prefix}{entry['address']}" for entry in self.module.get('resources', [])
+            if entry.get('mode', 'managed') == 'managed'
+        ]
+        for name in self.module.get('module_calls', {}):
+            found.extend(self.module_resources(name))
+        return found
+
+    def resolve(self, references: Iterable[str]) -> List[str]:
+        """Resource addresses behind references made in this module"""
+        found = []
+        for reference in references:
+            parts = config_address(reference).split('.')
+            if len(parts) < 2:
+                continue
+            if parts[0] == 'var':
+                found.extend(self.variable(parts[1]))
+            elif parts[0] == 'module':
+                if len(parts) > 2:
+                    found.extend(self.output(parts[1], parts[2]))
+                else:
+                    found.extend(self.module_resources(parts[1]))
+            elif parts[0] not in _NON_RESOURCE_ROOTS:
+                found.append(f"{self.prefix}{parts[0]}.{parts[1]}")
+        return list(dict.fromkeys(found))
+
+    def _once(self, key: Tuple[str, str], resolve) -> List[str]:
+        if key not in self._resolved:
+            self._resolved[key] = []  # A reference cycle resolves to nothing instead of recursing
+            self._resolved[key] = resolve()
+        return self._resolved[key]
+
+
+def _configuration_dependencies(scope: _ModuleScope, inherited: Optional[List[str]] = None) -> Dict[str, List[str]]:
+    """
+    Resource address -> resources its configuration references or depends_on names
+
+    A module call's own depends_on applies to every resource in the module.
+    """
+    inherited = inherited or []
+    dependencies: Dict[str, List[str]] = {}
+    for entry in scope.module.get('resources', []):
+        if entry.get('mode', 'managed') != 'managed':
+            continue
+        references = list(_references(entry.get('expressions', {}))) + entry.get('depends_on', [])
+        resolved = scope.resolve(references)
+        dependencies[f"{scope.prefix}{entry['address']}"] = list(dict.fromkeys(resolved + inherited))
+    for name, call in scope.module.get('module_calls', {}).items():
+        call_depends_on = scope.resolve(call.get('depends_on', []))
+        dependencies.update(_configuration_dependencies(
+            scope.child(name),
+            list(dict.fromkeys(inherited + call_depends_on))
+        ))
+    return dependencies
+
+
+def state_resources(document: Dict[str, Any]) -> Iterator[StateResource]:
+    """Resource instances of any supported Terraform JSON document"""
+    if 'planned_values' in document:
+        dependencies = _configuration_dependencies(
+            _ModuleScope(document.get('configuration', {}).get('root_module', {}))
+        )
+        for resource in _module_resources(document['planned_values'].get('root_module', {})):
+            resource.depends_on = dependencies.get(config_address(resource.address), resource.depends_on)
+            yield resource
+    elif 'values' in document:
+        yield from _module_resources((document.get('values') or {}).get('root_module', {}))
+    elif 'version' in document and ('resources' in document or 'modules' in document):
+        if document['version'] != 4:
+            raise ValueError(f"State file version {document['version']} is not supported; "
+                             f"run `terraform show -json` instead")
+        yield from _state_file_resources(document)
+    elif 'format_version' not in document:
+        raise ValueError("Not a Terraform state, `terraform show -json` output or plan")
+
+
+class StateImporter:
+    """Terraform state and JSON plan importer"""
+
+    def __init__(self):
+        self.parser = TerraformParser(parallel=False, use_cache=False)
+
+    def import_state(self, content: Union[bytes, str], filename: str = 'terraform.tfstate') -> ImportResult:
+        """
+        Build a graph from one Terraform JSON document
+
+        Root module resources are grouped into domains by type, like HCL
+        import; every module becomes a domain of its own, named after its
+        path and typed by its most common resource domain. Dependencies
+        naming a resource without an instance key connect to every instance.
+        """
+        document = orjson.loads(content) if orjson is not None else json.loads(content)
+        if not isinstance(document, dict):
+            raise ValueError("Expected a JSON object")
+
+        graph = InfrastructureGraph()
+        instances: Dict[str, List[str]] = {}
+        pending: List[Tuple[str, List[str]]] = []
+        modules: Dict[str, List[Resource]] = {}
+        taken_names: Dict[str, set] = {}
+
+        for state_resource in state_resources(document):
+            resource = Resource(
+                id=state_resource.address,
+                type=state_resource.type,
+                domain_id='',
+                name=self.resource_name(state_resource, taken_names.setdefault(state_resource.module, set())),
+                arguments=state_resource.values,
+                position=Position(0, 0)
+            )
+            if state_resource.module:
+                modules.setdefault(state_resource.module, []).append(resource)
+            else:
+                self.parser.add_resource(graph, resource)
+            instances.setdefault(config_address(state_resource.address), []).append(resource.id)
+            if state_resource.depends_on:
+                pending.append((resource.id, state_resource.depends_on))
+
+        for module, resources in modules.items():
+            self.add_module(graph, module, resources)
+
+        for resource_id, depends_on in pending:
+            for dependency in depends_on:
+                for source_id in instances.get(dependency, []):
+                    connection_id = f"{source_id}->{resource_id}"
+                    if source_id == resource_id or connection_id in graph.connections:
+                        continue
+                    graph.add_connection(Connection(
+                        id=connection_id,
+                        source_id=source_id,
+                        target_id=resource_id,
+                        source_type=NodeType.RESOURCE,
+                        target_type=NodeType.RESOURCE,
+                        connection_type=ConnectionType.DEPENDENCY
+                    ))
+
+        report = FileParseReport(filename=filename, resources=len(graph.resources))
+        return ImportResult(graph=graph, files=[report])
+
+    def resource_name(self, state_resource: StateResource, taken: set) -> str:
+        """Identifier for the resource block, unique within its module"""
+        parts = [state_resource.name]
+        if state_resource.index is not None:
+            parts.append(str(state_resource.index))
+        base = _NON_IDENTIFIER.sub('_', '_'.join(parts)).strip('_') or state_resource.type
+        if not base[0].isalpha() and base[0] != '_':
+            base = f"_{base}"
+
+        name, suffix = base, 2
+        while (state_resource.type, name) in taken:
+            name = f"{base}_{suffix}"
+            suffix += 1
+        taken.add((state_resource.type, name))
+        return name
+
+    def add_module(self, graph: InfrastructureGraph, module: str, resources: List[Resource]) -> None:
+        """Add a module's resources under a domain of its own"""
+        name = _NON_IDENTIFIER.sub('_', module.replace('module.', '')).strip('_')
+        domain_types = Counter(self.parser.assign_domain(resource.type) for resource in resources)
+        domain = Domain(
+            id=f"domain_module_{name}",
+            name=name,
+            type=domain_types.most_common(1)[0][0],
+            position=Position(0, 0)
+        )
+        graph.add_domain(domain)
+        for resource in resources:
+            resource.domain_id = domain.id
+            graph.add_resource(resource)
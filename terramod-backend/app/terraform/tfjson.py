@@ -0,0 +1,109 @@
+"""
+Terraform JSON syntax (.tf.json) rendering
+
+Builds Terraform JSON documents straight from resource arguments, skipping
+templates and HCL formatting. Interpolations such as "${var.x}" are valid
+JSON-syntax expressions, and lists of objects are nested blocks, so
+arguments map across unchanged.
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+import json
+from app.deployment import AWS_PROVIDER_VERSION
+
+try:
+    import orjson
+except ImportError:  # Optional fast encoder
+    orjson = None
+
+
+def dumps(document: Mapping[str, Any]) -> str:
+    """Encode a Terraform JSON document (2-space indent, insertion order kept)"""
+    if orjson is not None:
+        return orjson.dumps(document, option=orjson.OPT_INDENT_2, default=str).decode('utf-8') + '\n'
+    return json.dumps(document, indent=2, default=str) + '\n'
+
+
+def _reference(expression: str) -> str:
+    """depends_on takes bare references in JSON syntax, not "${...}" templates"""
+    if expression.startswith('${') and expression.endswith('}'):
+        return expression[2:-1]
+    return expression
+
+
+def resources_document(resources: Iterable[Any]) -> Dict[str, Any]:
+    """`resource` blocks keyed by type, then name"""
+    blocks: Dict[str, Dict[str, Any]] = {}
+    for resource in resources:
+        arguments = resource.arguments
+        if 'depends_on' in arguments:
+            arguments = {**arguments, 'depends_on': [_reference(d) for d in arguments['depends_on']]}
+        blocks.setdefault(resource.type, {})[resource.name] = arguments
+    return {'resource': blocks} if blocks else {}
+
+
+def variables_document(variables: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """`variable` blocks from the generator's variable dicts"""
+    blocks = {}
+    for variable in variables:
+        block = {
+            'type': variable['type'],
+            'description': variable.get('description') or variable['name']
+        }
+        if variable.get('sensitive'):
+            block['sensitive'] = True
+        blocks[variable['name']] = block
+    return {'variable': blocks} if blocks else {}
+
+
+def outputs_document(outputs: Iterable[Any], values: Optional[Mapping[str, str]] = None) -> Dict[str, Any]:
+    """`output` blocks, with the same value expressions as outputs.tf.j2"""
+    values = values or {}
+    blocks = {
+        output.name: {
+            'value': f'${{{values.get(output.name, output.name)}}}',
+            'description': output.description or output.name
+        }
+        for output in outputs
+    }
+    return {'output': blocks} if blocks else {}
+
+
+def locals_document(locals_map: Mapping[str, Any]) -> Dict[str, Any]:
+    """`locals` block (for_each maps of compressed resources)"""
+    return {'locals': dict(locals_map)} if locals_map else {}
+
+
+def modules_document(modules: List[Tuple[str, Dict[str, str], List[str], str]]) -> Dict[str, Any]:
+    """Root `module` blocks from (name, {input: expression}, depends_on names, source module) tuples"""
+    blocks = {}
+    for name, inputs, depends_on, source in modules:
+        block: Dict[str, Any] = {'source': f'./modules/{source}'}
+        if depends_on:
+            block['depends_on'] = [f'module.{d}' for d in depends_on]
+        for input_name, expression in inputs.items():
+            block[input_name] = f'${{{expression}}}'
+        blocks[name] = block
+    return {'module': blocks} if blocks else {}
+
+
+def providers_document(region: str = 'us-east-1', version: str = AWS_PROVIDER_VERSION) -> Dict[str, Any]:
+    """AWS provider requirements and configuration, `region` as the aws_region default"""
+    return {
+        'terraform': {
+            'required_providers': {
+                'aws': {'source': 'hashicorp/aws', 'version': version}
+            }
+        },
+        'provider': {
+            'aws': {'region': '${var.aws_region}'}
+        },
+        'variable': {
+            'aws_region': {'type': 'string', 'description': 'AWS region', 'default': region}
+        }
+    }
+
+
+TERRAFORM_CONFIG_DOCUMENT = {
+    'terraform': {'required_version': '>= 1.5.0'}
+}
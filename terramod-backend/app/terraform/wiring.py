@@ -0,0 +1,311 @@
+"""
+Root module wiring derived from graph connections
+
+Connections between resources or domains in different domains become module
+references in the root module: a connection with an output_name passes
+`module.<source>.<output>` into the target's input_name, and a connection
+without one only orders the modules (depends_on). A resource's output_name
+must be one of its type's registry exports or an output its domain
+declares; otherwise the connection only orders the modules. Modules are emitted in
+topological order of these edges. Dependency connections between resources
+of the same domain become resource-level depends_on.
+
+Only edges Terraform cannot infer are emitted: depends_on edges (module and
+resource level) are reduced to the transitive reduction of the depends_on
+graph, and the number of redundant edges dropped is reported. Module
+references never stand in for depends_on: a reference orders only the
+resources behind one output, while depends_on waits for the whole module.
+
+Wiring is cached per connection-set hash, so edits that do not touch
+connections reuse it.
+"""
+
+import heapq
+from dataclasses import dataclass, field, replace
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from app.core.connection import ConnectionType, NodeType
+from app.core.domain import Domain, DomainInput
+from app.core.graph import InfrastructureGraph
+from app.core.resource import Resource
+from app.registry.loader import ServiceRegistry
+from app.utils.cache import LRUCache
+from app.utils.hash import hash_connections
+from config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+_wiring_cache = LRUCache(max_entries=settings.WIRING_CACHE_SIZE)
+
+
+@dataclass
+class ModuleLink:
+    """A connection lifted to the domains it joins"""
+    connection_id: str
+    source_domain_id: str
+    target_domain_id: str
+    output_name: Optional[str] = None  # module output on the source, None for ordering only
+    input_name: Optional[str] = None
+    input_type: str = 'any'
+
+
+@dataclass
+class ModuleWiring:
+    """Root module layout: emission order, module inputs and ordering-only dependencies"""
+    order: List[str]  # domain ids, dependencies first
+    inputs: Dict[str, Dict[str, str]] = field(default_factory=dict)  # domain id -> input -> expression
+    depends_on: Dict[str, List[str]] = field(default_factory=dict)  # domain id -> domain ids
+    wired_inputs: Dict[str, List[DomainInput]] = field(default_factory=dict)  # inputs the target must declare
+    resource_depends_on: Dict[str, List[str]] = field(default_factory=dict)  # resource id -> resource ids
+    links: List[ModuleLink] = field(default_factory=list)
+    dependency_edges: int = 0  # distinct depends_on candidates, module and resource level
+    removed_edges: int = 0  # candidates implied by other paths and not emitted
+
+
+def _node_domain(graph: InfrastructureGraph, node_id: str, node_type: NodeType) -> Optional[str]:
+    if node_type == NodeType.DOMAIN:
+        return node_id if node_id in graph.domains else None
+    resource = graph.resources.get(node_id)
+    return resource.domain_id if resource else None
+
+
+def module_links(graph: InfrastructureGraph) -> List[ModuleLink]:
+    """Connections that cross module boundaries, in connection order"""
+    links = []
+    for conn in graph.connections.values():
+        source_domain_id = _node_domain(graph, conn.source_id, conn.source_type)
+        target_domain_id = _node_domain(graph, conn.target_id, conn.target_type)
+        if source_domain_id is None or target_domain_id is None:
+            logger.debug(f"Connection {conn.id} references a missing node, not wired")
+            continue
+        if source_domain_id == target_domain_id:
+            continue
+
+        link = ModuleLink(conn.id, source_domain_id, target_domain_id)
+        if conn.output_name:
+            source_domain = graph.domains[source_domain_id]
+            declared = next((o for o in source_domain.outputs if o.name == conn.output_name), None)
+            output_name = conn.output_name
+            if conn.source_type == NodeType.RESOURCE:
+                # Resource exports surface as '<resource>_<export>' module outputs (see infer_outputs)
+                resource = graph.resources[conn.source_id]
+                service = ServiceRegistry.get_instance().get_service(resource.type)
+                if service and conn.output_name in service.exports:
+                    output_name = f"{resource.name}_{conn.output_name}"
+                elif declared is None:
+                    output_name = None
+
+            if output_name is None:
+                # No such module output would exist; keep the ordering, drop the reference
+                logger.warning(f"Connection {conn.id}: '{conn.output_name}' is neither an export of "
+                               f"{graph.resources[conn.source_id].type} nor an output of "
+                               f"{source_domain.name}, wired for ordering only")
+            else:
+                link.output_name = output_name
+                link.input_name = conn.input_name or conn.output_name
+                if declared is not None:
+                    link.input_type = declared.type
+        links.append(link)
+    return links
+
+
+def topological_order(nodes: List[str], edges: Iterable[Tuple[str, str]], kind: str = 'nodes') -> List[str]:
+    """Kahn's algorithm; ties keep input order so output is stable"""
+    position = {node: idx for idx, node in enumerate(nodes)}
+    successors: Dict[str, Set[str]] = {node: set() for node in nodes}
+    indegree = {node: 0 for node in nodes}
+
+    for source, target in edges:
+        if target not in successors[source]:
+            successors[source].add(target)
+            indegree[target] += 1
+
+    ready = [position[n] for n in nodes if indegree[n] == 0]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        node = nodes[heapq.heappop(ready)]
+        order.append(node)
+        for successor in successors[node]:
+            indegree[successor] -= 1
+            if indegree[successor] == 0:
+                heapq.heappush(ready, position[successor])
+
+    if len(order) != len(nodes):
+        cyclic = [n for n in nodes if indegree[n] > 0]
+        raise ValueError(f"Circular dependency between {kind}: {', '.join(cyclic)}")
+    return order
+
+
+def transitive_reduction(
+    nodes: List[str],
+    edges: Iterable[Tuple[str, str]],
+    kind: str = 'nodes'
+) -> Set[Tuple[str, str]]:
+    """
+    Edges of the DAG's transitive reduction
+    
+    Nodes are visited in reverse topological order with reachability kept as
+    integer bitsets, so the cost is O(V * E / wordsize).
+    """
+    edges = set(edges)
+    order = topological_order(nodes, edges, kind)
+    rank = {node: idx for idx, node in enumerate(order)}
+
+    successors: Dict[str, List[str]] = {node: [] for node in nodes}
+    for source, target in edges:
+        successors[source].append(target)
+
+    reach: Dict[str, int] = {}
+    kept: Set[Tuple[str, str]] = set()
+    for node in reversed(order):
+        covered = 0
+        # A successor reachable through an earlier (lower-ranked) successor is redundant
+        for successor in sorted(successors[node], key=rank.__getitem__):
+            bit = 1 << rank[successor]
+            if not covered & bit:
+                kept.add((node, successor))
+            covered |= bit | reach[successor]
+        reach[node] = covered
+    return kept
+
+
+def compute_wiring(graph: InfrastructureGraph, domain_ids: List[str]) -> ModuleWiring:
+    """Wire the modules for domain_ids (domains that render a module) from graph connections"""
+    key = f"{hash_connections(graph, ServiceRegistry.get_instance().version)}:{','.join(domain_ids)}"
+    cached = _wiring_cache.get(key)
+    if cached is not None:
+        return cached
+
+    present = set(domain_ids)
+    links = [
+        link for link in module_links(graph)
+        if link.source_domain_id in present and link.target_domain_id in present
+    ]
+    module_edges = [(link.source_domain_id, link.target_domain_id) for link in links]
+    order = topological_order(domain_ids, module_edges, 'domains')
+
+    inputs: Dict[str, Dict[str, str]] = {domain_id: {} for domain_id in domain_ids}
+    wired_inputs: Dict[str, List[DomainInput]] = {}
+
+    for link in links:
+        if link.output_name is None:
+            continue
+        source_name = graph.domains[link.source_domain_id].name
+        target = graph.domains[link.target_domain_id]
+        expression = f"module.{source_name}.{link.output_name}"
+
+        existing = inputs[target.id].get(link.input_name)
+        if existing is not None and existing != expression:
+            logger.warning(f"Input '{link.input_name}' of module '{target.name}' is wired twice, "
+                           f"keeping {existing}")
+            continue
+        inputs[target.id][link.input_name] = expression
+
+        if not any(i.name == link.input_name for i in target.inputs):
+            wired_inputs.setdefault(target.id, []).append(DomainInput(
+                name=link.input_name,
+                type=link.input_type,
+                required=True,
+                description=f"Wired from {expression}"
+            ))
+
+    # Ordering-only edges become depends_on unless a chain of other depends_on
+    # edges already implies them
+    candidates = {
+        (link.source_domain_id, link.target_domain_id)
+        for link in links if link.output_name is None
+    }
+    required = transitive_reduction(domain_ids, candidates, 'domains')
+    depends_on: Dict[str, List[str]] = {}
+    for link in links:
+        pair = (link.source_domain_id, link.target_domain_id)
+        if pair not in candidates or pair not in required:
+            continue
+        targets = depends_on.setdefault(link.target_domain_id, [])
+        if link.source_domain_id not in targets:
+            targets.append(link.source_domain_id)
+    emitted = sum(len(targets) for targets in depends_on.values())
+
+    resource_depends_on, resource_candidates = _resource_dependencies(graph, present)
+    resource_emitted = sum(len(sources) for sources in resource_depends_on.values())
+
+    # User-defined inputs that no connection satisfies stay root variables
+    for domain_id in domain_ids:
+        for inp in graph.domains[domain_id].inputs:
+            inputs[domain_id].setdefault(inp.name, f"var.{inp.name}")
+
+    wiring = ModuleWiring(
+        order=order,
+        inputs=inputs,
+        depends_on=depends_on,
+        wired_inputs=wired_inputs,
+        resource_depends_on=resource_depends_on,
+        links=links,
+        dependency_edges=len(candidates) + resource_candidates,
+        removed_edges=(len(candidates) - emitted) + (resource_candidates - resource_emitted)
+    )
+    if wiring.removed_edges:
+        logger.info(f"Dependency reduction: {wiring.removed_edges} of {wiring.dependency_edges} "
+                    f"depends_on edges are implied by other paths and were not emitted")
+    _wiring_cache.set(key, wiring)
+    return wiring
+
+
+def _resource_dependencies(graph: InfrastructureGraph, domain_ids: Set[str]) -> Tuple[Dict[str, List[str]], int]:
+    """
+    Reduced depends_on between resources of the same domain
+    
+    Implicit connections are skipped, Terraform infers those from references.
+    Returns the depends_on map and the number of distinct candidate edges.
+    """
+    edges: Dict[Tuple[str, str], None] = {}  # insertion-ordered set
+    for conn in graph.connections.values():
+        if conn.source_type != NodeType.RESOURCE or conn.target_type != NodeType.RESOURCE:
+            continue
+        if conn.connection_type == ConnectionType.IMPLICIT or conn.source_id == conn.target_id:
+            continue
+        source = graph.resources.get(conn.source_id)
+        target = graph.resources.get(conn.target_id)
+        if source is None or target is None or source.domain_id != target.domain_id:
+            continue
+        if source.domain_id in domain_ids:
+            edges[(conn.source_id, conn.target_id)] = None
+
+    if not edges:
+        return {}, 0
+
+    nodes = list(dict.fromkeys(node for edge in edges for node in edge))
+    required = transitive_reduction(nodes, edges, 'resources')
+
+    depends_on: Dict[str, List[str]] = {}
+    for source_id, target_id in edges:
+        if (source_id, target_id) in required:
+            depends_on.setdefault(target_id, []).append(source_id)
+    return depends_on, len(edges)
+
+
+def wired_domain(domain: Domain, wiring: ModuleWiring) -> Domain:
+    """Copy of domain that also declares the variables its wired inputs need"""
+    extra = wiring.wired_inputs.get(domain.id)
+    if not extra:
+        return domain
+    return replace(domain, inputs=list(domain.inputs) + extra)
+
+
+def wired_resources(resources: List[Resource], graph: InfrastructureGraph, wiring: ModuleWiring) -> List[Resource]:
+    """Copies of resources that carry their reduced depends_on as an argument"""
+    wired = []
+    for resource in resources:
+        sources = wiring.resource_depends_on.get(resource.id)
+        if not sources:
+            wired.append(resource)
+            continue
+        depends_on = list(resource.arguments.get('depends_on', []))
+        for source_id in sources:
+            source = graph.resources[source_id]
+            reference = f"${{{source.type}.{source.name}}}"
+            if reference not in depends_on:
+                depends_on.append(reference)
+        wired.append(replace(resource, arguments={**resource.arguments, 'depends_on': depends_on}))
+    return wired
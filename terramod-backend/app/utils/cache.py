@@ -1,7 +1,20 @@
+import getpass
+import json
+import os
+import stat
+import tempfile
 import time
+import threading
+from collections import OrderedDict
+from pathlib import Path
 from typing import Any, Optional, Dict
 from dataclasses import dataclass
 
+try:
+    import orjson
+except ImportError:  # Optional fast encoder
+    orjson = None
+
 @dataclass
 class CacheEntry:
     value: Any
@@ -52,6 +65,169 @@ class Cache:
         for key in expired_keys:
             del self._cache[key]
 
+class LRUCache:
+    """Thread-safe in-memory cache bounded by entry count"""
+    
+    def __init__(self, max_entries: int = 512):
+        self._entries: OrderedDict = OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Get cached value, marking it most recently used"""
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+    
+    def set(self, key: str, value: Any) -> None:
+        """Set cached value, evicting the least recently used entry when full"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, key: str) -> None:
+        """Remove cached value"""
+        with self._lock:
+            self._entries.pop(key, None)
+    
+    def clear(self) -> None:
+        """Clear all cached values"""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+def user_cache_dir(name: str) -> str:
+    """Default cache directory for the current user, e.g. /tmp/terramod-parse-cache-1000"""
+    owner = os.getuid() if hasattr(os, 'getuid') else getpass.getuser()
+    return os.path.join(tempfile.gettempdir(), f"{name}-{owner}")
+
+def private_directory(path: str) -> Path:
+    """
+    Create a directory only the current user can access, or refuse an existing one
+    
+    Cached files are loaded back as trusted (marshalled bytecode, parse
+    results), so a directory another local user owns or can write to is an
+    OSError rather than a cache.
+    """
+    directory = Path(path)
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode):
+        raise OSError(f"{directory} is not a directory")
+    if hasattr(os, 'getuid'):
+        if info.st_uid != os.getuid():
+            raise OSError(f"{directory} is owned by another user")
+        if info.st_mode & 0o077:
+            os.chmod(directory, 0o700)
+    return directory
+
+class DiskCache:
+    """
+    Thread-safe on-disk cache of JSON values, bounded by entry count
+    
+    Each entry is one file named by its key (keys must be safe file names,
+    e.g. content hashes), so entries survive restarts and are shared by
+    processes using the same directory, which must be private to the
+    current user (see private_directory). Recency is the file modification
+    time, refreshed on every hit. Every process writing to the directory
+    recounts it from disk when its own view says the cache is full, and at
+    least every 1/16th of the bound in writes, then deletes the least
+    recently used files, so the bound holds across processes to within
+    that slack.
+    """
+    
+    def __init__(self, directory: str, max_entries: int = 10000):
+        self.directory = private_directory(directory)
+        self._max_entries = max_entries
+        self._rescan_every = max(1, max_entries // 16)
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = self._scan()
+    
+    def _scan(self) -> OrderedDict:
+        """Entries currently on disk, least recently used first"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith('.json'):
+                continue
+            try:
+                entries.append((entry.stat().st_mtime, entry.name[:-5]))
+            except FileNotFoundError:  # Evicted by another process mid-scan
+                continue
+        return OrderedDict((key, None) for _, key in sorted(entries))
+    
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Get cached value, marking it most recently used"""
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            with self._lock:
+                self._entries.pop(key, None)
+            return None
+        
+        with self._lock:
+            self._entries[key] = None
+            self._entries.move_to_end(key)
+        try:
+            os.utime(path)
+            return orjson.loads(data) if orjson is not None else json.loads(data)
+        except (OSError, ValueError):
+            self.invalidate(key)
+            return None
+    
+    def set(self, key: str, value: Any) -> None:
+        """Write cached value, evicting the least recently used entries when full"""
+        data = orjson.dumps(value) if orjson is not None else json.dumps(value).encode('utf-8')
+        
+        # Write then rename, so readers never see a partial file
+        path = self._path(key)
+        temporary = path.with_name(f".{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temporary.write_bytes(data)
+        os.replace(temporary, path)
+        
+        evicted = []
+        with self._lock:
+            self._entries[key] = None
+            self._entries.move_to_end(key)
+            self._writes += 1
+            if len(self._entries) > self._max_entries or self._writes >= self._rescan_every:
+                # Other processes write here too; only the directory has the real count
+                self._writes = 0
+                self._entries = self._scan()
+                self._entries[key] = None
+                self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+        for old_key in evicted:
+            self._path(old_key).unlink(missing_ok=True)
+    
+    def invalidate(self, key: str) -> None:
+        """Remove cached value"""
+        with self._lock:
+            self._entries.pop(key, None)
+        self._path(key).unlink(missing_ok=True)
+    
+    def clear(self) -> None:
+        """Remove all cached values, including those other processes wrote"""
+        with self._lock:
+            keys = list(self._scan())
+            self._entries.clear()
+        for key in keys:
+            self._path(key).unlink(missing_ok=True)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
 # Global cache instance
 _cache_instance = Cache()
 
@@ -1,7 +1,12 @@
 import hashlib
 import json
-from typing import Any, Dict
+from typing import Any, Dict, List
 from app.core.graph import InfrastructureGraph
+from app.core.domain import Domain
+from app.core.resource import Resource
+
+# Canvas layout fields that never affect generated Terraform
+LAYOUT_FIELDS = ('position', 'width', 'height')
 
 def normalize_graph(graph: InfrastructureGraph) -> Dict[str, Any]:
     """Normalize graph structure for consistent hashing"""
@@ -38,3 +43,67 @@ def hash_graph(graph: InfrastructureGraph) -> str:
     hash_obj = hashlib.sha256(json_str.encode('utf-8'))
     
     return hash_obj.hexdigest()
+
+
+def hash_resource(resource: Dict[str, Any]) -> str:
+    """Compute stable SHA256 hash of a resource's priced content (type, name, arguments)"""
+    content = {
+        'type': resource.get('type'),
+        'name': resource.get('name'),
+        'arguments': resource.get('arguments', {})
+    }
+    json_str = json.dumps(content, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(json_str.encode('utf-8')).hexdigest()
+
+
+def hash_domain(domain: Domain, resources: List[Resource], registry_version: str = '') -> str:
+    """Compute stable SHA256 hash of a domain's generated content (layout excluded)"""
+    content = {
+        'domain': {k: v for k, v in domain.to_dict().items() if k not in LAYOUT_FIELDS},
+        'resources': [
+            {k: v for k, v in r.to_dict().items() if k not in LAYOUT_FIELDS}
+            for r in resources
+        ],
+        'registry_version': registry_version
+    }
+    json_str = json.dumps(content, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(json_str.encode('utf-8')).hexdigest()
+
+
+def hash_content(content: str) -> str:
+    """Compute SHA256 hash of generated file content"""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def hash_connections(graph: InfrastructureGraph, registry_version: str = '') -> str:
+    """Compute stable SHA256 hash of everything module wiring depends on (registry exports included)"""
+    content = {
+        'connections': sorted(
+            (c.to_dict() for c in graph.connections.values()),
+            key=lambda c: c['id']
+        ),
+        'domains': [
+            [d.id, d.name, [i.name for i in d.inputs], [[o.name, o.type] for o in d.outputs]]
+            for d in graph.domains.values()
+        ],
+        'resources': sorted([r.id, r.domain_id, r.name, r.type] for r in graph.resources.values()),
+        'registry_version': registry_version
+    }
+    json_str = json.dumps(content, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(json_str.encode('utf-8')).hexdigest()
+
+
+def hash_module_content(domain: Domain, resources: List[Resource], registry_version: str = '') -> str:
+    """
+    Compute stable SHA256 hash of what a domain's module renders, independent
+    of which domain it is (ids, names, layout and input descriptions excluded)
+    """
+    content = {
+        'type': domain.type.value,
+        'inputs': [[i.name, i.type, i.required] for i in domain.inputs],
+        'outputs': [[o.name, o.type, o.description] for o in domain.outputs],
+        'resources': [[r.type, r.name, r.arguments, r.deployment] for r in resources],
+        'registry_version': registry_version
+    }
+    json_str = json.dumps(content, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(json_str.encode('utf-8')).hexdigest()
@@ -0,0 +1,39 @@
+"""
+Subnet CIDR planning at scale
+
+Packs per-AZ subnets of mixed sizes into a /8 around existing subnets and
+checks existing subnets for overlaps.
+
+Run from terramod-backend/:
+    python -m benchmarks.bench_cidr_allocation
+"""
+
+import ipaddress
+import time
+from app.deployment.cidr import SubnetRequest, find_overlaps, plan_subnets
+
+SUBNET_COUNTS = (1_000, 5_000, 20_000)
+AVAILABILITY_ZONES = ['us-east-1a', 'us-east-1b', 'us-east-1c']
+
+
+def main() -> None:
+    vpc = ipaddress.ip_network('10.0.0.0/8')
+    print(f"Per-AZ subnets (/22-/28) in {vpc} across {len(AVAILABILITY_ZONES)} AZs")
+    for count in SUBNET_COUNTS:
+        existing = [str(n) for n in vpc.subnets(new_prefix=20)][::9][:count // 10]
+        requests = [
+            SubnetRequest(name=f"subnet_{i}", prefix_length=22 + i % 7)
+            for i in range(count // len(AVAILABILITY_ZONES))
+        ]
+
+        started = time.perf_counter()
+        overlaps = find_overlaps(ipaddress.ip_network(cidr) for cidr in existing)
+        plan = plan_subnets({'us-east-1': AVAILABILITY_ZONES}, {'us-east-1': str(vpc)}, requests, existing)[0]
+        seconds = time.perf_counter() - started
+
+        print(f"  {len(plan.subnets):>6} subnets, {len(existing):>5} existing: {seconds * 1000:8.1f} ms  "
+              f"({len(overlaps)} overlaps, {plan.free_addresses} addresses free)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""
+Deployment expansion cost as availability zones grow
+
+Every resource is deployed per AZ; with native for_each expansion the
+generated size and peak memory stay flat as the AZ count grows.
+
+Run from terramod-backend/:
+    python -m benchmarks.bench_deployment_expansion
+"""
+
+import logging
+import time
+import tracemalloc
+from app.deployment import DeploymentConfig
+from app.terraform.generator import TerraformGenerator
+from benchmarks.graphs import load_registry, synthetic_graph
+
+AZ_COUNTS = (1, 3, 6, 12)
+
+
+def main() -> None:
+    load_registry()
+    logging.disable(logging.WARNING)
+    graph = synthetic_graph(domain_count=50, resources_per_domain=20)
+    for resource in graph.resources.values():
+        resource.deployment = {'strategy': 'per-az'}
+
+    print("50 domains x 20 per-AZ resources, cache disabled")
+    for az_count in AZ_COUNTS:
+        config = DeploymentConfig(
+            primary_region='us-east-1',
+            availability_zones=[f"us-east-1-az{i}" for i in range(az_count)]
+        )
+        generator = TerraformGenerator(use_cache=False, parallel=False, deployment=config)
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        files = generator.generate_project(graph).files()
+        seconds = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        size = sum(len(content) for content in files.values())
+        print(f"  {az_count:>2} AZs: {seconds * 1000:8.1f} ms  {size / 1024:8.1f} KiB output  "
+              f"{peak / 1024 / 1024:6.1f} MiB peak")
+
+
+if __name__ == '__main__':
+    main()
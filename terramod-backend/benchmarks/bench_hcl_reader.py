@@ -0,0 +1,98 @@
+"""
+Fast HCL reader: agreement with hcl2, and parse throughput in MiB/s
+
+Every corpus file is parsed by both readers first; the fast reader must
+either produce exactly hcl2's output or raise UnsupportedSyntax (and fall
+back). The corpus is the import benchmark's files, generator output
+with for_each compression and per-AZ deployment expansion, and heredoc
+edge cases (trailing blank lines and spaces, indented `<<-` bodies).
+
+Run from terramod-backend/:
+    python -m benchmarks.bench_hcl_reader
+"""
+
+import logging
+import sys
+import time
+import hcl2
+from app.deployment import DeploymentConfig
+from app.terraform import hcl_reader
+from app.terraform.generator import TerraformGenerator
+from benchmarks.graphs import load_registry, synthetic_corpus, synthetic_graph
+
+STRATEGIES = ('per-az', 'regional', 'single')
+
+# hcl2 trims trailing whitespace from heredoc bodies before `<<-` dedents them
+HEREDOC_BODIES = (
+    'foo  \n',
+    'x\n\n',
+    '  x\n  y \t\n',
+    '\n\nx\n',
+    ' \n',
+    ' x \n\n \n',
+    '    x\n\n',
+    '    x\n   y\n',
+    '  \n    x\n',
+    '\tx\n',
+    '',
+)
+
+
+def corpus() -> dict:
+    files = synthetic_corpus(file_count=400, resources_per_file=10)
+
+    graph = synthetic_graph(domain_count=50, resources_per_domain=20)
+    for position, resource in enumerate(graph.resources.values()):
+        resource.deployment = {'strategy': STRATEGIES[position % len(STRATEGIES)]}
+    config = DeploymentConfig(primary_region='us-east-1', availability_zones=['us-east-1a', 'us-east-1b'])
+    generator = TerraformGenerator(use_cache=False, parallel=False, compress=True, deployment=config)
+    for path, content in generator.generate_project(graph).files().items():
+        if path.endswith('.tf'):
+            files[f"expanded/{path}"] = content
+
+    for position, body in enumerate(HEREDOC_BODIES):
+        for marker in ('<<', '<<-'):
+            files[f"heredoc/{marker}{position}.tf"] = f'locals {{\n  text = {marker}EOT\n{body}  EOT\n}}\n'
+    return files
+
+
+def throughput(label: str, parse, files: dict) -> None:
+    megabytes = sum(len(content.encode('utf-8')) for content in files.values()) / 1024 / 1024
+    started = time.perf_counter()
+    for content in files.values():
+        parse(content)
+    seconds = time.perf_counter() - started
+    print(f"  {label:>24}: {seconds:7.3f} s  {megabytes / seconds:8.2f} MiB/s  ({megabytes:.2f} MiB)")
+
+
+def main() -> None:
+    load_registry()
+    logging.disable(logging.WARNING)
+    files = corpus()
+
+    supported = {}
+    mismatches = []
+    for path, content in files.items():
+        expected = hcl2.loads(content)
+        try:
+            parsed = hcl_reader.parse(content)
+        except hcl_reader.UnsupportedSyntax:
+            continue
+        supported[path] = content
+        if parsed != expected or list(parsed) != list(expected):
+            mismatches.append(path)
+
+    print(f"{len(files)} files: {len(supported)} read by the fast reader, "
+          f"{len(files) - len(supported)} fall back to hcl2, {len(mismatches)} differ from hcl2")
+    for path in mismatches:
+        print(f"  differs: {path}")
+
+    throughput('hcl2.loads', hcl2.loads, files)
+    throughput('hcl_reader.loads', hcl_reader.loads, files)
+    throughput('hcl_reader.tokenize', hcl_reader.tokenize, supported)
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Terraform import throughput: serial, across worker processes, and re-imports
+
+The re-import rows parse the same corpus again through the content-hash
+parse cache, first unchanged and then with a tenth of the files edited.
+
+Run from terramod-backend/:
+    python -m benchmarks.bench_import
+"""
+
+import logging
+import os
+import tempfile
+import time
+
+# Benchmark against an empty cache of its own, not the server's
+os.environ['PARSE_CACHE_DIR'] = tempfile.mkdtemp(prefix='terramod-bench-parse-')
+
+from app.terraform.parser import PARSE_WORKERS, TerraformParser, get_parse_cache, shutdown_parse_pool
+from benchmarks.graphs import load_registry, synthetic_corpus
+
+FILE_COUNT = 400
+RESOURCES_PER_FILE = 10
+
+
+def run(label: str, parser: TerraformParser, files: dict, megabytes: float) -> None:
+    started = time.perf_counter()
+    result = parser.import_project(files)
+    seconds = time.perf_counter() - started
+    print(f"  {label:>19}: {seconds:7.3f} s  {megabytes / seconds:8.2f} MiB/s  "
+          f"{len(result.graph.resources)} resources, {result.cache_hits}/{len(files)} cached, "
+          f"{len(result.errors)} failed files")
+
+
+def main() -> None:
+    load_registry()
+    logging.disable(logging.WARNING)
+    files = synthetic_corpus(FILE_COUNT, RESOURCES_PER_FILE)
+    megabytes = sum(len(content.encode('utf-8')) for content in files.values()) / 1024 / 1024
+
+    print(f"{FILE_COUNT} files x {RESOURCES_PER_FILE} resources, {megabytes:.2f} MiB, {PARSE_WORKERS} workers")
+    run('serial', TerraformParser(parallel=False, use_cache=False), files, megabytes)
+    run('parallel', TerraformParser(use_cache=False), files, megabytes)
+
+    get_parse_cache().clear()
+    run('first import', TerraformParser(), files, megabytes)
+    run('unchanged re-import', TerraformParser(), files, megabytes)
+
+    edited = {
+        name: content + "\n# edited\n" if position % 10 == 0 else content
+        for position, (name, content) in enumerate(files.items())
+    }
+    run('10% edited', TerraformParser(), edited, megabytes)
+    shutdown_parse_pool()
+
+
+if __name__ == '__main__':
+    main()
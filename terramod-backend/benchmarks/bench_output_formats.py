@@ -0,0 +1,30 @@
+"""
+Module generation time and output size: HCL templates vs Terraform JSON
+
+Run from terramod-backend/:
+    python -m benchmarks.bench_output_formats
+"""
+
+import logging
+import timeit
+from app.terraform.generator import TerraformGenerator
+from benchmarks.graphs import load_registry, synthetic_graph
+
+ITERATIONS = 5
+
+
+def main() -> None:
+    load_registry()
+    logging.disable(logging.INFO)
+    graph = synthetic_graph(domain_count=100, resources_per_domain=20)
+
+    print(f"100 domains x 20 resources, {ITERATIONS} iterations, cache disabled")
+    for output_format in ('hcl', 'json'):
+        generator = TerraformGenerator(use_cache=False, parallel=False, output_format=output_format)
+        seconds = timeit.timeit(lambda: generator.generate_project(graph), number=ITERATIONS) / ITERATIONS
+        size = sum(len(content) for content in generator.generate_project(graph).files().values())
+        print(f"  {output_format:>4}: {seconds * 1000:8.1f} ms  {size / 1024:8.1f} KiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""
+Import throughput from Terraform state files and `terraform show -json`
+
+Builds a version 4 state of 10k resource instances (root resources,
+count and for_each instances, nested modules, 1-3 dependencies each), the
+equivalent `show -json` document and a plan creating the same resources,
+then imports all three. The plan's dependencies are only in its
+configuration: those crossing modules go up through module outputs and
+down through module inputs, so every import should find the same
+connections.
+
+Run from terramod-backend/:
+    python -m benchmarks.bench_state_import
+"""
+
+import json
+import logging
+import time
+from app.terraform.state_importer import StateImporter, config_address
+from benchmarks.graphs import load_registry
+
+RESOURCE_COUNT = 10_000
+TYPES = ('aws_subnet', 'aws_instance', 'aws_security_group', 'aws_s3_bucket', 'aws_iam_role', 'aws_lb')
+MODULES = ('', 'module.network', 'module.app["blue"]', 'module.app["green"]', 'module.app["blue"].module.db')
+
+
+def _attributes(resource_type: str, i: int) -> dict:
+    return {
+        'id': f"{resource_type.split('_', 1)[1]}-{i:08x}",
+        'arn': f"arn:aws:service:us-east-1:123456789012:{resource_type}/{i}",
+        'name': f"{resource_type}-{i}",
+        'tags': {'Name': f"r{i}", 'Team': 'platform', 'Env': 'prod'},
+        'tags_all': {'Name': f"r{i}", 'Team': 'platform', 'Env': 'prod'},
+        'timeouts': None,
+        'settings': [{'key': f"k{j}", 'value': j, 'enabled': j % 2 == 0} for j in range(4)],
+        'password': 'hunter2' if resource_type == 'aws_iam_role' else None,
+        **{f"attribute_{j}": f"value-{i}-{j}" for j in range(12)}
+    }
+
+
+def synthetic_state(resource_count: int) -> dict:
+    """Version 4 state: groups of 1-4 instances, each depending on earlier groups"""
+    resources = []
+    addresses = []
+    created = 0
+    group = 0
+    while created < resource_count:
+        resource_type = TYPES[group % len(TYPES)]
+        module = MODULES[group % len(MODULES)]
+        width = 1 + group % 4
+        keys = [None] if width == 1 else (list(range(width)) if group % 2 else [f"az{k}" for k in range(width)])
+        prefix = f"{module}." if module else ''
+        dependencies = [addresses[-d] for d in (1, 7, 31) if d <= len(addresses)][:1 + group % 3]
+        instances = []
+        for key in keys:
+            instance = {
+                'schema_version': 1,
+                'attributes': _attributes(resource_type, created),
+                'sensitive_attributes': [[{'type': 'get_attr', 'value': 'password'}]],
+                'dependencies': dependencies
+            }
+            if key is not None:
+                instance['index_key'] = key
+            instances.append(instance)
+            created += 1
+        entry = {'mode': 'managed', 'type': resource_type, 'name': f"r{group}",
+                 'provider': 'provider["registry.terraform.io/hashicorp/aws"]', 'instances': instances}
+        if module:
+            entry['module'] = module
+        resources.append(entry)
+        addresses.append(f"{prefix}{resource_type}.r{group}")
+        group += 1
+    return {'version': 4, 'terraform_version': '1.6.0', 'serial': 1, 'lineage': 'bench', 'outputs': {},
+            'resources': resources}
+
+
+def show_json(state: dict) -> dict:
+    """The same resources as `terraform show -json` prints them"""
+    modules = {}
+    for entry in state['resources']:
+        module = entry.get('module', '')
+        prefix = f"{module}." if module else ''
+        for instance in entry['instances']:
+            address = f"{prefix}{entry['type']}.{entry['name']}"
+            if 'index_key' in instance:
+                address += f"[{json.dumps(instance['index_key'])}]"
+            modules.setdefault(module, []).append({
+                'address': address, 'mode': 'managed', 'type': entry['type'], 'name': entry['name'],
+                'index': instance.get('index_key'), 'provider_name': 'registry.terraform.io/hashicorp/aws',
+                'schema_version': 1, 'values': instance['attributes'],
+                'sensitive_values': {'password': True}, 'depends_on': instance['dependencies']
+            })
+    root = {'resources': modules.pop('', []), 'child_modules': [
+        {'address': module, 'resources': resources} for module, resources in modules.items()
+    ]}
+    return {'format_version': '1.0', 'terraform_version': '1.6.0', 'values': {'root_module': root}}
+
+
+def _split(address: str) -> tuple:
+    """module.a["x"].module.b.aws_vpc.main -> (('a', 'b'), 'aws_vpc', 'main')"""
+    parts = config_address(address).split('.')
+    return tuple(parts[1:-2:2]), parts[-2], parts[-1]
+
+
+def plan_json(state: dict) -> dict:
+    """`terraform show -json` of a plan creating the same resources"""
+    modules = {}
+
+    def module(path: tuple) -> dict:
+        if path not in modules:
+            modules[path] = {'resources': [], 'outputs': {}, 'module_calls': {}}
+            if path:
+                module(path[:-1])['module_calls'][path[-1]] = {
+                    'source': f"./modules/{path[-1]}", 'expressions': {}, 'module': modules[path]
+                }
+        return modules[path]
+
+    def export(path: tuple, reference: str, name: str) -> str:
+        """The root module's reference to `reference` made in module path"""
+        while path:
+            module(path)['outputs'][name] = {'expression': {'references': [reference]}}
+            reference = f"module.{path[-1]}.{name}"
+            path = path[:-1]
+        return reference
+
+    def pass_down(path: tuple, reference: str, name: str) -> str:
+        """Module path's reference to the root module's `reference`"""
+        module(path)
+        for depth in range(len(path)):
+            module(path[:depth])['module_calls'][path[depth]]['expressions'][name] = {'references': [reference]}
+            reference = f"var.{name}"
+        return reference
+
+    declared = set()
+    for entry in state['resources']:
+        path, resource_type, name = _split(f"{entry.get('module', '')}.{entry['type']}.{entry['name']}")
+        if (path, resource_type, name) in declared:
+            continue
+        declared.add((path, resource_type, name))
+        references = []
+        for dependency in entry['instances'][0]['dependencies']:
+            dependency_path, dependency_type, dependency_name = _split(dependency)
+            reference = f"{dependency_type}.{dependency_name}.id"
+            if dependency_path != path:
+                variable = f"{dependency_type}_{dependency_name}_id"
+                reference = pass_down(path, export(dependency_path, reference, variable), variable)
+            references.append(reference)
+        module(path)['resources'].append({
+            'address': f"{resource_type}.{name}", 'mode': 'managed', 'type': resource_type, 'name': name,
+            'expressions': {f"attribute_{j}": {'references': [reference]} for j, reference in enumerate(references)}
+        })
+
+    planned = show_json(state)['values']['root_module']
+    for resources in [planned['resources']] + [child['resources'] for child in planned['child_modules']]:
+        for resource in resources:
+            del resource['depends_on']
+    return {'format_version': '1.2', 'terraform_version': '1.6.0', 'planned_values': {'root_module': planned},
+            'configuration': {'root_module': module(())}}
+
+
+def main() -> None:
+    load_registry()
+    logging.disable(logging.WARNING)
+    state = synthetic_state(RESOURCE_COUNT)
+    documents = {
+        'terraform.tfstate': json.dumps(state).encode('utf-8'),
+        'show.json': json.dumps(show_json(state)).encode('utf-8'),
+        'plan.json': json.dumps(plan_json(state)).encode('utf-8'),
+    }
+
+    print(f"{RESOURCE_COUNT} resource instances")
+    for filename, content in documents.items():
+        started = time.perf_counter()
+        result = StateImporter().import_state(content, filename)
+        seconds = time.perf_counter() - started
+        graph = result.graph
+        print(f"  {filename:>17}: {seconds:6.2f} s  {len(content) / 1024 / 1024 / seconds:7.1f} MiB/s  "
+              f"({len(content) / 1024 / 1024:.1f} MiB) {len(graph.resources)} resources, "
+              f"{len(graph.domains)} domains, {len(graph.connections)} connections")
+
+
+if __name__ == '__main__':
+    main()
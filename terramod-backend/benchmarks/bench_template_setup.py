@@ -0,0 +1,46 @@
+"""
+Per-request template setup cost: fresh Jinja environment vs shared precompiled one
+
+Run from terramod-backend/:
+    python -m benchmarks.bench_template_setup
+"""
+
+import timeit
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from app.terraform.environment import TEMPLATE_DIR, TEMPLATE_NAMES, get_template_environment
+from app.terraform.generator import TerraformGenerator
+from app.terraform.hcl import to_hcl_value
+from benchmarks.graphs import load_registry, synthetic_graph
+
+ITERATIONS = 200
+
+
+def per_request_setup() -> None:
+    """What every request paid before: new environment, templates compiled from source"""
+    environment = Environment(
+        loader=FileSystemLoader(str(TEMPLATE_DIR)),
+        autoescape=select_autoescape(),
+        trim_blocks=True,
+        lstrip_blocks=True
+    )
+    environment.filters['to_hcl'] = to_hcl_value
+    for name in TEMPLATE_NAMES:
+        environment.get_template(name)
+
+
+def main() -> None:
+    load_registry()
+    get_template_environment()
+    graph = synthetic_graph(domain_count=3, resources_per_domain=3)
+
+    setup = timeit.timeit(per_request_setup, number=ITERATIONS) / ITERATIONS
+    shared = timeit.timeit(lambda: TerraformGenerator().generate_project(graph), number=ITERATIONS) / ITERATIONS
+
+    print(f"small graph (3 domains x 3 resources), {ITERATIONS} iterations")
+    print(f"  per-request environment setup (removed): {setup * 1000:8.3f} ms")
+    print(f"  generation with shared environment:      {shared * 1000:8.3f} ms")
+    print(f"  previous cost per request:               {(setup + shared) * 1000:8.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
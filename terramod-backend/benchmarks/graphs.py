@@ -0,0 +1,88 @@
+"""
+Synthetic infrastructure graphs for generator benchmarks
+"""
+
+from app.core.graph import InfrastructureGraph
+
+DOMAIN_TYPES = ['networking', 'compute', 'data', 'storage', 'edge', 'identity', 'observability']
+
+RESOURCE_TEMPLATES = {
+    'networking': ('aws_subnet', lambda i: {
+        'vpc_id': '${aws_vpc.main.id}',
+        'cidr_block': f'10.{i // 256 % 256}.{i % 256}.0/24',
+        'tags': {'Name': f'subnet-{i}', 'Tier': 'private'}
+    }),
+    'compute': ('aws_instance', lambda i: {
+        'ami': 'ami-0c55b159cbfafe1f0',
+        'instance_type': 't3.micro',
+        'tags': {'Name': f'web-{i}'}
+    }),
+    'data': ('aws_db_instance', lambda i: {
+        'engine': 'postgres',
+        'instance_class': 'db.t3.micro',
+        'allocated_storage': 20,
+        'multi_az': False
+    }),
+    'storage': ('aws_s3_bucket', lambda i: {
+        'bucket': f'bucket-{i}',
+        'tags': {'Name': f'bucket-{i}'}
+    }),
+    'edge': ('aws_lb', lambda i: {
+        'name': f'lb-{i}',
+        'internal': False,
+        'load_balancer_type': 'application'
+    }),
+    'identity': ('aws_iam_role', lambda i: {
+        'name': f'role-{i}',
+        'assume_role_policy': {
+            'Version': '2012-10-17',
+            'Statement': [{'Effect': 'Allow', 'Principal': {'Service': 'ec2.amazonaws.com'},
+                           'Action': 'sts:AssumeRole'}]
+        }
+    }),
+    'observability': ('aws_cloudwatch_log_group', lambda i: {
+        'name': f'/app/log-{i}',
+        'retention_in_days': 14
+    }),
+}
+
+
+def synthetic_graph(domain_count: int, resources_per_domain: int) -> InfrastructureGraph:
+    """Build a graph with `domain_count` domains of `resources_per_domain` resources each"""
+    domains = []
+    resources = []
+    for d in range(domain_count):
+        domain_type = DOMAIN_TYPES[d % len(DOMAIN_TYPES)]
+        domain_id = f'domain_{d}'
+        domains.append({'id': domain_id, 'name': f'{domain_type}_{d}', 'type': domain_type})
+
+        resource_type, make_arguments = RESOURCE_TEMPLATES[domain_type]
+        for r in range(resources_per_domain):
+            index = d * resources_per_domain + r
+            resources.append({
+                'id': f'res_{index}',
+                'type': resource_type,
+                'domain_id': domain_id,
+                'name': f'{resource_type[4:]}_{index}',
+                'arguments': make_arguments(index)
+            })
+
+    return InfrastructureGraph.from_dict({'domains': domains, 'resources': resources, 'connections': []})
+
+
+def load_registry() -> None:
+    """Load the service registry the generators read outputs from"""
+    from pathlib import Path
+    from app.registry.loader import ServiceRegistry
+
+    registry_path = Path(__file__).resolve().parent.parent / 'registry' / 'aws_services.yaml'
+    ServiceRegistry.get_instance().load_registry(str(registry_path))
+
+
+def synthetic_corpus(file_count: int, resources_per_file: int) -> dict:
+    """HCL files for import benchmarks: the generated main.tf of one module per file"""
+    from app.terraform.generator import TerraformGenerator
+
+    graph = synthetic_graph(domain_count=file_count, resources_per_domain=resources_per_file)
+    project = TerraformGenerator(use_cache=False, parallel=False).generate_project(graph)
+    return {f"{name}.tf": module.main_tf for name, module in project.modules.items()}
@@ -1,5 +1,6 @@
 import os
 from typing import Optional
+from app.utils.cache import user_cache_dir
 
 class Settings:
     """Application settings"""
@@ -17,11 +18,33 @@ class Settings:
     # Registry Settings
     REGISTRY_PATH: str = os.getenv('REGISTRY_PATH', './registry/aws_services.yaml')
     
+    # Pricing Settings (memory-mapped table shared by workers; empty = built-in prices)
+    PRICING_TABLE_PATH: str = os.getenv('PRICING_TABLE_PATH', '')
+    
+    # Template Settings (compiled Jinja bytecode, persisted between restarts in a 0700 dir)
+    TEMPLATE_CACHE_DIR: str = os.getenv('TEMPLATE_CACHE_DIR') or user_cache_dir('terramod-jinja-cache')
+    
     # Logging Settings
     LOG_LEVEL: str = os.getenv('LOG_LEVEL', 'INFO')
     
     # Cache Settings
     CACHE_MAX_SIZE_MB: int = int(os.getenv('CACHE_MAX_SIZE_MB', '100'))
     CACHE_TTL_SECONDS: int = int(os.getenv('CACHE_TTL_SECONDS', '300'))
+    MODULE_CACHE_SIZE: int = int(os.getenv('MODULE_CACHE_SIZE', '512'))
+    FILE_CACHE_SIZE: int = int(os.getenv('FILE_CACHE_SIZE', '4096'))
+    FILE_CACHE_DIR: str = os.getenv('FILE_CACHE_DIR') or user_cache_dir('terramod-file-cache')
+    WIRING_CACHE_SIZE: int = int(os.getenv('WIRING_CACHE_SIZE', '256'))
+    
+    # Generator Settings (worker processes for projects with many domains)
+    GENERATOR_WORKERS: int = int(os.getenv('GENERATOR_WORKERS', str(os.cpu_count() or 1)))
+    PARALLEL_MODULE_THRESHOLD: int = int(os.getenv('PARALLEL_MODULE_THRESHOLD', '50'))
+    FOR_EACH_MIN_GROUP: int = int(os.getenv('FOR_EACH_MIN_GROUP', '3'))  # smallest group compress=true folds
+    
+    # Import Settings (parse workers, and parsed HCL cached by content hash in a 0700 dir)
+    PARSER_WORKERS: int = int(os.getenv('PARSER_WORKERS', str(os.cpu_count() or 1)))
+    PARALLEL_PARSE_THRESHOLD: int = int(os.getenv('PARALLEL_PARSE_THRESHOLD', '8'))
+    PARSE_CACHE_DIR: str = os.getenv('PARSE_CACHE_DIR') or user_cache_dir('terramod-parse-cache')
+    PARSE_CACHE_SIZE: int = int(os.getenv('PARSE_CACHE_SIZE', '20000'))
+    FAST_HCL_READER: bool = os.getenv('FAST_HCL_READER', '1') != '0'
 
 settings = Settings()
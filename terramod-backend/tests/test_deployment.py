@@ -0,0 +1,49 @@
+import hcl2
+
+from app.cost.estimator import CostEstimator
+from app.deployment import DeploymentConfig, expand_infrastructure_for_deployment, preview_expansion
+
+CONFIG = DeploymentConfig(primary_region='us-east-1', availability_zones=['us-east-1a', 'us-east-1b'])
+
+
+def test_null_deployment_expands_as_single():
+    resources = [{'id': 'r1', 'type': 'aws_instance', 'name': 'web', 'deployment': None}]
+
+    expansion = expand_infrastructure_for_deployment(resources, CONFIG)
+
+    aliases = [expanded['deployment_alias'] for expanded in expansion['expanded_resources']]
+    assert [alias['alias_type'] for alias in aliases] == ['none']
+    assert expansion['deployment_metadata']['total_aliases'] == 1
+
+
+def test_null_deployment_is_priced_once():
+    graph = {'resources': [{
+        'id': 'r1', 'type': 'aws_instance', 'name': 'web', 'deployment': None,
+        'arguments': {'instance_type': 't3.micro'}
+    }]}
+
+    report = CostEstimator().estimate_stack_costs(graph, '3-tier-web-app', deployment_config=CONFIG)
+
+    for scenario in report.scenarios.values():
+        assert [cost.resource_name for cost in scenario.breakdown] == ['web']
+        assert scenario.breakdown[0].alias_costs is None or len(scenario.breakdown[0].alias_costs) == 1
+
+
+def test_nat_gateways_stay_per_az():
+    resources = [
+        {'id': 'nat', 'type': 'aws_nat_gateway', 'name': 'nat', 'deployment': {'strategy': 'per-az'}},
+        {'id': 'logs', 'type': 'aws_s3_bucket', 'name': 'logs', 'deployment': {'strategy': 'per-az'}},
+    ]
+
+    preview = preview_expansion(resources, CONFIG)
+
+    assert [(entry['strategy'], entry['aliases']) for entry in preview.by_resource] == [('per-az', 2), ('single', 1)]
+    assert preview.warnings == [
+        "aws_s3_bucket.logs cannot be placed in an availability zone, deployed as 'single' instead of 'per-az'"
+    ]
+
+
+def test_preview_locals_match_rendered_block():
+    preview = preview_expansion([], CONFIG)
+
+    assert hcl2.loads(preview.locals_block)['locals'] == [preview.locals]
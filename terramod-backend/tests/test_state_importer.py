@@ -0,0 +1,59 @@
+import json
+
+from app.terraform.state_importer import StateImporter
+
+VPC = {'address': 'module.net.aws_vpc.this', 'mode': 'managed', 'type': 'aws_vpc', 'name': 'this',
+       'values': {'cidr_block': '10.0.0.0/16'}}
+SUBNET = {'address': 'module.net.module.az.aws_subnet.this', 'mode': 'managed', 'type': 'aws_subnet', 'name': 'this',
+          'values': {'cidr_block': '10.0.1.0/24'}}
+APP = {'address': 'aws_instance.app', 'mode': 'managed', 'type': 'aws_instance', 'name': 'app',
+       'values': {'instance_type': 't3.micro'}}
+
+
+def _planned(root):
+    """planned_values / values root module with module.net and its nested module.az"""
+    return {'root_module': {
+        **root,
+        'child_modules': [{
+            'address': 'module.net',
+            'resources': [VPC],
+            'child_modules': [{'address': 'module.net.module.az', 'resources': [SUBNET]}]
+        }]
+    }}
+
+
+def _dependencies(document):
+    graph = StateImporter().import_state(json.dumps(document)).graph
+    return sorted(graph.connections)
+
+
+def test_whole_module_depends_on_matches_between_plan_and_state():
+    plan = {
+        'format_version': '1.2',
+        'planned_values': _planned({'resources': [APP]}),
+        'configuration': {'root_module': {
+            'resources': [{'address': 'aws_instance.app', 'mode': 'managed', 'type': 'aws_instance',
+                           'name': 'app', 'expressions': {}, 'depends_on': ['module.net']}],
+            'module_calls': {'net': {'module': {
+                'resources': [{'address': 'aws_vpc.this', 'mode': 'managed', 'type': 'aws_vpc',
+                               'name': 'this', 'expressions': {}}],
+                'module_calls': {'az': {'module': {
+                    'resources': [{'address': 'aws_subnet.this', 'mode': 'managed', 'type': 'aws_subnet',
+                                   'name': 'this', 'expressions': {}}]
+                }}}
+            }}}
+        }}
+    }
+    state = {
+        'format_version': '1.0',
+        'values': _planned({'resources': [{
+            **APP, 'depends_on': ['module.net.aws_vpc.this', 'module.net.module.az.aws_subnet.this']
+        }]})
+    }
+
+    expected = [
+        'module.net.aws_vpc.this->aws_instance.app',
+        'module.net.module.az.aws_subnet.this->aws_instance.app'
+    ]
+    assert _dependencies(plan) == expected
+    assert _dependencies(state) == expected
@@ -0,0 +1,48 @@
+from app.core.graph import InfrastructureGraph
+from app.terraform.wiring import compute_wiring
+
+DOMAINS = ('a', 'b', 'c')
+
+
+def _graph(*connections):
+    """Domains a, b and c; each connection is (source, target, output_name or None)"""
+    return InfrastructureGraph.from_dict({
+        'domains': [
+            {'id': name, 'name': name, 'type': 'compute', 'outputs': [{'name': 'id', 'type': 'string'}]}
+            for name in DOMAINS
+        ],
+        'resources': [],
+        'connections': [
+            {
+                'id': f"{source}-{target}-{idx}",
+                'source_id': source,
+                'target_id': target,
+                'source_type': 'domain',
+                'target_type': 'domain',
+                'connection_type': 'dependency' if output_name is None else 'data',
+                'output_name': output_name
+            }
+            for idx, (source, target, output_name) in enumerate(connections)
+        ]
+    })
+
+
+def test_depends_on_is_kept_next_to_a_module_reference():
+    wiring = compute_wiring(_graph(('a', 'b', 'id'), ('a', 'b', None)), list(DOMAINS))
+
+    assert wiring.inputs['b']['id'] == 'module.a.id'
+    assert wiring.depends_on == {'b': ['a']}
+
+
+def test_depends_on_is_kept_when_references_chain_to_it():
+    wiring = compute_wiring(_graph(('a', 'b', 'id'), ('b', 'c', 'id'), ('a', 'c', None)), list(DOMAINS))
+
+    assert wiring.depends_on == {'c': ['a']}
+    assert wiring.removed_edges == 0
+
+
+def test_depends_on_implied_by_other_depends_on_is_removed():
+    wiring = compute_wiring(_graph(('a', 'b', None), ('b', 'c', None), ('a', 'c', None)), list(DOMAINS))
+
+    assert wiring.depends_on == {'b': ['a'], 'c': ['b']}
+    assert (wiring.dependency_edges, wiring.removed_edges) == (3, 1)
@@ -1,4 +1,5 @@
 import { post, get } from './client';
+import type { DeploymentConfig } from '../types/deployment';
 
 export interface CostDriver {
     name: string;
@@ -8,6 +9,13 @@ export interface CostDriver {
     explanation: string;
 }
 
+export interface AliasCost {
+    alias: string;
+    alias_type: string;
+    region: string;
+    monthly_cost: number;
+}
+
 export interface ResourceCost {
     resource_id: string;
     resource_type: string;
@@ -16,6 +24,7 @@ export interface ResourceCost {
     annual_cost: number;
     cost_drivers: CostDriver[];
     optimization_suggestions: string[];
+    alias_costs?: AliasCost[];  // Per-AZ/region copies when a deployment config is given
 }
 
 export interface ScenarioCost {
@@ -32,6 +41,7 @@ export interface CostEstimateReport {
     scenarios: Record<string, ScenarioCost>;
     free_tier_eligible: boolean;
     optimization_recommendations: string[];
+    warnings?: string[];  // resources priced with another deployment strategy than they ask for
     last_updated?: string;  // ADDED: Optional timestamp
 }
 
@@ -44,6 +54,7 @@ export interface CostEstimateRequest {
     stack_type: string;
     region: string;
     currency: string;
+    deployment_config?: DeploymentConfig;
 }
 
 export async function estimateCosts(request: CostEstimateRequest) {
@@ -65,4 +76,61 @@ export async function compareRegions(data: {
     currency: string;
 }) {
     return post<any>('/api/v1/cost/compare', data);
-}
\ No newline at end of file
+}
+
+export interface CostDelta {
+    monthly: number;
+    display: string;  // e.g. "+$42.10/mo"
+}
+
+export interface CostSessionRequest extends CostEstimateRequest {
+    session_id?: string;
+}
+
+export interface CostSessionReport extends CostEstimateReport {
+    session_id: string;
+    deltas: Record<string, CostDelta>;
+    changed_resources: number;
+    recomputed: number;
+}
+
+export async function estimateCostsIncremental(request: CostSessionRequest) {
+    const result = await post<CostSessionReport>('/api/v1/cost/session', request);
+    if (!result.ok && request.session_id) {
+        // Expired session: start over; the new session_id tells the caller its deltas are a new baseline
+        const { session_id, ...baseline } = request;
+        return post<CostSessionReport>('/api/v1/cost/session', baseline);
+    }
+    return result;
+}
+
+export interface SensitivityEntry {
+    parameter: string;
+    kind: 'assumption' | 'argument';
+    resource_id: string | null;
+    base_value: any;
+    low_value: any;
+    high_value: any;
+    low_total: number;
+    high_total: number;
+    swing: number;
+    elasticity: number | null;
+}
+
+export interface SensitivityReport {
+    stack_type: string;
+    scenario: string;
+    step: number;
+    base_monthly: number;
+    entries: SensitivityEntry[];
+}
+
+export async function analyzeSensitivity(data: {
+    graph: any;
+    stack_type: string;
+    region?: string;
+    scenario?: string;
+    step?: number;
+}) {
+    return post<SensitivityReport>('/api/v1/cost/sensitivity', data);
+}
@@ -0,0 +1,79 @@
+import { post } from './client';
+import type { DeploymentConfig } from '../types/deployment';
+import type { InfrastructureGraph } from './graph';
+
+export interface SubnetRequest {
+    name: string;
+    prefix_length?: number;  // default /24
+    per_az?: boolean;        // one subnet per AZ (default) or one per region
+}
+
+export interface SubnetAllocation {
+    name: string;
+    region: string;
+    cidr: string;
+    availability_zone?: string | null;
+}
+
+export interface RegionPlan {
+    region: string;
+    vpc_cidr: string;
+    availability_zones: string[];
+    subnets: SubnetAllocation[];
+    free_addresses: number;
+}
+
+export interface CidrPlan {
+    regions: RegionPlan[];
+    existing_overlaps: string[][];
+}
+
+export interface CidrPlanRequest {
+    deployment_config: DeploymentConfig;
+    subnets: SubnetRequest[];
+    vpc_cidr?: string;
+    vpc_cidrs?: Record<string, string>;
+    existing_subnets?: string[];
+}
+
+export async function previewCidrPlan(request: CidrPlanRequest) {
+    return post<CidrPlan>('/api/v1/deployment/cidr-plan', request);
+}
+
+export interface ResourceExpansion {
+    id?: string;
+    name?: string;
+    type?: string;
+    domain: string;
+    strategy: string;
+    aliases: number;
+    monthly_cost?: number | null;
+}
+
+export interface ExpansionPreview {
+    total_resources: number;
+    total_aliases: number;
+    resources: ResourceExpansion[];
+    domains: Record<string, number>;
+    regions: Record<string, number>;
+    strategies: Record<string, number>;
+    strategy_regions: Record<string, Record<string, number>>;
+    locals: Record<string, any>;
+    locals_block: string;
+    total_monthly_cost?: number | null;
+    warnings?: string[];  // resources deployed with another strategy than they ask for
+}
+
+export async function previewDeployment(
+    graph: InfrastructureGraph,
+    deploymentConfig: DeploymentConfig,
+    stackType?: string,
+    scenario?: string
+) {
+    return post<ExpansionPreview>('/api/v1/deployment/preview', {
+        graph,
+        deployment_config: deploymentConfig,
+        stack_type: stackType,
+        scenario,
+    });
+}
@@ -1,5 +1,6 @@
-import { post } from './client';
+import { get, post } from './client';
 import type { InfrastructureGraph } from './graph'
+import type { DeploymentConfig } from '../types/deployment';
 
 export interface TerraformModule {
     name: string;
@@ -13,12 +14,108 @@ export interface TerraformProject {
     root_main: string;
     providers: string;
     terraform_config: string;
+    module_sources?: Record<string, string>;
 }
 
-export type ExportFormat = 'zip' | 'directory';
+export interface ManifestFile {
+    path: string;
+    hash: string;
+    size: number;
+    content?: string;  // Inline when the project has more files than the server's file cache
+}
+
+export interface TerraformManifest {
+    files: ManifestFile[];
+}
+
+export interface TerraformFile {
+    hash: string;
+    content: string;
+}
+
+export interface StateBackend {
+    type: 'local' | 's3';
+    bucket?: string;
+    region?: string;
+    key_prefix?: string;
+    dynamodb_table?: string;
+}
+
+export interface TerraformStack {
+    name: string;
+    domains: string[];
+    depends_on: string[];
+}
+
+export interface ShardedProject {
+    stacks: TerraformStack[];
+    apply_plan: string[][];
+    files: Record<string, string>;
+}
+
+export interface ImportedFile {
+    filename: string;
+    resources: number;
+    error?: string | null;
+    cached?: boolean;
+}
+
+// Files that failed to read or parse are listed with their error; the rest are imported
+export interface ImportResult extends InfrastructureGraph {
+    files: ImportedFile[];
+}
+
+export type ExportFormat = 'zip' | 'tar.gz';
+
+export type OutputFormat = 'hcl' | 'json';
+
+// Per-AZ and regional resources are expanded when a deployment config is sent with the graph
+function withDeployment(graph: InfrastructureGraph, deploymentConfig?: DeploymentConfig) {
+    return deploymentConfig ? { ...graph, deployment_config: deploymentConfig } : graph;
+}
 
-export async function generateTerraform(graph: InfrastructureGraph) {
-    return post<TerraformProject>('/api/v1/terraform/generate', graph);
+export async function generateTerraform(
+    graph: InfrastructureGraph,
+    outputFormat: OutputFormat = 'hcl',
+    compress = false,
+    deploymentConfig?: DeploymentConfig
+) {
+    return post<TerraformProject>(
+        `/api/v1/terraform/generate?output_format=${outputFormat}&compress=${compress}`,
+        withDeployment(graph, deploymentConfig)
+    );
+}
+
+export async function generateTerraformManifest(
+    graph: InfrastructureGraph,
+    outputFormat: OutputFormat = 'hcl',
+    compress = false,
+    deploymentConfig?: DeploymentConfig
+) {
+    return post<TerraformManifest>(
+        `/api/v1/terraform/generate?mode=manifest&output_format=${outputFormat}&compress=${compress}`,
+        withDeployment(graph, deploymentConfig)
+    );
+}
+
+export async function generateShardedTerraform(
+    graph: InfrastructureGraph,
+    groups?: Record<string, string[]>,
+    backend?: StateBackend,
+    outputFormat: OutputFormat = 'hcl',
+    deploymentConfig?: DeploymentConfig
+) {
+    return post<ShardedProject>('/api/v1/terraform/generate/sharded', {
+        graph,
+        groups,
+        backend,
+        output_format: outputFormat,
+        deployment_config: deploymentConfig,
+    });
+}
+
+export async function fetchTerraformFile(hash: string) {
+    return get<TerraformFile>(`/api/v1/terraform/files/${hash}`);
 }
 
 export async function importTerraform(files: File[]) {
@@ -34,10 +131,40 @@ export async function importTerraform(files: File[]) {
         return { ok: false, error: { message: 'Import failed' } };
     }
 
-    const data = await response.json();
+    const data: ImportResult = await response.json();
+    return { ok: true, value: data };
+}
+
+// Accepts terraform.tfstate or `terraform show -json` output (state or plan)
+export async function importTerraformState(file: File) {
+    const formData = new FormData();
+    formData.append('file', file);
+
+    const response = await fetch('/api/v1/terraform/import/state', {
+        method: 'POST',
+        body: formData,
+    });
+
+    if (!response.ok) {
+        return { ok: false, error: { message: 'State import failed' } };
+    }
+
+    const data: ImportResult = await response.json();
     return { ok: true, value: data };
 }
 
-export async function exportProject(graph: InfrastructureGraph, format: ExportFormat) {
-    return post<Blob>('/api/v1/terraform/export', { graph, format });
+export async function exportProject(
+    graph: InfrastructureGraph,
+    format: ExportFormat,
+    outputFormat: OutputFormat = 'hcl',
+    compress = false,
+    deploymentConfig?: DeploymentConfig
+) {
+    return post<Blob>('/api/v1/terraform/export', {
+        graph,
+        format,
+        output_format: outputFormat,
+        compress,
+        deployment_config: deploymentConfig,
+    });
 }
\ No newline at end of file
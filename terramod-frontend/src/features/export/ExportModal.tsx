@@ -22,6 +22,7 @@ const ExportModal: React.FC<ExportModalProps> = ({ isOpen, onClose }) => {
   const domains = useInfraStore((state) => Array.from(state.domains.values()));
   const resources = useInfraStore((state) => Array.from(state.resources.values()));
   const connections = useInfraStore((state) => Array.from(state.connections.values()));
+  const deploymentConfig = useInfraStore((state) => state.deploymentConfig);
 
   const handleValidate = async () => {
     setIsValidating(true);
@@ -69,7 +70,7 @@ const ExportModal: React.FC<ExportModalProps> = ({ isOpen, onClose }) => {
         connections
       };
 
-      const result = await generateTerraform(graph);
+      const result = await generateTerraform(graph, 'hcl', false, deploymentConfig);
 
       if (!result.ok) {
         setError(result.error.message);
@@ -102,7 +103,7 @@ const ExportModal: React.FC<ExportModalProps> = ({ isOpen, onClose }) => {
         headers: {
           'Content-Type': 'application/json',
         },
-        body: JSON.stringify({ graph, format: 'zip' })
+        body: JSON.stringify({ graph, format: 'zip', deployment_config: deploymentConfig })
       });
 
       if (!response.ok) {
@@ -54,7 +54,8 @@ export const DEPLOYMENT_STRATEGY_PRESETS: Record<string, DeploymentStrategy> = {
 
     // One per AZ
     'aws_subnet': 'per-az',
-    'aws_nat_gateway': 'per-az',
+    'aws_nat_gateway': 'per-az',  // each in its AZ's per-AZ subnet
+    'aws_eip': 'per-az',          // one address per NAT gateway
     'aws_instance': 'per-az',
 
     // Spans multiple AZs